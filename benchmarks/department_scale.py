@@ -0,0 +1,93 @@
+"""
+Time the department queries, department_diff, cache loading and the
+scraper on synthetic departments of increasing size.
+
+A scale of 1 is a department of 20 authors with 50 publications each on
+average. No requests are sent to Google Scholar, the scraper is run on
+pages replayed from a store. Run with
+
+    python benchmarks/department_scale.py --scales 1 10 100
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+import structlog
+
+from pygscholar import Department, synthetic
+from pygscholar.api import replay, scraper
+from pygscholar.author import Author
+from pygscholar.cache import load_author
+from pygscholar.department import department_diff
+from pygscholar.mock_server import write_store
+
+
+def timed(func):
+    t0 = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - t0
+
+
+def run(scale: int, scrape: int, seed: int, full: bool) -> dict[str, float]:
+    timings: dict[str, float] = {}
+    profiles, timings["generate"] = timed(
+        lambda: synthetic.generate_department(num_authors=20 * scale, seed=seed)
+    )
+    with tempfile.TemporaryDirectory() as cache_dir:
+        _, timings["write cache"] = timed(lambda: synthetic.write_cache(profiles, cache_dir))
+        authors, timings["load cache"] = timed(
+            lambda: [load_author(p.scholar_id, cache_dir=cache_dir) for p in profiles]
+        )
+        department = Department(authors=authors)
+        _, timings["topk cited"] = timed(lambda: department.topk_cited(10))
+        _, timings["not older than"] = timed(lambda: department.publications_not_older_than(1))
+
+        # The previous state is missing every tenth publication
+        old = Department(
+            authors=[
+                Author(
+                    info=a.info,
+                    publications=[p for i, p in enumerate(a.publications) if i % 10 != 0],
+                )
+                for a in authors
+            ]
+        )
+        _, timings["department diff"] = timed(lambda: department_diff(department, old))
+
+        store = Path(cache_dir) / "pages.jsonl"
+        write_store(profiles[:scrape], store, full=full)
+        driver = replay.ReplayNavigator(store)
+        _, timings[f"scrape {scrape} authors"] = timed(
+            lambda: scraper.fetch_authors_by_id(
+                [p.scholar_id for p in profiles[:scrape]], full=full, driver=driver
+            )
+        )
+    timings["publications"] = sum(len(p.articles) for p in profiles)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--scrape", type=int, default=10, help="Number of authors to scrape")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--full", action="store_true", help="Also scrape the article page of each publication"
+    )
+    args = parser.parse_args()
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    for scale in args.scales:
+        timings = run(scale, args.scrape, args.seed, args.full)
+        print(
+            f"Scale {scale}: {20 * scale} authors, {timings.pop('publications'):.0f} publications"
+        )
+        for name, seconds in timings.items():
+            print(f"  {name:<20} {seconds:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
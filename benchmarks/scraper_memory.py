@@ -0,0 +1,67 @@
+"""
+Peak memory of the scraper when crawling a large profile.
+
+The pages are generated locally, so no requests are sent to Google Scholar.
+Each article page is padded to mimic pathological pages, e.g with very long
+descriptions. Run with
+
+    python benchmarks/scraper_memory.py --pages 10 --padding 200000
+"""
+
+import argparse
+import logging
+import time
+import tracemalloc
+
+import structlog
+
+from pygscholar.api import scraper
+
+
+class SyntheticNavigator:
+    def __init__(self, pages: int, padding: int) -> None:
+        self.pages = pages
+        self.padding = padding
+
+    def _get_page(self, link: str) -> str:
+        if "cstart=" in link:
+            page = int(link.split("cstart=")[-1].split("&")[0]) // 100
+            rows = "".join(
+                f'<tr class="gsc_a_tr"><td><a class="gsc_a_at" '
+                f'href="/citations?article={page}-{i}">Paper {page}-{i}</a>'
+                '<div class="gs_gray">A Author, B Author</div><div class="gs_gray">Journal</div>'
+                '</td><td><a class="gsc_a_ac">3</a></td>'
+                '<td><span class="gsc_a_hc">2020</span></td></tr>'
+                for i in range(100)
+            )
+            end = '<tr><td class="gsc_a_e"></td></tr>' if page == self.pages - 1 else ""
+            return f"<html><body><table>{rows}{end}</table></body></html>"
+        return (
+            '<html><body><div class="gsc_oci_field">Description</div>'
+            '<div class="gsc_oci_value">Abstract</div>'
+            f"<div>{'x' * self.padding}</div></body></html>"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=5, help="Number of profile pages")
+    parser.add_argument("--padding", type=int, default=100_000, help="Bytes per article page")
+    args = parser.parse_args()
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    driver = SyntheticNavigator(args.pages, args.padding)
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    articles = scraper.extract_all_articles("benchmark", full=True, driver=driver)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Articles: {len(articles)}")
+    print(f"Time: {elapsed:.2f} s")
+    print(f"Peak memory: {peak / 1024**2:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,11 @@ from . import publication
 from . import config
 from . import api
 from . import cache
+from . import groups
+from . import history
+from . import summary
 from .author import Author, AuthorInfo
-from .department import Department
+from .department import Department, LazyDepartment
 
 # from .publication import FullPublication
 from .publication import Publication
@@ -25,6 +28,7 @@ __all__ = [
     "Publication",
     "AuthorInfo",
     "Department",
+    "LazyDepartment",
     "author",
     "publication",
     "department",
@@ -32,4 +36,7 @@ __all__ = [
     "config",
     "api",
     "cache",
+    "groups",
+    "history",
+    "summary",
 ]
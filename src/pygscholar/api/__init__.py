@@ -1,17 +1,36 @@
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import datetime
 import difflib
+import json
+from typing import TYPE_CHECKING
 from typing import Iterable
+from typing import Mapping
 from typing import Protocol
 from typing import Sequence
 from enum import Enum
 
+from structlog import get_logger
+
+from .. import search
 from ..publication import Publication
 from ..author import AuthorInfo, Author
+from ..department import Department, LazyDepartment
+from ..ranking import SortBy, rank
 from . import scholarly
 from . import scraper
 from .local_db import LocalNavigator
 
-__all__ = ["search_author", "LocalNavigator"]
+if TYPE_CHECKING:
+    from ..checkpoint import CrawlCheckpoint
+
+__all__ = ["search_author", "search_authors", "fetch_authors", "LocalNavigator"]
+
+logger = get_logger()
+
+# How long a query that did not match any author is remembered
+NEGATIVE_CACHE_TTL = datetime.timedelta(days=7)
 
 
 def get_closest_name(name: str, names: Iterable[str]):
@@ -27,6 +46,11 @@ def get_closest_name(name: str, names: Iterable[str]):
 
 
 class PublicationObject(Protocol):
+    @property
+    def publications(self) -> Iterable[Publication]: ...
+
+    def publications_not_older_than(self, age: int) -> Sequence[Publication]: ...
+
     def topk_cited(self, k: int) -> Sequence[Publication]: ...
 
     def topk_age(self, k: int) -> Sequence[Publication]: ...
@@ -41,17 +65,33 @@ def extract_correct_publications(
     sort_by_citations: bool = True,
     max_age: int | None = None,
     n: int = 10,
+    sort_by: SortBy | None = None,
+    previous: Mapping[str, int] | None = None,
 ) -> Sequence[Publication]:
-    if sort_by_citations:
+    if sort_by is None:
+        sort_by = SortBy.CITATIONS if sort_by_citations else SortBy.AGE
+
+    if sort_by == SortBy.CITATIONS:
         if max_age is None:
             publications = obj.topk_cited(k=n)
         else:
             publications = obj.topk_cited_not_older_than(k=n, age=max_age)
-    else:
+    elif sort_by == SortBy.AGE:
         if max_age is None:
             publications = obj.topk_age(k=n)
         else:
             publications = obj.topk_age_not_older_than(k=n, age=max_age)
+    else:
+        if max_age is None:
+            candidates = obj.publications
+        else:
+            candidates = obj.publications_not_older_than(max_age)
+        authors: Sequence[Author] = []
+        if isinstance(obj, (Department, LazyDepartment)):
+            authors = obj.authors
+        elif isinstance(obj, Author):
+            authors = [obj]
+        publications = rank(candidates, sort_by, k=n, authors=authors, previous=previous)
 
     return publications
 
@@ -78,17 +118,118 @@ def search_author(
     return authors
 
 
+def get_author_by_id(
+    scholar_id: str, backend: APIBackend = APIBackend.SCRAPER
+) -> AuthorInfo | None:
+    """Get the author from the profile page, which skips the search page"""
+    if backend == APIBackend.SCRAPER:
+        return scraper.get_author_by_id(scholar_id)
+    elif backend == APIBackend.SCHOLARLY:
+        return scholarly.get_author_by_id(scholar_id)
+    else:
+        raise ValueError(f"Unknown backend {backend}")
+
+
+def negative_cache_file(cache_dir: Path | str) -> Path:
+    return Path(cache_dir) / "not_found.json"
+
+
+def _load_negative_cache(cache_dir: Path | str) -> dict[str, str]:
+    path = negative_cache_file(cache_dir)
+    if not path.is_file():
+        return {}
+    now = datetime.datetime.now()
+    return {
+        key: date
+        for key, date in json.loads(path.read_text()).items()
+        if now - datetime.datetime.fromisoformat(date) < NEGATIVE_CACHE_TTL
+    }
+
+
+def search_authors(
+    names: Sequence[str],
+    scholar_ids: Sequence[str] = (),
+    backend: APIBackend = APIBackend.SCRAPER,
+    max_workers: int = 4,
+    cache_dir: Path | str | None = None,
+    errors: dict[str, Exception] | None = None,
+) -> list[list[AuthorInfo]]:
+    """Resolve many authors at once and return the matching authors for
+    each name. ``scholar_ids`` is aligned with ``names`` where an empty
+    string means that the scholar id is unknown.
+
+    Duplicate queries are only looked up once, and authors with a known
+    scholar id are fetched directly from the profile page. The lookups run
+    concurrently. If ``cache_dir`` is given, queries without any match
+    are remembered for ``NEGATIVE_CACHE_TTL`` and are not looked up again.
+    Lookups that fail, e.g because the requests are blocked, have no
+    matches and are recorded by name in ``errors`` if it is given.
+    """
+    if len(scholar_ids) == 0:
+        scholar_ids = [""] * len(names)
+    if len(scholar_ids) != len(names):
+        raise ValueError("names and scholar_ids must have the same length")
+
+    def key(name: str, scholar_id: str) -> str:
+        return f"{backend.value}:{scholar_id or name.lower().strip()}"
+
+    not_found = _load_negative_cache(cache_dir) if cache_dir is not None else {}
+    queries: dict[str, tuple[str, str]] = {}
+    for name, scholar_id in zip(names, scholar_ids):
+        k = key(name, scholar_id)
+        if k not in not_found:
+            queries.setdefault(k, (name, scholar_id))
+
+    def lookup(query: tuple[str, str]) -> list[AuthorInfo] | Exception:
+        name, scholar_id = query
+        try:
+            if scholar_id != "":
+                author = get_author_by_id(scholar_id, backend=backend)
+                return [] if author is None else [author]
+            return search_author(name, backend=backend)
+        except Exception as e:
+            # Do not remember failed lookups as not found
+            logger.warning(f"Unable to search for {name or scholar_id}: {e}")
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = dict(zip(queries, executor.map(lookup, queries.values())))
+
+    if cache_dir is not None:
+        now = datetime.datetime.now().isoformat()
+        new_not_found = {k: now for k, result in results.items() if result == []}
+        if new_not_found:
+            not_found.update(new_not_found)
+            Path(cache_dir).mkdir(parents=True, exist_ok=True)
+            negative_cache_file(cache_dir).write_text(json.dumps(not_found, indent=4))
+
+    matches: list[list[AuthorInfo]] = []
+    for name, scholar_id in zip(names, scholar_ids):
+        result = results.get(key(name, scholar_id), [])
+        if isinstance(result, Exception):
+            if errors is not None:
+                errors[name] = result
+            result = []
+        matches.append(result)
+    return matches
+
+
 def search_author_with_publications(
     name: str,
     scholar_id: str,
     full: bool = False,
     backend: APIBackend = APIBackend.SCRAPER,
+    checkpoint: CrawlCheckpoint | None = None,
 ) -> Author:
+    """Fetch the author together with all publications. With the scraper
+    backend the crawl can be resumed from the given checkpoint, while
+    the scholarly backend fetches all publications in one request."""
     if backend == APIBackend.SCRAPER:
         author = scraper.search_author_with_publications(
             name,
             scholar_id,
             full=full,
+            checkpoint=checkpoint,
         )
     elif backend == APIBackend.SCHOLARLY:
         author = scholarly.search_author_with_publications(
@@ -102,12 +243,67 @@ def search_author_with_publications(
     return author
 
 
+def fetch_authors(
+    authors: Mapping[str, str],
+    full: bool = False,
+    backend: APIBackend = APIBackend.SCRAPER,
+    max_workers: int = 4,
+    errors: dict[str, Exception] | None = None,
+) -> list[Author]:
+    """Fetch many authors with their publications concurrently, where
+    ``authors`` maps the names to the scholar ids. With ``full`` and the
+    scraper backend the article pages of publications shared by several
+    authors are only fetched once. If ``errors`` is given, authors that fail are recorded
+    there by name and left out of the result, otherwise the first failure
+    is raised."""
+    if backend == APIBackend.SCRAPER:
+        scraper_errors: dict[str, Exception] | None = None if errors is None else {}
+        result = scraper.fetch_authors_by_id(
+            authors.values(), full=full, max_workers=max_workers, errors=scraper_errors
+        )
+        if errors is not None and scraper_errors:
+            names = {scholar_id: name for name, scholar_id in authors.items()}
+            errors.update({names[k]: e for k, e in scraper_errors.items()})
+        return result
+    elif backend != APIBackend.SCHOLARLY:
+        raise ValueError(f"Unknown backend {backend}")
+
+    def fetch(item: tuple[str, str]) -> Author | Exception:
+        name, scholar_id = item
+        try:
+            return search_author_with_publications(
+                name=name, scholar_id=scholar_id, full=full, backend=backend
+            )
+        except Exception as e:
+            if errors is None:
+                raise
+            return e
+
+    authors_with_pubs = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for name, author in zip(authors, executor.map(fetch, authors.items())):
+            if isinstance(author, Exception):
+                assert errors is not None
+                errors[name] = author
+            else:
+                authors_with_pubs.append(author)
+    return authors_with_pubs
+
+
 def fill_publication(
-    publication: Publication, backend: APIBackend = APIBackend.SCRAPER
+    publication: Publication,
+    backend: APIBackend = APIBackend.SCRAPER,
+    cache_dir: str | None = None,
 ) -> Publication:
+    """Fetch the remaining fields of the publication, e.g the abstract. If
+    ``cache_dir`` is given the filled publication is updated in its search index."""
     if backend == APIBackend.SCRAPER:
-        return scraper.fill_publication(publication)
+        filled = scraper.fill_publication(publication)
     elif backend == APIBackend.SCHOLARLY:
-        return scholarly.fill_publication(publication)
+        filled = scholarly.fill_publication(publication)
     else:
         raise ValueError(f"Unknown backend {backend}")
+
+    if cache_dir is not None:
+        search.index_publication(filled, cache_dir=cache_dir)
+    return filled
@@ -0,0 +1,92 @@
+"""
+Plain HTTP navigator used by the scraper when ``PYSCHOLAR_SCHOLAR_URL``
+points at another server than Google Scholar, e.g ``scholar mock-server``.
+
+Unlike the scholarly navigator it does not wait between requests or try
+to solve CAPTCHAs, it only retries with exponential backoff when it is
+rate limited or gets a CAPTCHA page. UTF-8 pages are returned as the raw
+body, so that they are parsed without being decoded first.
+"""
+
+from __future__ import annotations
+from typing import Callable
+import codecs
+import threading
+import time
+
+import httpx
+from scholarly import MaxTriesExceededException
+from structlog import get_logger
+
+from .replay import Page
+
+logger = get_logger()
+
+# Markers of the CAPTCHA pages served by Google Scholar
+CAPTCHA_MARKERS = ("gs_captcha_f", "g-recaptcha")
+_CAPTCHA_MARKERS_BYTES = tuple(marker.encode() for marker in CAPTCHA_MARKERS)
+RETRY_STATUS_CODES = (429, 503)
+
+
+def has_captcha(page: Page) -> bool:
+    if isinstance(page, bytes):
+        return any(marker in page for marker in _CAPTCHA_MARKERS_BYTES)
+    return any(marker in page for marker in CAPTCHA_MARKERS)
+
+
+def response_page(response: httpx.Response) -> Page:
+    """The body of the response, decoded only if it is not UTF-8"""
+    encoding = response.charset_encoding
+    if encoding is not None and codecs.lookup(encoding).name == "utf-8":
+        return response.content
+    return response.text
+
+
+class HTTPNavigator:
+    def __init__(
+        self,
+        retries: int = 5,
+        backoff: float = 0.1,
+        timeout: float = 10.0,
+        max_connections: int = 16,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.retries = retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self.client = httpx.Client(
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_connections),
+        )
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retried = 0
+
+    def _wait(self, attempt: int, response: httpx.Response) -> None:
+        try:
+            delay = float(response.headers["Retry-After"])
+        except (KeyError, ValueError):
+            delay = self.backoff * 2**attempt
+        with self._lock:
+            self.retried += 1
+        if delay > 0:
+            self.sleep(delay)
+
+    def _get_page(self, link: str) -> Page:
+        for attempt in range(self.retries):
+            with self._lock:
+                self.requests += 1
+            response = self.client.get(link)
+            if response.status_code == 200:
+                page = response_page(response)
+                if not has_captcha(page):
+                    return page
+            if response.status_code != 200 and response.status_code not in RETRY_STATUS_CODES:
+                raise MaxTriesExceededException(f"Got status {response.status_code} for {link}")
+            logger.debug(f"Got status {response.status_code} for {link}, retrying")
+            self._wait(attempt, response)
+        raise MaxTriesExceededException(f"Could not fetch {link} in {self.retries} tries")
+
+    def close(self) -> None:
+        self.client.close()
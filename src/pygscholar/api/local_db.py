@@ -6,6 +6,8 @@ import json
 from scholarly._navigator import Navigator
 from selectolax.lexbor import LexborHTMLParser
 
+from .replay import Page, UnknownURLError, as_text, normalize_url
+
 
 @dataclass
 class LocalNavigator:
@@ -21,12 +23,20 @@ class LocalNavigator:
             self._db = {}
         else:
             self._db = json.loads(self.dbname.read_text())
+        self._normalized = {normalize_url(url): url for url in self._db}
 
-    def _get_page(self, link: str):
-        return self._db.get(link, None)
+    def _get_page(self, link: str) -> str:
+        if link in self._db:
+            return self._db[link]
+        # Match URLs that only differ in the order of the parameters
+        url = self._normalized.get(normalize_url(link))
+        if url is not None:
+            return self._db[url]
+        raise UnknownURLError(f"No page for {link} in {self.dbname}")
 
-    def insert_page(self, link: str, page_source: str):
-        self._db[link] = page_source
+    def insert_page(self, link: str, page_source: Page):
+        self._db[link] = as_text(page_source)
+        self._normalized[normalize_url(link)] = link
         self.dbname.write_text(json.dumps(self._db, indent=2))
 
     def search_author(self, name: str, driver: Navigator | None = None) -> str:
@@ -0,0 +1,127 @@
+"""
+Record and replay the pages fetched from Google Scholar.
+
+Set ``PYSCHOLAR_RECORD`` to a file to record every page fetched by the
+scraper backend, and ``PYSCHOLAR_REPLAY`` to a recorded file to serve the
+pages from the file instead of Google Scholar. The pages are stored as
+JSON lines with one page per line, and are kept UTF-8 encoded in memory
+so that they are passed to the parser without decoding them. URLs are normalized before matching so
+that the order of the query parameters and the language and country
+parameters do not matter.
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Callable, Union
+from urllib.parse import parse_qsl, urlencode, urlparse
+import json
+import random
+import threading
+import time
+
+from scholarly import MaxTriesExceededException
+from structlog import get_logger
+
+logger = get_logger()
+
+# Query parameters that do not change the content of the page
+IGNORED_PARAMETERS = ("hl", "gl")
+
+
+# Pages are either text, or the raw UTF-8 encoded body which the parser
+# reads directly
+Page = Union[str, bytes]
+
+
+def as_text(page: Page) -> str:
+    return page if isinstance(page, str) else page.decode()
+
+
+def as_bytes(page: Page) -> bytes:
+    return page.encode() if isinstance(page, str) else page
+
+
+class UnknownURLError(LookupError):
+    """Raised when replaying a URL that was not recorded"""
+
+
+def normalize_url(url: str) -> str:
+    parsed = urlparse(url)
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if key not in IGNORED_PARAMETERS
+    )
+    # The host is left out so that the pages can be served from another
+    # base URL, e.g by ``scholar mock-server``
+    return f"{parsed.path}?{urlencode(query)}"
+
+
+def load_store(path: Path | str) -> dict[str, bytes]:
+    pages: dict[str, bytes] = {}
+    path = Path(path)
+    if not path.is_file():
+        return pages
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                pages[normalize_url(record["url"])] = record["page"].encode()
+    return pages
+
+
+class RecordingNavigator:
+    """Fetch the pages with ``driver`` and append them to the store"""
+
+    def __init__(self, path: Path | str, driver: Any) -> None:
+        self.path = Path(path)
+        self.driver = driver
+        self._lock = threading.Lock()
+
+    def _get_page(self, link: str) -> Page:
+        page = self.driver._get_page(link)
+        record = {"url": normalize_url(link), "page": as_text(page)}
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        return page
+
+
+class ReplayNavigator:
+    """Serve the pages from the store, optionally with a simulated latency
+    of ``latency`` plus up to ``jitter`` seconds, and failing a fraction
+    ``error_rate`` of the requests the same way as the scholarly navigator
+    does when Google Scholar blocks the requests."""
+
+    def __init__(
+        self,
+        path: Path | str,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.pages = load_store(path)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.sleep = sleep
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def _get_page(self, link: str) -> bytes:
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self.jitter * self._random.random()
+            fail = self._random.random() < self.error_rate
+        if delay > 0:
+            self.sleep(delay)
+        if fail:
+            raise MaxTriesExceededException(f"Simulated error for {link}")
+        key = normalize_url(link)
+        if key not in self.pages:
+            raise UnknownURLError(f"No recorded page for {link}")
+        return self.pages[key]
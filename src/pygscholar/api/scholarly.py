@@ -2,21 +2,143 @@ from __future__ import annotations
 
 from concurrent.futures import ThreadPoolExecutor
 from typing import Any
+from typing import Callable
 from typing import Dict
+from typing import Sequence
+import itertools
+import threading
 
+import httpx
+import requests
+from scholarly import ProxyGenerator
 from scholarly import scholarly
+from scholarly._navigator import Navigator
+from scholarly._proxy_generator import DOSException, MaxTriesExceededException
+from scholarly.author_parser import AuthorParser
+from scholarly.publication_parser import PublicationParser
 from structlog import get_logger
 
+from .. import config
 from ..author import Author, AuthorInfo
 from ..publication import Publication
 
 
 logger = get_logger()
 
+# Errors from the network or from being blocked by Google Scholar, which
+# are worth retrying on another session
+RETRY_EXCEPTIONS = (
+    MaxTriesExceededException,
+    DOSException,
+    requests.exceptions.RequestException,
+    httpx.HTTPError,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+def new_navigator(proxy: str | None = None) -> Navigator:
+    """Create a navigator with its own session. The navigator used by
+    ``scholarly`` is a singleton, so we bypass the metaclass to get
+    separate sessions."""
+    nav = Navigator.__new__(Navigator)
+    nav.__init__()
+    if proxy is not None:
+        pg = ProxyGenerator()
+        if not pg.SingleProxy(http=proxy, https=proxy):
+            raise RuntimeError(f"Proxy {proxy} is not working")
+        nav.use_proxy(pg, pg)
+    return nav
+
+
+class SessionPool:
+    """Pool of sessions, each with its own proxy, that the requests of the
+    scholarly backend rotate across. At most ``max_workers`` requests are
+    running at the same time. A request that fails with one of
+    ``RETRY_EXCEPTIONS`` is retried on the next session up to ``retries``
+    times, and the failed session is replaced by a new one."""
+
+    def __init__(
+        self,
+        proxies: Sequence[str | None] = (None,),
+        max_workers: int = config.SCHOLARLY_MAX_WORKERS,
+        retries: int = 3,
+        navigator_factory: Callable[[str | None], Any] = new_navigator,
+    ) -> None:
+        if len(proxies) == 0:
+            proxies = (None,)
+        self.proxies = list(proxies)
+        self.max_workers = max_workers
+        self.retries = retries
+        self.navigator_factory = navigator_factory
+        self._navigators: dict[int, Any] = {}
+        self._cycle = itertools.cycle(range(len(self.proxies)))
+        self._lock = threading.Lock()
+        # Shared by all callers of the pool, which may run their own threads
+        self._slots = threading.BoundedSemaphore(max_workers)
+
+    @classmethod
+    def from_config(cls) -> "SessionPool":
+        proxies = [p.strip() for p in config.SCHOLARLY_PROXIES.split(",") if p.strip()]
+        return cls(proxies=proxies or (None,), max_workers=config.SCHOLARLY_MAX_WORKERS)
+
+    def next_navigator(self) -> tuple[int, Any]:
+        with self._lock:
+            index = next(self._cycle)
+            if index not in self._navigators:
+                self._navigators[index] = self.navigator_factory(self.proxies[index])
+            return index, self._navigators[index]
+
+    def discard(self, index: int, nav: Any) -> None:
+        """Drop the session so that the next request with this proxy
+        starts a new one"""
+        with self._lock:
+            if self._navigators.get(index) is nav:
+                del self._navigators[index]
+
+    def run(self, func: Callable[[Any, Dict[str, Any]], Dict[str, Any]], item: Dict[str, Any]):
+        """Call ``func(navigator, item)``, retrying on a different session"""
+        error: Exception | None = None
+        for attempt in range(self.retries + 1):
+            index, nav = self.next_navigator()
+            try:
+                with self._slots:
+                    return func(nav, item)
+            except RETRY_EXCEPTIONS as e:
+                logger.warning(f"Request failed (attempt {attempt + 1}): {e}")
+                self.discard(index, nav)
+                error = e
+        assert error is not None
+        raise error
+
+    def fill_publication(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        return self.run(lambda nav, item: PublicationParser(nav).fill(item), item)
+
+    def fill_author(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        def fill(nav: Any, item: Dict[str, Any]) -> Dict[str, Any]:
+            author = AuthorParser(nav).fill(item)
+            if author is False:
+                raise ValueError("Incorrect input")
+            return author
+
+        return self.run(fill, item)
+
+
+_default_pool: SessionPool | None = None
+
+
+def default_pool() -> SessionPool:
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = SessionPool.from_config()
+    return _default_pool
 
-def to_publication(item: Dict[str, Any], full: bool = False) -> Publication:
+
+def to_publication(
+    item: Dict[str, Any], full: bool = False, pool: SessionPool | None = None
+) -> Publication:
     if full:
-        item = scholarly.fill(item)
+        item = (pool or default_pool()).fill_publication(item)
     kwargs = {
         "title": item.get("bib", {}).get("title", ""),
         "year": item.get("bib", {}).get("pub_year", 0),
@@ -64,18 +186,24 @@ def get_author(name: str, scholar_id: str = "") -> AuthorInfo | None:
     return None
 
 
-def search_author_with_publications(name: str, scholar_id: str = "", full: bool = True) -> Author:
+def search_author_with_publications(
+    name: str,
+    scholar_id: str = "",
+    full: bool = True,
+    pool: SessionPool | None = None,
+) -> Author:
     author = get_author(name, scholar_id)
 
     if author is None:
         raise RuntimeError(f"Could not find author '{name}' with id '{scholar_id}'")
 
-    author_data = scholarly.fill(author.data)
+    pool = pool or default_pool()
+    author_data = pool.fill_author(author.data)
 
     results = []
-    with ThreadPoolExecutor() as executor:
+    with ThreadPoolExecutor(max_workers=pool.max_workers) as executor:
         for item in author_data["publications"]:
-            results.append(executor.submit(to_publication, item, full))
+            results.append(executor.submit(to_publication, item, full, pool))
 
     publications: list[Publication] = [result.result() for result in results]
     return Author(info=author, publications=publications)
@@ -103,6 +231,13 @@ def fill_publication(publication: Publication) -> Publication:
         return publication
 
 
+def get_author_by_id(scholar_id: str) -> AuthorInfo | None:
+    try:
+        return to_author_info(scholarly.search_author_id(scholar_id))
+    except (AttributeError, IndexError):
+        return None
+
+
 def search_author(name: str) -> list[AuthorInfo]:
     query = scholarly.search_author(name)
     authors = []
@@ -1,21 +1,84 @@
 from __future__ import annotations
-from typing import Any, Protocol
+from typing import TYPE_CHECKING, Any, Callable, Generic, Hashable, Iterable, Protocol
+from typing import TypeVar
+import functools
 import os
-from concurrent.futures import ThreadPoolExecutor
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from structlog import get_logger
 from selectolax.lexbor import LexborHTMLParser, LexborNode
 from scholarly._navigator import Navigator
 
+from .. import config
 from ..author import AuthorInfo, Author
-from ..publication import Publication
+from ..publication import Publication, title_fingerprint
+from .http_navigator import HTTPNavigator
 from .local_db import LocalNavigator
+from .replay import Page, RecordingNavigator, ReplayNavigator
 
+if TYPE_CHECKING:
+    from ..checkpoint import CrawlCheckpoint
 
 logger = get_logger()
 
+T = TypeVar("T")
+
 
 class NavigatorType(Protocol):
-    def _get_page(self, link: str) -> str: ...
+    """Fetches the page at the link, either as text or as the UTF-8 encoded
+    body which is passed to the parser as it is"""
+
+    def _get_page(self, link: str) -> Page: ...
+
+
+@functools.lru_cache
+def _replay_navigator(path: str, latency: float, error_rate: float) -> ReplayNavigator:
+    return ReplayNavigator(path, latency=latency, error_rate=error_rate)
+
+
+@functools.lru_cache
+def _http_navigator(base_url: str) -> HTTPNavigator:
+    return HTTPNavigator()
+
+
+def _navigator() -> NavigatorType:
+    if config.SCHOLAR_URL != config.DEFAULT_SCHOLAR_URL:
+        # One client, and hence one connection pool, per base URL
+        return _http_navigator(config.SCHOLAR_URL)
+    return Navigator()
+
+
+@functools.lru_cache
+def _recording_navigator(path: str) -> RecordingNavigator:
+    return RecordingNavigator(path, _navigator())
+
+
+def get_default_driver() -> NavigatorType:
+    """The navigator used when no driver is given. This is determined by
+    the environment variables
+
+    - ``PYSCHOLAR_REPLAY``: Serve the pages recorded in this file, with
+      ``PYSCHOLAR_REPLAY_LATENCY`` seconds of latency per request and a
+      fraction ``PYSCHOLAR_REPLAY_ERROR_RATE`` of failed requests
+    - ``LOCAL_DBPATH``: Serve the pages from a database created with
+      ``scholar generate-test-data``
+    - ``PYSCHOLAR_RECORD``: Fetch the pages from Google Scholar and record
+      them in this file
+
+    and otherwise the pages are fetched from Google Scholar, or from
+    ``PYSCHOLAR_SCHOLAR_URL`` if it is set, e.g to use ``scholar mock-server``.
+    """
+    if os.getenv("PYSCHOLAR_REPLAY"):
+        return _replay_navigator(
+            os.environ["PYSCHOLAR_REPLAY"],
+            float(os.getenv("PYSCHOLAR_REPLAY_LATENCY", "0")),
+            float(os.getenv("PYSCHOLAR_REPLAY_ERROR_RATE", "0")),
+        )
+    if os.getenv("LOCAL_DBPATH"):
+        return LocalNavigator(os.getenv("LOCAL_DBPATH"))
+    if os.getenv("PYSCHOLAR_RECORD"):
+        return _recording_navigator(os.environ["PYSCHOLAR_RECORD"])
+    return _navigator()
 
 
 def to_publication(item: dict[str, Any]) -> Publication:
@@ -59,18 +122,12 @@ def get_extra_article_info(link: str | None, driver: NavigatorType | None = None
     logger.debug(f"Getting extra info for {link}")
 
     if driver is None:
-        driver = (
-            Navigator()
-            if not os.getenv("LOCAL_DBPATH")
-            else LocalNavigator(os.getenv("LOCAL_DBPATH"))
-        )
+        driver = get_default_driver()
 
     if link is None:
         return {}
 
-    page_source = driver._get_page(link)
-    parser = LexborHTMLParser(page_source)
-
+    parser = LexborHTMLParser(driver._get_page(link))
     fields = [g.text() for g in parser.css(".gsc_oci_field")]
     values = [g.text() for g in parser.css(".gsc_oci_value")]
     extra_info: dict[str, Any] = dict(zip(fields, values))
@@ -79,6 +136,7 @@ def get_extra_article_info(link: str | None, driver: NavigatorType | None = None
     except AttributeError:
         logger.debug("Could not find PDF link")
         extra_info["pdf_link"] = ""
+    del parser
 
     return {k.replace(" ", "_").lower(): v for k, v in extra_info.items()}
 
@@ -92,71 +150,171 @@ _publication_fields = {
 }
 
 
-def process_article(
-    article: LexborNode,
-    full: bool = True,
-    driver: NavigatorType | None = None,
-) -> dict[str, Any]:
-    if driver is None:
-        driver = (
-            Navigator()
-            if not os.getenv("LOCAL_DBPATH")
-            else LocalNavigator(os.getenv("LOCAL_DBPATH"))
-        )
-
+def parse_article(article: LexborNode) -> dict[str, Any]:
+    """Extract the fields of an article row into a plain dict, so that the
+    parser can be released"""
     article_dict = {
         value: getattr(article.css_first(key), "text", lambda: None)()
         for key, value in _publication_fields.items()
     }
     try:
-        article_dict["link"] = (
-            f"https://scholar.google.com{article.css_first('.gsc_a_at').attrs['href']}"
-        )
+        article_dict["link"] = f"{config.SCHOLAR_URL}{article.css_first('.gsc_a_at').attrs['href']}"
     except AttributeError:
         article_dict["link"] = None
+    return article_dict
+
+
+def process_article(
+    article: LexborNode,
+    full: bool = True,
+    driver: NavigatorType | None = None,
+) -> dict[str, Any]:
+    if driver is None:
+        driver = get_default_driver()
 
+    article_dict = parse_article(article)
     if full:
         article_dict["extra"] = get_extra_article_info(article_dict["link"], driver)
     return article_dict
 
 
+def profile_url(scholar_id: str, page_num: int = 0) -> str:
+    return (
+        f"{config.SCHOLAR_URL}/citations?user={scholar_id}"
+        f"&hl=en&gl=us&cstart={page_num}&pagesize=100"
+    )
+
+
+# Maximum number of article pages that are downloaded and parsed at the
+# same time when fetching the extra info of the articles, i.e the size of
+# the thread pool used for the article pages
+MAX_IN_FLIGHT = int(os.getenv("PYSCHOLAR_MAX_IN_FLIGHT", "8"))
+
+
+class SingleFlight(Generic[T]):
+    """Call a function at most once per key. Concurrent calls with the same
+    key wait for the first call and share its result, and later calls get
+    the memoized result. Failures are not memoized."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._results: dict[Hashable, Future[T]] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._results.get(key)
+            if future is None:
+                future = self._results[key] = Future()
+                self.calls += 1
+                owner = True
+            else:
+                self.shared += 1
+                owner = False
+        if not owner:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            with self._lock:
+                del self._results[key]
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result
+
+
+def article_key(article: dict[str, Any]) -> Hashable:
+    """Key of the article page of an article, used to fetch the page of a
+    paper on several profiles once. The citation id on Google Scholar
+    contains the id of the profile, so the article is identified by the
+    fingerprint of the title together with the year and the author list,
+    since different papers can have the same title."""
+    return (
+        title_fingerprint(article["title"]),
+        article.get("publication_year"),
+        article.get("authors"),
+    )
+
+
+def parse_articles_page(page_source: Page) -> tuple[list[dict[str, Any]], bool]:
+    """The articles on a page of the profile, and whether it is the last
+    page. The page and the parser are released when this returns."""
+    parser = LexborHTMLParser(page_source)
+    articles = [parse_article(article) for article in parser.css(".gsc_a_tr")]
+    return articles, parser.css_first(".gsc_a_e") is not None
+
+
 def extract_all_articles(
-    scholar_id: str, full: bool = True, driver: NavigatorType | None = None
+    scholar_id: str,
+    full: bool = True,
+    driver: NavigatorType | None = None,
+    checkpoint: CrawlCheckpoint | None = None,
+    first_page: Page | None = None,
+    executor: Executor | None = None,
+    pages: SingleFlight[dict[str, Any]] | None = None,
 ) -> list[dict[str, Any]]:
+    """Extract the articles from all pages of the profile. If the first page
+    has already been downloaded it can be passed as ``first_page``, in which
+    case it is kept alive by the caller.
+
+    Each fetched page is parsed into plain dicts and released before the
+    next page is fetched. With ``full`` the extra info of the articles is
+    fetched using ``executor``, by default a pool of ``MAX_IN_FLIGHT`` threads.
+    If ``pages`` is given the article pages are shared through it, see
+    ``fetch_authors_by_id``."""
     logger.debug(f"Extracting all articles for {scholar_id}")
     if driver is None:
-        driver = (
-            Navigator()
-            if not os.getenv("LOCAL_DBPATH")
-            else LocalNavigator(os.getenv("LOCAL_DBPATH"))
-        )
+        driver = get_default_driver()
     page_num = 0
-    articles = []
+    articles: list[dict[str, Any]] = []
+    if checkpoint is not None:
+        if checkpoint.full != full:
+            raise ValueError(f"Checkpoint of {scholar_id} was not created with full={full}")
+        page_num, articles = checkpoint.load()
     EOF = False
 
-    while not EOF:
-        page_source = driver._get_page(
-            f"https://scholar.google.com/citations?user={scholar_id}&hl=en&gl=us&cstart={page_num}&pagesize=100"
-        )
-        parser = LexborHTMLParser(page_source)
-
-        if full:
-            # Use ThreadPoolExecutor to speed up the process
-            results = []
-            with ThreadPoolExecutor() as executor:
-                for article in parser.css(".gsc_a_tr"):
-                    results.append(executor.submit(process_article, article, full))
+    own_executor = full and executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT)
 
-            for result in results:
-                articles.append(result.result())
+    def add_extra(article: dict[str, Any]) -> dict[str, Any]:
+        if pages is None or article["title"] is None:
+            article["extra"] = get_extra_article_info(article["link"], driver)
         else:
-            for article in parser.css(".gsc_a_tr"):
-                articles.append(process_article(article, full, driver))
+            article["extra"] = pages.do(
+                article_key(article),
+                lambda: get_extra_article_info(article["link"], driver),
+            )
+        return article
 
-        if parser.css_first(".gsc_a_e"):
-            EOF = True
-        else:
-            page_num += 100  # paginate to the next page
+    try:
+        while not EOF:
+            if page_num == 0 and first_page is not None:
+                page_articles, EOF = parse_articles_page(first_page)
+            else:
+                page_articles, EOF = parse_articles_page(
+                    driver._get_page(profile_url(scholar_id, page_num))
+                )
+
+            if full:
+                assert executor is not None
+                page_articles = list(executor.map(add_extra, page_articles))
+            articles.extend(page_articles)
+
+            if not EOF:
+                page_num += 100  # paginate to the next page
+                if checkpoint is not None:
+                    checkpoint.save(page_num, articles)
+    finally:
+        if own_executor:
+            assert executor is not None
+            executor.shutdown()
+
+    if checkpoint is not None:
+        checkpoint.clear()
     return articles
 
 
@@ -167,7 +325,7 @@ def extract_co_authors(parser: LexborHTMLParser) -> list[dict[str, str]]:
         co_authors.append(
             {
                 "name": co_author.css_first(".gsc_rsb_a_desc a").text(),
-                "profile_link": f"https://scholar.google.com{co_author.css_first('.gsc_rsb_a_desc a').attrs['href']}",  # noqa: E501
+                "profile_link": f"{config.SCHOLAR_URL}{co_author.css_first('.gsc_rsb_a_desc a').attrs['href']}",  # noqa: E501
                 "affiliation": co_author.css_first(".gsc_rsb_a_ext").text(),
             }
         )
@@ -177,17 +335,13 @@ def extract_co_authors(parser: LexborHTMLParser) -> list[dict[str, str]]:
 def extract_author_info(scholar_id: str, driver: NavigatorType | None = None) -> dict[str, Any]:
     logger.debug("Extracting author info")
     if driver is None:
-        driver = (
-            Navigator()
-            if not os.getenv("LOCAL_DBPATH")
-            else LocalNavigator(os.getenv("LOCAL_DBPATH"))
-        )
+        driver = get_default_driver()
+
+    page_source = driver._get_page(profile_url(scholar_id))
+    return parse_author_info(LexborHTMLParser(page_source))
 
-    page_source = driver._get_page(
-        f"https://scholar.google.com/citations?user={scholar_id}&hl=en&gl=us&pagesize=100"
-    )
-    parser = LexborHTMLParser(page_source)
 
+def parse_author_info(parser: LexborHTMLParser) -> dict[str, Any]:
     info: dict[str, Any] = {
         "info": {},
         "co-authors": [],
@@ -217,19 +371,16 @@ def extract_author_info(scholar_id: str, driver: NavigatorType | None = None) ->
     return info
 
 
+def search_url(name: str) -> str:
+    query = name.lower().replace(" ", "+")
+    return f"{config.SCHOLAR_URL}/scholar?hl=en&as_sdt=0%2C5&q={query}"
+
+
 def search_author(name: str, driver: NavigatorType | None = None) -> list[AuthorInfo]:
     logger.info(f"Searching for author {name}")
     if driver is None:
-        driver = (
-            Navigator()
-            if not os.getenv("LOCAL_DBPATH")
-            else LocalNavigator(os.getenv("LOCAL_DBPATH"))
-        )
-    query = name.lower().replace(" ", "+")
-
-    page_source = driver._get_page(
-        f"https://scholar.google.com/scholar?hl=en&as_sdt=0%2C5&q={query}"
-    )
+        driver = get_default_driver()
+    page_source = driver._get_page(search_url(name))
 
     parser = LexborHTMLParser(page_source)
 
@@ -262,15 +413,11 @@ def search_author(name: str, driver: NavigatorType | None = None) -> list[Author
 def search_author_orig(name: str, driver: NavigatorType | None = None) -> list[AuthorInfo]:
     logger.info(f"Searching for author {name}")
     if driver is None:
-        driver = (
-            Navigator()
-            if not os.getenv("LOCAL_DBPATH")
-            else LocalNavigator(os.getenv("LOCAL_DBPATH"))
-        )
+        driver = get_default_driver()
     query = name.lower().replace(" ", "+")
 
     page_source = driver._get_page(
-        f"https://scholar.google.com/citations?view_op=search_authors&hl=en&mauthors={query}"
+        f"{config.SCHOLAR_URL}/citations?view_op=search_authors&hl=en&mauthors={query}"
     )
     parser = LexborHTMLParser(page_source)
 
@@ -316,6 +463,29 @@ def get_author(
     return None
 
 
+def get_author_by_id(scholar_id: str, driver: NavigatorType | None = None) -> AuthorInfo | None:
+    """Get the author info directly from the profile page, without searching"""
+    logger.info(f"Get author info for {scholar_id}")
+    try:
+        info = extract_author_info(scholar_id, driver=driver)
+    except (AttributeError, IndexError):
+        # The profile page does not exist
+        return None
+    return to_author_info(scholar_id, info)
+
+
+def to_author_info(scholar_id: str, info: dict[str, Any]) -> AuthorInfo:
+    return AuthorInfo(
+        name=info["info"]["name"],
+        scholar_id=scholar_id,
+        link=f"/citations?user={scholar_id}&hl=en",
+        affiliation=info["info"]["affiliations"],
+        email=info["info"]["email"],
+        cited_by=info["info"]["citations"]["all"],
+        data=info,
+    )
+
+
 def update_author_info(author: AuthorInfo, driver: Navigator) -> AuthorInfo:
     logger.info(f"Updating author info for {author.name}")
     info = extract_author_info(author.scholar_id, driver=driver)
@@ -329,41 +499,100 @@ def search_author_with_publications(
     scholar_id: str = "",
     full: bool = False,
     driver: NavigatorType | None = None,
+    checkpoint: CrawlCheckpoint | None = None,
 ) -> Author:
     if driver is None:
-        driver = (
-            Navigator()
-            if not os.getenv("LOCAL_DBPATH")
-            else LocalNavigator(os.getenv("LOCAL_DBPATH"))
-        )
+        driver = get_default_driver()
+
+    if scholar_id == "":
+        author = get_author(name, driver=driver)
+        if author is None:
+            raise RuntimeError(f"Could not find author '{name}'")
+        scholar_id = author.scholar_id
+
+    return fetch_author_by_id(scholar_id, full=full, driver=driver, checkpoint=checkpoint)
 
-    author = get_author(name, scholar_id, driver=driver)
 
-    if author is None:
-        raise RuntimeError(f"Could not find author '{name}' with id '{scholar_id}'")
+def fetch_author_by_id(
+    scholar_id: str,
+    full: bool = False,
+    driver: NavigatorType | None = None,
+    checkpoint: CrawlCheckpoint | None = None,
+    executor: Executor | None = None,
+    pages: SingleFlight[dict[str, Any]] | None = None,
+) -> Author:
+    """Fetch the author without searching. The first page of the profile
+    is used both for the author info and the first articles."""
+    if driver is None:
+        driver = get_default_driver()
 
-    publications = list(
-        map(
-            to_publication,
-            filter(
-                lambda x: x["title"] is not None,
-                extract_all_articles(author.scholar_id, full=full, driver=driver),
-            ),
+    first_page = driver._get_page(profile_url(scholar_id))
+    try:
+        info = parse_author_info(LexborHTMLParser(first_page))
+    except (AttributeError, IndexError, TypeError) as e:
+        raise RuntimeError(f"Could not find author with id '{scholar_id}'") from e
+
+    publications = [
+        to_publication(article)
+        for article in extract_all_articles(
+            scholar_id,
+            full=full,
+            driver=driver,
+            checkpoint=checkpoint,
+            first_page=first_page,
+            executor=executor,
+            pages=pages,
         )
-    )
+        if article["title"] is not None
+    ]
+    return Author(info=to_author_info(scholar_id, info), publications=publications)
 
-    info = update_author_info(author, driver=driver)
 
-    return Author(info=info, publications=publications)
+def fetch_authors_by_id(
+    scholar_ids: Iterable[str],
+    full: bool = False,
+    driver: NavigatorType | None = None,
+    max_workers: int = 4,
+    errors: dict[str, Exception] | None = None,
+) -> list[Author]:
+    """Fetch several authors concurrently. With ``full`` the article pages
+    are shared between the authors, so each unique paper is fetched once.
+    If ``errors`` is given, authors that fail are recorded there by scholar
+    id and left out of the result, otherwise the first failure is raised."""
+    if driver is None:
+        driver = get_default_driver()
+    pages: SingleFlight[dict[str, Any]] = SingleFlight()
+
+    def fetch(scholar_id: str) -> Author | Exception:
+        try:
+            return fetch_author_by_id(
+                scholar_id, full=full, driver=driver, executor=article_executor, pages=pages
+            )
+        except Exception as e:
+            if errors is None:
+                raise
+            return e
+
+    scholar_ids = list(scholar_ids)
+    with ThreadPoolExecutor(MAX_IN_FLIGHT) as article_executor:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(fetch, scholar_ids))
+    if full:
+        logger.debug(f"Fetched {pages.calls} article pages, {pages.shared} were shared")
+
+    authors = []
+    for scholar_id, result in zip(scholar_ids, results):
+        if isinstance(result, Exception):
+            assert errors is not None
+            errors[scholar_id] = result
+        else:
+            authors.append(result)
+    return authors
 
 
 def fill_publication(publication: Publication, driver: NavigatorType | None = None) -> Publication:
     if driver is None:
-        driver = (
-            Navigator()
-            if not os.getenv("LOCAL_DBPATH")
-            else LocalNavigator(os.getenv("LOCAL_DBPATH"))
-        )
+        driver = get_default_driver()
 
     pub = get_extra_article_info(publication.scholar_url, driver=driver)
     kwargs = publication.model_dump()
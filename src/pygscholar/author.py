@@ -1,12 +1,16 @@
 from __future__ import annotations
+from typing import TYPE_CHECKING
 from typing import Sequence
 from typing import Any
+import functools
 
 from pydantic import BaseModel, Field
 from structlog import get_logger
 
 from . import publication as pub
 
+if TYPE_CHECKING:
+    from .summary import AuthorSummary
 
 logger = get_logger()
 
@@ -33,15 +37,40 @@ class Author(BaseModel):
     def scholar_id(self) -> str:
         return self.info.scholar_id
 
+    @functools.cached_property
+    def _summaries(self) -> list[tuple[Sequence[pub.Publication], AuthorSummary]]:
+        # The publications together with their summary. This is a cached
+        # property rather than a private attribute, since private attributes
+        # are compared by ``==``
+        return []
+
+    @property
+    def summary(self) -> AuthorSummary:
+        """The aggregates of the publications, which are computed once and
+        used by the queries until the publications are replaced"""
+        from .summary import summarize
+
+        if not self._summaries or self._summaries[0][0] is not self.publications:
+            self._summaries[:] = [(self.publications, summarize(self, abstracts=True))]
+        return self._summaries[0][1]
+
     @property
     def most_cited(self):
-        return pub.most_cited(self.publications)
+        return self.summary.most_cited
 
     def topk_cited(self, k: int) -> Sequence[pub.Publication]:
-        return pub.topk_cited(self.publications, k=k)
+        from .summary import TOPK
+
+        if k > TOPK:
+            return pub.topk_cited(self.publications, k=k)
+        return self.summary.topk_cited(k)
 
     def topk_age(self, k: int) -> Sequence[pub.Publication]:
-        return pub.topk_age(self.publications, k=k)
+        from .summary import TOPK
+
+        if k > TOPK:
+            return pub.topk_age(self.publications, k=k)
+        return self.summary.topk_age(k)
 
     @property
     def num_citations(self) -> int:
@@ -65,14 +94,17 @@ def author_pub_diff(
     old_author: Author,
     only_new: bool = False,
 ) -> list[pub.Publication]:
-    new_pubs = []
-    old_author_publications = {p.title.lower().strip() for p in old_author.publications}
+    """Publications of the new author that are not in the old author, where
+    publications are compared by the fingerprint of the title. With
+    ``only_new`` only the publications from this year are checked, without
+    duplicates and publications without a valid year."""
+    old_fingerprints = pub.fingerprints(old_author.publications)
     if only_new:
-        new_author_publications = new_author.publications_not_older_than(0)
+        new_publications = new_author.publications_not_older_than(0)
     else:
-        new_author_publications = new_author.publications
-    # We only need to check new publications
-    for publication in new_author_publications:
-        if publication.title.lower().strip() not in old_author_publications:
-            new_pubs.append(publication)
-    return new_pubs
+        new_publications = new_author.publications
+    return [
+        publication
+        for publication in new_publications
+        if publication.fingerprint not in old_fingerprints
+    ]
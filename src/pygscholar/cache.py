@@ -1,14 +1,30 @@
 from __future__ import annotations
 from pathlib import Path
+from typing import Any, Callable, Sequence
+import hashlib
 import json
 from structlog import get_logger
 from pydantic import ValidationError
 
 from . import config
+from . import graph
+from . import history
+from . import search
+from . import serialization
+from . import summary
 from .author import Author
+from .publication import TRUSTED_FINGERPRINTS, title_fingerprint
+from .serialization import CacheFormat, Compression
 
 logger = get_logger()
 
+# Version of the layout of the author files. Bump this and add an entry
+# to ``_MIGRATIONS`` whenever the stored payload changes.
+SCHEMA_VERSION = 2
+
+# Files written before the schema version was introduced
+LEGACY_SCHEMA_VERSION = 0
+
 
 def check_cache_dir_and_create(cache_dir: str | Path) -> None:
     cachedir = Path(cache_dir)
@@ -36,18 +52,166 @@ def save_authors(authors: dict[str, str], cache_dir: str) -> None:
     authors_file(cache_dir).write_text(json.dumps(original_authors, indent=4))
 
 
-def save_author(author: Author, cache_dir: Path | str = config.DEFAULT_CACHE_DIR) -> None:
+def author_file(
+    scholar_id: str,
+    cache_dir: Path | str = config.DEFAULT_CACHE_DIR,
+    fmt: CacheFormat | str | None = None,
+    compression: Compression | str | None = None,
+) -> Path:
+    fmt = CacheFormat(fmt or config.CACHE_FORMAT)
+    compression = Compression(compression or config.CACHE_COMPRESSION)
+    return Path(cache_dir) / f"{scholar_id}{serialization.suffix(fmt, compression)}"
+
+
+def find_author_file(
+    scholar_id: str, cache_dir: Path | str = config.DEFAULT_CACHE_DIR
+) -> Path | None:
+    """Return the file where the author is stored, preferring the configured format"""
+    path = author_file(scholar_id, cache_dir)
+    if path.is_file():
+        return path
+    for suffix in serialization.all_suffixes():
+        path = Path(cache_dir) / f"{scholar_id}{suffix}"
+        if path.is_file():
+            return path
+    return None
+
+
+def checksum(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _migrate_0_to_1(data: dict[str, Any]) -> dict[str, Any]:
+    # Version 1 only added the header, the payload is unchanged
+    return data
+
+
+def _migrate_1_to_2(data: dict[str, Any]) -> dict[str, Any]:
+    # Version 2 stores the fingerprint of the title with each publication
+    data["publications"] = [
+        {**p, "fingerprint": title_fingerprint(p.get("title", ""))}
+        for p in data.get("publications", [])
+    ]
+    return data
+
+
+_MIGRATIONS: dict[int, Callable[[dict[str, Any]], dict[str, Any]]] = {
+    0: _migrate_0_to_1,
+    1: _migrate_1_to_2,
+}
+
+
+def migrate(data: dict[str, Any], version: int) -> dict[str, Any]:
+    """Migrate the payload of an author file from ``version``
+    to the current ``SCHEMA_VERSION``"""
+    if version > SCHEMA_VERSION:
+        raise ValueError(
+            f"Cache file has schema version {version}, but this version of pygscholar "
+            f"only supports versions up to {SCHEMA_VERSION}"
+        )
+    while version < SCHEMA_VERSION:
+        data = _MIGRATIONS[version](data)
+        version += 1
+    return data
+
+
+def save_author(
+    author: Author,
+    cache_dir: Path | str = config.DEFAULT_CACHE_DIR,
+    fmt: CacheFormat | str | None = None,
+    compression: Compression | str | None = None,
+    derived: bool = True,
+) -> None:
+    """Save the author and update the history, summary, co-authorship graph
+    and search index. If ``derived`` is false only the author file is
+    written, e.g when writing many authors at once and updating the rest
+    with ``update_derived`` afterwards."""
     check_cache_dir_and_create(cache_dir)
-
-    (Path(cache_dir) / author.scholar_id).with_suffix(".json").write_text(author.model_dump_json())
-
-
-def load_author(scholar_id: str, cache_dir: Path | str = config.DEFAULT_CACHE_DIR) -> Author | None:
-    path = (Path(cache_dir) / scholar_id).with_suffix(".json")
-    if not path.is_file():
+    fmt = CacheFormat(fmt or config.CACHE_FORMAT)
+    compression = Compression(compression or config.CACHE_COMPRESSION)
+
+    if fmt == CacheFormat.JSON:
+        payload = author.model_dump_json().encode()
+    else:
+        payload = serialization.dumps(author.model_dump(mode="json"), fmt)
+    header = json.dumps(
+        {"schema_version": SCHEMA_VERSION, "format": fmt.value, "checksum": checksum(payload)}
+    )
+    path = author_file(author.scholar_id, cache_dir, fmt=fmt, compression=compression)
+    path.write_bytes(serialization.compress(header.encode() + b"\n" + payload, compression))
+
+    # Remove copies of the author stored in other formats
+    for suffix in serialization.all_suffixes():
+        other = Path(cache_dir) / f"{author.scholar_id}{suffix}"
+        if other != path and other.is_file():
+            other.unlink()
+
+    if derived:
+        update_derived([author], cache_dir)
+
+
+def update_derived(
+    authors: Sequence[Author], cache_dir: Path | str = config.DEFAULT_CACHE_DIR
+) -> None:
+    """Update the history, summaries, co-authorship graph and search index
+    of the saved authors, where the shared files are written once"""
+    if not authors:
+        return
+    for author in authors:
+        history.record_snapshot(author, cache_dir)
+    summary.save_summaries([summary.summarize(author) for author in authors], cache_dir)
+    graph.update_graphs(authors, cache_dir)
+    search.index_authors(authors, cache_dir)
+
+
+def remove_derived(scholar_id: str, cache_dir: Path | str = config.DEFAULT_CACHE_DIR) -> None:
+    """Remove the author from the summaries, co-authorship graph and search
+    index. The author file and the history are kept."""
+    summary.remove_summary(scholar_id, cache_dir)
+    graph.remove_author(scholar_id, cache_dir)
+    search.remove_author(scholar_id, cache_dir)
+
+
+def load_author(
+    scholar_id: str,
+    cache_dir: Path | str = config.DEFAULT_CACHE_DIR,
+    verify: bool | None = None,
+) -> Author | None:
+    """Load the author from the cache. Files with the current schema version
+    are decoded directly, and with ``verify`` (by default ``PYSCHOLAR_VERIFY_CACHE``)
+    only if the checksum matches. Other files are validated and migrated in
+    memory, and are written in the current version the next time the author
+    is saved."""
+    path = find_author_file(scholar_id, cache_dir)
+    if path is None:
         return None
+    if verify is None:
+        verify = config.VERIFY_CACHE
+
+    fmt, compression = serialization.parse_suffix(path.name)
     try:
-        return Author.model_validate_json(path.read_text())
-    except ValidationError as e:
+        content = serialization.decompress(path.read_bytes(), compression)
+        if content.startswith(b'{"schema_version"'):
+            head, _, payload = content.partition(b"\n")
+            header = json.loads(head)
+        else:
+            # Legacy file which only contains the payload
+            header = {"schema_version": LEGACY_SCHEMA_VERSION}
+            payload = content
+
+        version = header.get("schema_version", LEGACY_SCHEMA_VERSION)
+        if version == SCHEMA_VERSION and (
+            not verify or header.get("checksum") == checksum(payload)
+        ):
+            # The fingerprints were computed when the file was written
+            if fmt == CacheFormat.JSON:
+                return Author.model_validate_json(payload, context=TRUSTED_FINGERPRINTS)
+            return Author.model_validate(
+                serialization.loads(payload, fmt), context=TRUSTED_FINGERPRINTS
+            )
+
+        logger.info(f"Validating cache file {path} (schema version {version})")
+        return Author.model_validate(migrate(serialization.loads(payload, fmt), version))
+    except (ValidationError, ValueError) as e:
         logger.critical(e, exc_info=True)
         return None
@@ -0,0 +1,227 @@
+"""
+Append-only log of changes to the authors in the cache.
+
+Every time a new snapshot is recorded in the history of an author, the
+changes since the previous snapshot are appended as events to
+``changes.jsonl`` in the cache directory. The event types are
+
+- ``author_added``: The first snapshot of an author
+- ``new_publication``: A publication that was not in the previous snapshot
+- ``removed_publication``: A publication that is no longer on the profile
+- ``citations``: The citation count of a publication changed
+- ``metrics``: The citation metrics of the profile, e.g the h-index, changed
+
+The id of an event is its byte offset in the log, so consumers can resume
+reading from any event without scanning the log. The position of named
+consumers is stored in ``changes_cursors.json``, so that e.g a notifier
+only sees the events that were added since it last ran. Lines that were
+torn by an interrupted append are skipped by the readers.
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+import datetime
+import json
+import os
+import threading
+
+from structlog import get_logger
+
+from . import config
+from .author import Author
+from .publication import title_key
+
+if TYPE_CHECKING:
+    from .history import Snapshot
+
+logger = get_logger()
+
+EVENT_TYPES = (
+    "author_added",
+    "new_publication",
+    "removed_publication",
+    "citations",
+    "metrics",
+)
+
+# All authors append to the same log
+_lock = threading.Lock()
+
+
+def changes_file(cache_dir: Path | str) -> Path:
+    return Path(cache_dir) / "changes.jsonl"
+
+
+def cursors_file(cache_dir: Path | str) -> Path:
+    return Path(cache_dir) / "changes_cursors.json"
+
+
+def author_events(
+    author: Author, old: Snapshot | None, delta: dict[str, Any] | None
+) -> list[dict[str, Any]]:
+    """Events for a history record, where ``delta`` is the difference
+    between the previous snapshot ``old`` and the author"""
+    base = {"scholar_id": author.scholar_id, "name": author.name}
+    if old is None or delta is None:
+        return [{**base, "type": "author_added", "publications": len(author.publications)}]
+
+    publications = {title_key(p.title): p for p in author.publications}
+    events = []
+    for key in delta.get("added", {}):
+        pub = publications[key]
+        events.append(
+            {
+                **base,
+                "type": "new_publication",
+                "title": pub.title,
+                "year": pub.year,
+                "authors": pub.authors,
+                "journal": pub.journal,
+                "num_citations": pub.num_citations,
+                "fingerprint": pub.fingerprint,
+            }
+        )
+    for key in delta.get("removed", []):
+        events.append({**base, "type": "removed_publication", "title": key})
+    for key, increment in delta.get("citations", {}).items():
+        new = publications[key].num_citations
+        events.append(
+            {
+                **base,
+                "type": "citations",
+                "title": publications[key].title,
+                "old": new - increment,
+                "new": new,
+            }
+        )
+    if delta.get("metrics"):
+        events.append(
+            {
+                **base,
+                "type": "metrics",
+                "changes": {
+                    key: [old.metrics.get(key), value] for key, value in delta["metrics"].items()
+                },
+            }
+        )
+    return events
+
+
+def append_events(
+    events: Iterable[dict[str, Any]],
+    cache_dir: Path | str = config.DEFAULT_CACHE_DIR,
+    date: datetime.datetime | None = None,
+) -> list[dict[str, Any]]:
+    """Append the events to the log. Returns the events with their id and date."""
+    date = date or datetime.datetime.now()
+    path = changes_file(cache_dir)
+    written = []
+    with _lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "ab") as f:
+            offset = f.tell()
+            lines = []
+            if offset > 0 and not _ends_with_newline(path, offset):
+                # Terminate a line torn by an interrupted append, so that
+                # the new events start on their own line
+                lines.append(b"\n")
+                offset += 1
+            for event in events:
+                event = {"id": offset, "date": date.isoformat(), **event}
+                line = json.dumps(event).encode() + b"\n"
+                lines.append(line)
+                written.append(event)
+                offset += len(line)
+            f.write(b"".join(lines))
+    return written
+
+
+def _ends_with_newline(path: Path, size: int) -> bool:
+    with open(path, "rb") as f:
+        f.seek(size - 1)
+        return f.read(1) == b"\n"
+
+
+def read_events(
+    cache_dir: Path | str = config.DEFAULT_CACHE_DIR,
+    since: int = 0,
+    types: Iterable[str] = (),
+    scholar_ids: Iterable[str] = (),
+) -> Iterator[dict[str, Any]]:
+    """Events with an id of at least ``since``, optionally only of the given
+    types or for the given authors"""
+    path = changes_file(cache_dir)
+    if not path.is_file():
+        return
+    types = set(types)
+    scholar_ids = set(scholar_ids)
+    with open(path, "rb") as f:
+        if since > 0:
+            # Skip to the start of the next event if ``since`` is not at
+            # the start of a line
+            f.seek(since - 1)
+            f.readline()
+        for line in f:
+            if not line.endswith(b"\n"):
+                # The last event is still being written, or was torn
+                break
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping invalid line in {path}")
+                continue
+            if types and event["type"] not in types:
+                continue
+            if scholar_ids and event["scholar_id"] not in scholar_ids:
+                continue
+            yield event
+
+
+def load_cursors(cache_dir: Path | str = config.DEFAULT_CACHE_DIR) -> dict[str, int]:
+    path = cursors_file(cache_dir)
+    if not path.is_file():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_cursor(
+    consumer: str, cursor: int, cache_dir: Path | str = config.DEFAULT_CACHE_DIR
+) -> None:
+    with _lock:
+        cursors = load_cursors(cache_dir)
+        cursors[consumer] = cursor
+        # Write to a temporary file first so that the cursors are never
+        # left half written
+        path = cursors_file(cache_dir)
+        tmp = path.with_name(f"{path.name}.tmp")
+        tmp.write_text(json.dumps(cursors, indent=4))
+        os.replace(tmp, path)
+
+
+def next_cursor(event: dict[str, Any], cache_dir: Path | str = config.DEFAULT_CACHE_DIR) -> int:
+    """Position in the log right after the event"""
+    with open(changes_file(cache_dir), "rb") as f:
+        f.seek(event["id"])
+        return event["id"] + len(f.readline())
+
+
+def consume(
+    consumer: str,
+    cache_dir: Path | str = config.DEFAULT_CACHE_DIR,
+    limit: int | None = None,
+    types: Iterable[str] = (),
+    commit: bool = True,
+) -> list[dict[str, Any]]:
+    """Events that the consumer has not seen yet, oldest first. If ``commit``
+    is true the cursor of the consumer is moved past the returned events,
+    otherwise call :func:`save_cursor` once the events have been handled."""
+    cursor = load_cursors(cache_dir).get(consumer, 0)
+    events: list[dict[str, Any]] = []
+    for event in read_events(cache_dir, since=cursor, types=types):
+        if limit is not None and len(events) >= limit:
+            break
+        events.append(event)
+    if commit and events:
+        save_cursor(consumer, next_cursor(events[-1], cache_dir), cache_dir)
+    return events
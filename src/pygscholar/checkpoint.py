@@ -0,0 +1,99 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any
+import json
+import shutil
+
+from pydantic import ValidationError
+from structlog import get_logger
+
+from . import config
+from .author import Author
+
+logger = get_logger()
+
+
+def checkpoint_dir(cache_dir: Path | str) -> Path:
+    return Path(cache_dir) / "checkpoints"
+
+
+class CrawlCheckpoint:
+    """Page cursor and the articles extracted so far when crawling the
+    publications of one author. Crawls with and without the extra info of
+    the articles (``full``) are stored separately."""
+
+    def __init__(
+        self,
+        scholar_id: str,
+        cache_dir: Path | str = config.DEFAULT_CACHE_DIR,
+        full: bool = False,
+    ):
+        self.scholar_id = scholar_id
+        self.full = full
+        name = f"{scholar_id}-full" if full else scholar_id
+        self.path = checkpoint_dir(cache_dir) / "crawls" / f"{name}.json"
+
+    def load(self) -> tuple[int, list[dict[str, Any]]]:
+        if not self.path.is_file():
+            return 0, []
+        data = json.loads(self.path.read_text())
+        logger.info(f"Resuming crawl of {self.scholar_id} from article {data['cursor']}")
+        return data["cursor"], data["articles"]
+
+    def save(self, cursor: int, articles: list[dict[str, Any]]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps({"cursor": cursor, "articles": articles}))
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+class DepartmentCheckpoint:
+    """The authors that have already been fetched by a department command.
+    Only the scholar ids are recorded, unless the command asks to keep the
+    fetched authors because they are not saved to the cache yet."""
+
+    def __init__(self, name: str, cache_dir: Path | str = config.DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.path = checkpoint_dir(cache_dir) / name
+        self._done: set[str] | None = None
+
+    def _author_file(self, scholar_id: str) -> Path:
+        return self.path / f"{scholar_id}.json"
+
+    def _done_file(self) -> Path:
+        return self.path / "done.txt"
+
+    def done(self, scholar_id: str) -> bool:
+        """Whether the author has already been fetched"""
+        if self._done is None:
+            path = self._done_file()
+            self._done = set(path.read_text().split()) if path.is_file() else set()
+        return scholar_id in self._done
+
+    def get(self, scholar_id: str) -> Author | None:
+        """The fetched author, if it was kept"""
+        path = self._author_file(scholar_id)
+        if not path.is_file():
+            return None
+        try:
+            return Author.model_validate_json(path.read_bytes())
+        except ValidationError as e:
+            logger.critical(e, exc_info=True)
+            return None
+
+    def add(self, author: Author, keep: bool = False) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        if keep:
+            self._author_file(author.scholar_id).write_text(author.model_dump_json())
+        with self._done_file().open("a") as f:
+            f.write(f"{author.scholar_id}\n")
+        if self._done is not None:
+            self._done.add(author.scholar_id)
+
+    def crawl(self, scholar_id: str, full: bool = False) -> CrawlCheckpoint:
+        return CrawlCheckpoint(scholar_id, self.cache_dir, full=full)
+
+    def clear(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+        self._done = None
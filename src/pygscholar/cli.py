@@ -4,9 +4,13 @@ Command line interface for pygscholar. You can also set the environment variable
 
 """
 
+import csv
+import itertools
 import json
+import os
+import sqlite3
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, NoReturn, Optional
 
 import typer
 from rich.console import Console
@@ -17,7 +21,17 @@ from scholarly import MaxTriesExceededException
 from . import api
 from . import config
 from . import cache
-from .department import Department, department_diff
+from . import changes
+from . import export
+from . import graph
+from . import groups
+from . import history
+from . import search
+from . import summary
+from .checkpoint import DepartmentCheckpoint
+from .author import Author, author_pub_diff
+from .department import Department, LazyDepartment, department_diff
+from .ranking import SortBy, citation_counts
 
 app = typer.Typer(help=__doc__)
 
@@ -40,8 +54,29 @@ def license_callback(show_license: bool):
         raise typer.Exit()
 
 
+NAVIGATOR_VARIABLES = (
+    "PYSCHOLAR_RECORD",
+    "PYSCHOLAR_REPLAY",
+    "PYSCHOLAR_REPLAY_LATENCY",
+    "PYSCHOLAR_REPLAY_ERROR_RATE",
+)
+
+
+def restore_environment(previous: dict[str, Optional[str]]) -> None:
+    """Restore the navigator variables and drop the navigators created from
+    them, so that they do not leak into later invocations in the same process"""
+    for key, value in previous.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+    api.scraper._replay_navigator.cache_clear()
+    api.scraper._recording_navigator.cache_clear()
+
+
 @app.callback()
 def main(
+    ctx: typer.Context,
     version: bool = typer.Option(
         None,
         "--version",
@@ -56,23 +91,93 @@ def main(
         is_eager=True,
         help="Show license",
     ),
+    record: Optional[Path] = typer.Option(
+        None, "--record", help="Record the pages fetched from Google Scholar to this file"
+    ),
+    replay: Optional[Path] = typer.Option(
+        None, "--replay", help="Serve the pages recorded with --record from this file"
+    ),
+    replay_latency: float = typer.Option(
+        0.0, help="Simulated latency in seconds per request when replaying"
+    ),
+    replay_error_rate: float = typer.Option(
+        0.0, help="Fraction of the requests that fail when replaying"
+    ),
 ):
-    # Do other global stuff, handle other global options here
-    return
+    # The navigator is selected from the environment, see
+    # pygscholar.api.scraper.get_default_driver. The environment is
+    # restored when the command is done.
+    if record is None and replay is None:
+        return
+    previous = {key: os.environ.get(key) for key in NAVIGATOR_VARIABLES}
+    ctx.call_on_close(lambda: restore_environment(previous))
+    if record is not None:
+        os.environ["PYSCHOLAR_RECORD"] = str(record)
+    if replay is not None:
+        os.environ["PYSCHOLAR_REPLAY"] = str(replay)
+        os.environ["PYSCHOLAR_REPLAY_LATENCY"] = str(replay_latency)
+        os.environ["PYSCHOLAR_REPLAY_ERROR_RATE"] = str(replay_error_rate)
+
+
+def load_department_authors(cache_dir: str, group: Optional[str]) -> dict[str, str]:
+    """All authors, or only the authors in the group if a group is given"""
+    if group is None:
+        return cache.load_authors(cache_dir=cache_dir)
+    try:
+        return groups.group_authors(group, cache_dir=cache_dir)
+    except KeyError:
+        typer.echo(f"Could not find group with name '{group}'", err=True)
+        raise typer.Exit(107)
+
+
+def author_not_found(name: str, names: Iterable[str]) -> NoReturn:
+    """Report an unknown author, suggesting the closest name if there is one"""
+    try:
+        closest_name = api.get_closest_name(name, names)
+        message = f"Could not find author with name '{name}'. Did you mean '{closest_name}'?"
+    except ValueError:
+        message = f"Could not find author with name '{name}'"
+    typer.echo(message, err=True)
+    raise typer.Exit(103)
+
+
+GROUP_OPTION = typer.Option(None, help="Only include the authors in this group")
 
 
 @app.command(help="List all authors")
-def list_authors(cache_dir: str = config.DEFAULT_CACHE_DIR):
-    authors = cache.load_authors(cache_dir)
+def list_authors(
+    cache_dir: str = config.DEFAULT_CACHE_DIR,
+    group: Optional[str] = GROUP_OPTION,
+):
+    authors = load_department_authors(cache_dir, group)
+    summaries = summary.load_summaries(cache_dir)
 
-    table = Table(title="Authors")
+    table = Table(title="Authors" if group is None else f"Authors in {group}")
 
     table.add_column("Name", justify="right", style="cyan", no_wrap=True)
-    table.add_column("Scholar ID", style="magenta")
+    table.add_column("Scholar ID", style="magenta", no_wrap=True)
+    table.add_column("Publications", style="green")
+    table.add_column("Citations", style="yellow")
+    table.add_column("h-index", style="blue")
 
     for name, scholar_id in authors.items():
         print(name)
-        table.add_row(name, scholar_id)
+        author_summary = summaries.get(scholar_id)
+        if author_summary is None:
+            table.add_row(name, scholar_id, "", "", "")
+        else:
+            table.add_row(
+                name,
+                scholar_id,
+                str(author_summary.num_publications),
+                str(author_summary.num_citations),
+                str(author_summary.h_index),
+            )
+
+    dep = summary.department_summary(
+        summaries[scholar_id] for scholar_id in authors.values() if scholar_id in summaries
+    )
+    table.caption = f"{dep.num_authors} authors with a total of {dep.num_citations} citations"
 
     console = Console()
     console.print(table)
@@ -170,29 +275,218 @@ def add_author(
     cache.save_author(author=author_with_pubs, cache_dir=cache_dir)
 
 
+def read_roster(path: Path) -> list[tuple[str, str]]:
+    """Read a csv file with one author per row, where the first column is
+    the name and the optional second column is the scholar id"""
+    rows: list[tuple[str, str]] = []
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            if not row or row[0].strip() == "":
+                continue
+            name = row[0].strip()
+            scholar_id = row[1].strip() if len(row) > 1 else ""
+            if not rows and name.lower() == "name":
+                # Skip header
+                continue
+            rows.append((name, scholar_id))
+    return rows
+
+
+@app.command(help="Add all authors from a roster file")
+def add_authors(
+    roster: Path = typer.Option(
+        ...,
+        "--from",
+        help="CSV file with the name and optionally the scholar id of each author",
+    ),
+    workers: int = typer.Option(4, help="Maximum number of concurrent requests"),
+    cache_dir: str = config.DEFAULT_CACHE_DIR,
+    backend: api.APIBackend = api.APIBackend.SCRAPER,
+):
+    authors = cache.load_authors(cache_dir)
+    rows = [
+        (name, scholar_id)
+        for name, scholar_id in read_roster(roster)
+        if name not in authors and (scholar_id == "" or scholar_id not in authors.values())
+    ]
+    typer.echo(f"Resolving {len(rows)} new author(s)")
+
+    lookup_errors: dict[str, Exception] = {}
+    results = api.search_authors(
+        [name for name, _ in rows],
+        scholar_ids=[scholar_id for _, scholar_id in rows],
+        backend=backend,
+        max_workers=workers,
+        cache_dir=cache_dir,
+        errors=lookup_errors,
+    )
+
+    table = Table(title="Authors that could not be added")
+    table.add_column("Name", style="cyan")
+    table.add_column("Reason", style="red")
+    table.add_column("Candidates (Scholar ID)", style="magenta")
+
+    new_authors: dict[str, str] = {}
+    for (name, scholar_id), author_results in zip(rows, results):
+        if name in lookup_errors:
+            e = lookup_errors[name]
+            table.add_row(name, f"Lookup failed ({type(e).__name__}: {e})", "")
+        elif len(author_results) == 0:
+            table.add_row(name, "Not found", "")
+        elif len(author_results) > 1:
+            candidates = ", ".join(f"{a.name} ({a.scholar_id})" for a in author_results)
+            table.add_row(name, "Ambiguous", candidates)
+        elif author_results[0].name in authors or author_results[0].name in new_authors:
+            table.add_row(name, "Already exist", author_results[0].scholar_id)
+        else:
+            new_authors[author_results[0].name] = author_results[0].scholar_id
+
+    if table.row_count > 0:
+        Console().print(table)
+
+    cache.save_authors(new_authors, cache_dir)
+    typer.echo(f"Successfully added {len(new_authors)} author(s)")
+
+    typer.echo("Search for publications. This can take some time")
+
+    errors: dict[str, Exception] = {}
+    saved: list[Author] = []
+    try:
+        for author_with_pubs in api.fetch_authors(
+            new_authors, full=False, backend=backend, max_workers=workers, errors=errors
+        ):
+            try:
+                cache.save_author(author=author_with_pubs, cache_dir=cache_dir, derived=False)
+            except Exception as e:
+                errors[author_with_pubs.name] = e
+                continue
+            saved.append(author_with_pubs)
+    finally:
+        cache.update_derived(saved, cache_dir=cache_dir)
+
+    failed = [(name, f"{type(e).__name__}: {e}") for name, e in errors.items()]
+    if failed:
+        table = Table(title="Authors whose publications could not be fetched")
+        table.add_column("Name", style="cyan")
+        table.add_column("Error", style="red")
+        for name, error in failed:
+            table.add_row(name, error)
+        Console().print(table)
+        typer.echo(
+            f"Failed to fetch the publications of {len(failed)} author(s). "
+            "They are fetched the next time the department is listed",
+            err=True,
+        )
+        raise typer.Exit(106)
+
+
 @app.command(help="Remove author")
 def remove_author(name: str, cache_dir: str = config.DEFAULT_CACHE_DIR):
     authors_file = Path(cache_dir) / "authors.json"
     authors = json.loads(authors_file.read_text())
     if name not in authors:
-        closest_name = api.get_closest_name(name, authors.keys())
-        typer.echo(
-            f"Could not find author with name '{name}'. Did you mean '{closest_name}'?",
-            err=True,
-        )
-        raise typer.Exit(103)
+        author_not_found(name, authors.keys())
 
-    authors.pop(name)
+    scholar_id = authors.pop(name)
     authors_file.write_text(json.dumps(authors, indent=4))
+    groups.remove_author(scholar_id, cache_dir=cache_dir)
+    cache.remove_derived(scholar_id, cache_dir=cache_dir)
     typer.echo(f"Successfully removed author with name {name}")
 
 
-def print_publications(publications, sort_by_citations, add_authors, name):
-    sort_txt = "(Sorted by "
-    if sort_by_citations:
-        sort_txt += "citations)"
-    else:
-        sort_txt += "age)"
+group_app = typer.Typer(help="Manage groups of authors that share the same cache")
+app.add_typer(group_app, name="group")
+
+
+def scholar_ids_from_names(names: list[str], cache_dir: str) -> list[str]:
+    authors = cache.load_authors(cache_dir)
+    scholar_ids = []
+    for name in names:
+        if name not in authors:
+            author_not_found(name, authors.keys())
+        scholar_ids.append(authors[name])
+    return scholar_ids
+
+
+@group_app.command(name="add", help="Add authors to a group, creating the group if needed")
+def group_add(group: str, names: list[str], cache_dir: str = config.DEFAULT_CACHE_DIR):
+    members = groups.add_to_group(group, scholar_ids_from_names(names, cache_dir), cache_dir)
+    typer.echo(f"Group {group} has {len(members)} author(s)")
+
+
+@group_app.command(name="remove", help="Remove authors from a group")
+def group_remove(group: str, names: list[str], cache_dir: str = config.DEFAULT_CACHE_DIR):
+    load_department_authors(cache_dir, group)
+    members = groups.remove_from_group(group, scholar_ids_from_names(names, cache_dir), cache_dir)
+    typer.echo(f"Group {group} has {len(members)} author(s)")
+
+
+@group_app.command(name="delete", help="Delete a group. The authors are kept in the cache")
+def group_delete(group: str, cache_dir: str = config.DEFAULT_CACHE_DIR):
+    load_department_authors(cache_dir, group)
+    groups.delete_group(group, cache_dir)
+    typer.echo(f"Successfully deleted group {group}")
+
+
+@group_app.command(name="list", help="List all groups")
+def group_list(cache_dir: str = config.DEFAULT_CACHE_DIR):
+    table = Table(title="Groups")
+    table.add_column("Group", style="cyan", no_wrap=True)
+    table.add_column("Authors", style="magenta")
+    for group in groups.load_groups(cache_dir):
+        table.add_row(group, ", ".join(load_department_authors(cache_dir, group)))
+    Console().print(table)
+
+
+def get_sort_by(sort_by: Optional[SortBy], sort_by_citations: bool) -> SortBy:
+    if sort_by is not None:
+        return sort_by
+    return SortBy.CITATIONS if sort_by_citations else SortBy.AGE
+
+
+def previous_citations(
+    scholar_id: str, old_author: Optional[Author], cache_dir: str
+) -> dict[str, int]:
+    """Citation counts from the previous refresh, either from the author that
+    was stored before updating or from the citation history"""
+    if old_author is not None:
+        return citation_counts([old_author])
+    snapshot = history.previous(scholar_id, cache_dir=cache_dir)
+    if snapshot is None:
+        return {}
+    return snapshot.citations
+
+
+def checkpoint_name(command: str, group: Optional[str]) -> str:
+    return command if group is None else f"{command}-{group}"
+
+
+def fetch_author(
+    name: str,
+    scholar_id: str,
+    backend: api.APIBackend,
+    progress: DepartmentCheckpoint,
+    resume: bool,
+    keep: bool = False,
+) -> Author:
+    """Fetch the author and record the progress. When resuming, authors
+    that were already fetched are skipped and interrupted crawls continue
+    from the last page. With ``keep`` the fetched author is stored in the
+    checkpoint, for commands that only save the authors at the end."""
+    crawl = progress.crawl(scholar_id, full=False)
+    if not resume:
+        crawl.clear()
+    author = api.search_author_with_publications(
+        name=name, scholar_id=scholar_id, full=False, backend=backend, checkpoint=crawl
+    )
+    progress.add(author, keep=keep)
+    return author
+
+
+def print_publications(
+    publications, sort_by: SortBy, add_authors, name, cache_dir: Optional[str] = None
+):
+    sort_txt = f"(Sorted by {sort_by.description})"
     table = Table(title=f"Publications for {name} {sort_txt}")
     table.add_column("Title", style="cyan")
     if add_authors:
@@ -206,7 +500,7 @@ def print_publications(publications, sort_by_citations, add_authors, name):
             year = "Unknown"
         if add_authors:
             if pub.authors == "":
-                full_pub = pub.fill()
+                full_pub = pub.fill(cache_dir=cache_dir)
             else:
                 full_pub = pub
             table.add_row(pub.title, full_pub.authors, year, str(pub.num_citations))
@@ -228,8 +522,12 @@ def list_author_publications(
     overwrite: bool = False,
     cache_dir: str = config.DEFAULT_CACHE_DIR,
     backend: api.APIBackend = api.APIBackend.SCRAPER,
+    sort_by: Optional[SortBy] = typer.Option(
+        None, help="Sort order. Overrides --sort-by-citations"
+    ),
 ):
     authors = cache.load_authors(cache_dir)
+    sort_by = get_sort_by(sort_by, sort_by_citations)
 
     if name not in authors:
         _name = name
@@ -239,7 +537,9 @@ def list_author_publications(
         )
 
     author = cache.load_author(authors[name], cache_dir=cache_dir)
+    old_author = None
     if update or author is None:
+        old_author = author
         author = api.search_author_with_publications(
             name=name, scholar_id=authors[name], full=False, backend=backend
         )
@@ -250,8 +550,13 @@ def list_author_publications(
         typer.echo(f"Could not find author with name '{name}'", err=True)
         raise typer.Exit(105)
 
-    publications = api.extract_correct_publications(author, sort_by_citations, max_age, n)
-    print_publications(publications, sort_by_citations, add_authors, name)
+    previous = None
+    if sort_by == SortBy.GROWTH:
+        previous = previous_citations(authors[name], old_author, cache_dir)
+    publications = api.extract_correct_publications(
+        author, max_age=max_age, n=n, sort_by=sort_by, previous=previous
+    )
+    print_publications(publications, sort_by, add_authors, name, cache_dir)
 
 
 @app.command(help="List new authors publications")
@@ -281,14 +586,14 @@ def list_new_author_publications(
     )
 
     old_author = cache.load_author(author.scholar_id, cache_dir=cache_dir)
-    if old_author is not None:
-        old_titles = {pub.title for pub in old_author.publications}
-    else:
+    if old_author is None:
         typer.echo(f"Could not find author with name '{name}'", err=True)
-        old_titles = set()
+        old_author = Author(info=author.info)
 
-    new_publications = [pub for pub in author.publications if pub.title not in old_titles]
-    print_publications(new_publications, sort_by_citations, add_authors, name)
+    new_publications = author_pub_diff(author, old_author)
+    print_publications(
+        new_publications, get_sort_by(None, sort_by_citations), add_authors, name, cache_dir
+    )
 
     if overwrite:
         cache.save_author(
@@ -297,9 +602,13 @@ def list_new_author_publications(
         )
 
     if save_diff is not None:
-        save_diff.with_suffix(".json").write_text(
-            json.dumps([p.fill().dict() for p in new_publications], indent=4)
-        )
+        filled = (p.fill(cache_dir=cache_dir) for p in new_publications)
+        if save_diff.suffix.lstrip(".") in {fmt.value for fmt in export.ExportFormat}:
+            export.write_records((export.to_record(author, p) for p in filled), save_diff)
+        else:
+            export.write_json_array(
+                (p.model_dump() for p in filled), save_diff.with_suffix(".json")
+            )
 
 
 @app.command(help="List department publications")
@@ -311,22 +620,58 @@ def list_department_publications(
     update: bool = False,
     cache_dir: str = config.DEFAULT_CACHE_DIR,
     backend: api.APIBackend = api.APIBackend.SCRAPER,
+    sort_by: Optional[SortBy] = typer.Option(
+        None, help="Sort order. Overrides --sort-by-citations"
+    ),
+    resume: bool = typer.Option(
+        False, help="Skip the authors that were already updated by an interrupted run"
+    ),
+    group: Optional[str] = GROUP_OPTION,
 ):
-    authors = cache.load_authors(cache_dir=cache_dir)
-
-    all_authors = []
-    for name, scholar_id in authors.items():
-        author = cache.load_author(scholar_id, cache_dir=cache_dir)
-        if author is None or update:
-            author = api.search_author_with_publications(
-                name=name, scholar_id=scholar_id, full=False, backend=backend
-            )
-            cache.save_author(author=author, cache_dir=cache_dir)
-        all_authors.append(author)
+    authors = load_department_authors(cache_dir, group)
+    sort_by = get_sort_by(sort_by, sort_by_citations)
+    progress = DepartmentCheckpoint(
+        checkpoint_name("list-department-publications", group), cache_dir
+    )
+    if not resume:
+        progress.clear()
 
-    department = Department(authors=all_authors)
-    publications = api.extract_correct_publications(department, sort_by_citations, max_age, n)
-    print_publications(publications, sort_by_citations, add_authors, "department")
+    def refetch(name: str, scholar_id: str) -> Author:
+        """Fetch an author whose file could not be loaded"""
+        typer.echo(f"Could not load {name} from the cache, fetching it again", err=True)
+        author = api.search_author_with_publications(
+            name=name, scholar_id=scholar_id, full=False, backend=backend
+        )
+        cache.save_author(author=author, cache_dir=cache_dir)
+        return author
+
+    # Only the authors that are needed to answer the query are loaded, and
+    # authors with a corrupt file are fetched again
+    department = LazyDepartment(authors, cache_dir=cache_dir, fetch=refetch)
+    previous: dict[str, int] = {}
+    saved: list[Author] = []
+    try:
+        for name, scholar_id in authors.items():
+            old_author = None
+            missing = cache.find_author_file(scholar_id, cache_dir) is None
+            if missing or (update and not progress.done(scholar_id)):
+                old_author = None if missing else cache.load_author(scholar_id, cache_dir=cache_dir)
+                author = fetch_author(name, scholar_id, backend, progress, resume)
+                cache.save_author(author=author, cache_dir=cache_dir, derived=False)
+                saved.append(author)
+                department.add(author)
+            if sort_by == SortBy.GROWTH:
+                previous.update(previous_citations(scholar_id, old_author, cache_dir))
+    finally:
+        # The summaries and indexes of the fetched authors are written at
+        # once, also when the run is interrupted
+        cache.update_derived(saved, cache_dir=cache_dir)
+    progress.clear()
+
+    publications = api.extract_correct_publications(
+        department, max_age=max_age, n=n, sort_by=sort_by, previous=previous
+    )
+    print_publications(publications, sort_by, add_authors, group or "department", cache_dir)
 
 
 @app.command(help="List department publications")
@@ -338,8 +683,17 @@ def list_new_department_publications(
     overwrite: bool = False,
     cache_dir: str = config.DEFAULT_CACHE_DIR,
     backend: api.APIBackend = api.APIBackend.SCRAPER,
+    resume: bool = typer.Option(
+        False, help="Skip the authors that were already fetched by an interrupted run"
+    ),
+    group: Optional[str] = GROUP_OPTION,
 ):
-    authors = cache.load_authors(cache_dir=cache_dir)
+    authors = load_department_authors(cache_dir, group)
+    progress = DepartmentCheckpoint(
+        checkpoint_name("list-new-department-publications", group), cache_dir
+    )
+    if not resume:
+        progress.clear()
 
     old_authors = []
     new_authors = []
@@ -348,13 +702,21 @@ def list_new_department_publications(
         if old_author is not None:
             old_authors.append(old_author)
 
-        new_author = api.search_author_with_publications(
-            name=name, scholar_id=scholar_id, full=False, backend=backend
-        )
-        if overwrite:
-            cache.save_author(author=new_author, cache_dir=cache_dir)
+        new_author = progress.get(scholar_id) if resume else None
+        if new_author is None:
+            new_author = fetch_author(name, scholar_id, backend, progress, resume, keep=True)
+        else:
+            typer.echo(f"Skipping {name} which was fetched by a previous run")
         new_authors.append(new_author)
 
+    # Overwrite the cache only when all authors are fetched so that
+    # an interrupted run can be resumed with the old authors intact
+    if overwrite:
+        for new_author in new_authors:
+            cache.save_author(author=new_author, cache_dir=cache_dir, derived=False)
+        cache.update_derived(new_authors, cache_dir=cache_dir)
+    progress.clear()
+
     old_department = Department(authors=old_authors)
     new_department = Department(authors=new_authors)
 
@@ -364,7 +726,271 @@ def list_new_department_publications(
         fill=False,
     )
 
-    print_publications(list(new_pubs.values()), sort_by_citations, add_authors, "department")
+    print_publications(
+        list(new_pubs.values()),
+        get_sort_by(None, sort_by_citations),
+        add_authors,
+        group or "department",
+        cache_dir,
+    )
+
+
+@app.command(name="export", help="Export the publications in the cache")
+def export_publications(
+    path: Path = typer.Argument(..., help="Output file (.jsonl, .csv or .parquet)"),
+    fmt: Optional[export.ExportFormat] = typer.Option(
+        None, "--format", help="Format of the file. By default determined from the suffix"
+    ),
+    author: list[str] = typer.Option([], help="Only export these authors"),
+    min_year: Optional[int] = None,
+    max_year: Optional[int] = None,
+    min_citations: Optional[int] = None,
+    cache_dir: str = config.DEFAULT_CACHE_DIR,
+):
+    records = export.filter_records(
+        export.iter_records(cache_dir=cache_dir, authors=author),
+        min_year=min_year,
+        max_year=max_year,
+        min_citations=min_citations,
+    )
+    count = export.write_records(records, path, fmt=fmt)
+    typer.echo(f"Exported {count} publications to {path}")
+
+
+@app.command(name="import", help="Import publications into the cache")
+def import_publications(
+    path: Path = typer.Argument(..., help="Input file (.jsonl, .csv or .parquet)"),
+    fmt: Optional[export.ExportFormat] = typer.Option(
+        None, "--format", help="Format of the file. By default determined from the suffix"
+    ),
+    author: list[str] = typer.Option([], help="Only import these authors"),
+    min_year: Optional[int] = None,
+    max_year: Optional[int] = None,
+    min_citations: Optional[int] = None,
+    cache_dir: str = config.DEFAULT_CACHE_DIR,
+):
+    records = export.filter_records(
+        export.read_records(path, fmt=fmt),
+        min_year=min_year,
+        max_year=max_year,
+        min_citations=min_citations,
+        authors=author,
+    )
+    counts = export.import_records(records, cache_dir=cache_dir)
+    for name, count in counts.items():
+        typer.echo(f"Imported {count} publications for {name}")
+
+
+@app.command(help="List collaborators of an author, or of the whole department")
+def list_collaborators(
+    name: Optional[str] = typer.Argument(None, help="Name of the author"),
+    n: int = 10,
+    cache_dir: str = config.DEFAULT_CACHE_DIR,
+):
+    authors = cache.load_authors(cache_dir)
+    if graph.graph_file(cache_dir).is_file():
+        coauthors = graph.load_graph(cache_dir)
+    else:
+        coauthors = graph.rebuild_graph(cache_dir)
+    console = Console()
+
+    if name is not None:
+        if name not in authors:
+            author_not_found(name, authors.keys())
+        try:
+            collaborators = coauthors.collaborators(authors[name])
+        except KeyError:
+            typer.echo(
+                f"Author '{name}' is not in the collaboration network. "
+                "Fetch the publications of the author first",
+                err=True,
+            )
+            raise typer.Exit(105)
+        table = Table(title=f"Collaborators of {name}")
+        table.add_column("Name", style="cyan")
+        table.add_column("Scholar ID", style="magenta")
+        table.add_column("Shared publications", style="green")
+        table.add_column("Co-author on profile", style="yellow")
+        for collaborator in collaborators[:n]:
+            table.add_row(
+                collaborator.name,
+                "" if collaborator.id.startswith("name:") else collaborator.id,
+                str(collaborator.shared),
+                "yes" if collaborator.profile else "",
+            )
+        console.print(table)
+        return
+
+    names = {scholar_id: name for name, scholar_id in authors.items()}
+    components = coauthors.components()
+    table = Table(title="Connected groups of authors")
+    table.add_column("Size", style="green")
+    table.add_column("Authors", style="cyan")
+    for component in components:
+        table.add_row(str(len(component)), ", ".join(names.get(s, s) for s in component))
+    console.print(table)
+
+    table = Table(title="External collaborators")
+    table.add_column("Name", style="cyan")
+    table.add_column("Shared publications", style="green")
+    table.add_column("Authors", style="magenta")
+    for collaborator, num_members in coauthors.external_collaborators(k=n):
+        table.add_row(collaborator.name, str(collaborator.shared), str(num_members))
+    console.print(table)
+
+
+@app.command(help="Search the publications in the cache")
+def search_publications(
+    query: str,
+    n: int = 10,
+    raw: bool = typer.Option(False, help="Pass the query directly to SQLite FTS5"),
+    cache_dir: str = config.DEFAULT_CACHE_DIR,
+):
+    if not search.index_file(cache_dir).is_file():
+        typer.echo("Building search index")
+        search.rebuild_index(cache_dir)
+
+    names = {scholar_id: name for name, scholar_id in cache.load_authors(cache_dir).items()}
+    table = Table(title=f"Publications matching '{query}'")
+    table.add_column("Title", style="cyan")
+    table.add_column("Authors in cache", style="magenta")
+    table.add_column("Published year", style="green")
+    table.add_column("Number of citations", style="yellow")
+    try:
+        results = search.search(query, cache_dir=cache_dir, k=n, raw=raw)
+    except sqlite3.OperationalError as e:
+        typer.echo(f"Invalid search query '{query}': {e}", err=True)
+        raise typer.Exit(108)
+    for result in results:
+        table.add_row(
+            result.publication.title,
+            ", ".join(names.get(s, s) for s in result.scholar_ids),
+            str(result.publication.year),
+            str(result.publication.num_citations),
+        )
+    Console().print(table)
+
+
+def describe_change(event: dict) -> str:
+    if event["type"] == "author_added":
+        return f"Added with {event['publications']} publications"
+    if event["type"] == "new_publication":
+        return f"New publication: {event['title']} ({event['year']})"
+    if event["type"] == "removed_publication":
+        return f"Removed publication: {event['title']}"
+    if event["type"] == "citations":
+        return f"{event['title']}: {event['old']} -> {event['new']} citations"
+    return ", ".join(f"{key}: {old} -> {new}" for key, (old, new) in event["changes"].items())
+
+
+@app.command(name="changes", help="List changes to the authors in the cache")
+def list_changes(
+    consumer: Optional[str] = typer.Option(
+        None, help="Only list changes not seen by this consumer, and move its cursor"
+    ),
+    since: int = typer.Option(0, help="Only list changes with at least this id"),
+    event_type: Optional[list[str]] = typer.Option(
+        None, "--type", help=f"Only list these types of changes: {', '.join(changes.EVENT_TYPES)}"
+    ),
+    n: Optional[int] = typer.Option(None, help="Maximum number of changes"),
+    as_json: bool = typer.Option(False, "--json", help="Print one JSON object per line"),
+    cache_dir: str = config.DEFAULT_CACHE_DIR,
+):
+    if consumer is not None:
+        events = changes.consume(consumer, cache_dir, limit=n, types=event_type or ())
+    else:
+        events = list(
+            itertools.islice(changes.read_events(cache_dir, since=since, types=event_type or ()), n)
+        )
+
+    if as_json:
+        for event in events:
+            typer.echo(json.dumps(event))
+        return
+
+    table = Table(title="Changes")
+    table.add_column("Id", style="cyan")
+    table.add_column("Date", style="green")
+    table.add_column("Author", style="magenta")
+    table.add_column("Change", style="yellow")
+    for event in events:
+        table.add_row(str(event["id"]), event["date"][:16], event["name"], describe_change(event))
+    Console().print(table)
+
+
+@app.command(help="Serve the department over HTTP/JSON")
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    refresh_interval: float = typer.Option(
+        0.0, help="Seconds between automatic refreshes of all authors. 0 disables"
+    ),
+    budget: Optional[int] = typer.Option(
+        None,
+        help=(
+            "Maximum number of authors to fetch per refresh, prioritized by "
+            "staleness and activity. By default all authors are fetched"
+        ),
+    ),
+    cache_dir: str = config.DEFAULT_CACHE_DIR,
+    backend: api.APIBackend = api.APIBackend.SCRAPER,
+):
+    from .server import serve
+
+    typer.echo(f"Serving on http://{host}:{port}")
+    serve(
+        host=host,
+        port=port,
+        cache_dir=cache_dir,
+        backend=backend,
+        refresh_interval=refresh_interval,
+        budget=budget,
+    )
+
+
+@app.command(help="Serve a local stand-in for Google Scholar for load testing")
+def mock_server(
+    host: str = "127.0.0.1",
+    port: int = 8001,
+    store: Optional[Path] = typer.Option(
+        None, help="Serve the pages recorded with --record instead of synthetic profiles"
+    ),
+    articles: int = typer.Option(100, help="Number of articles of the synthetic profiles"),
+    latency: float = typer.Option(0.0, help="Seconds of latency per request"),
+    error_rate: float = typer.Option(0.0, help="Fraction of the requests that get a 429"),
+    captcha_rate: float = typer.Option(
+        0.0, help="Fraction of the requests that get a CAPTCHA page"
+    ),
+    seed: Optional[int] = None,
+):
+    from .mock_server import serve
+
+    typer.echo(f"Serving on http://{host}:{port}, set PYSCHOLAR_SCHOLAR_URL to use it")
+    serve(
+        host=host,
+        port=port,
+        store=store,
+        num_articles=articles,
+        latency=latency,
+        error_rate=error_rate,
+        captcha_rate=captcha_rate,
+        seed=seed,
+    )
+
+
+@app.command(help="Refresh the most stale and active authors")
+def refresh(
+    budget: int = typer.Option(10, help="Maximum number of authors to fetch"),
+    window: float = typer.Option(0.0, help="Number of seconds to spread the requests over"),
+    cache_dir: str = config.DEFAULT_CACHE_DIR,
+    backend: api.APIBackend = api.APIBackend.SCRAPER,
+):
+    from .scheduler import RefreshScheduler
+
+    scheduler = RefreshScheduler(cache_dir=cache_dir, budget=budget, window=window, backend=backend)
+    authors = scheduler.run()
+    for author in authors:
+        typer.echo(f"Refreshed {author.name}")
 
 
 @app.command(help="Generate test data")
@@ -378,6 +1004,44 @@ def generate_test_data(path: Path):
     driver.populate_author("Jørgen Schartum Dokken")
 
 
+@app.command(help="Generate a synthetic department for scale testing")
+def generate_department(
+    authors: int = typer.Option(20, help="Number of authors"),
+    publications: float = typer.Option(50, help="Mean number of publications per author"),
+    overlap: float = typer.Option(
+        0.2, help="Fraction of the publications that are shared with other authors"
+    ),
+    seed: int = 0,
+    store: Optional[Path] = typer.Option(
+        None, help="Also write the pages to a store for --replay or mock-server"
+    ),
+    cache_dir: str = typer.Option(
+        ..., help="Empty cache directory to write the synthetic authors to"
+    ),
+):
+    from . import synthetic
+
+    if cache.load_authors(cache_dir):
+        typer.echo(
+            f"Cache directory {cache_dir} already contains authors. "
+            "Use an empty directory for the synthetic department",
+            err=True,
+        )
+        raise typer.Exit(109)
+
+    profiles = synthetic.generate_department(
+        num_authors=authors, publications_per_author=publications, overlap=overlap, seed=seed
+    )
+    synthetic.write_cache(profiles, cache_dir)
+    num_publications = sum(len(profile.articles) for profile in profiles)
+    typer.echo(f"Wrote {len(profiles)} authors with {num_publications} publications to {cache_dir}")
+    if store is not None:
+        from .mock_server import write_store
+
+        num_pages = write_store(profiles, store)
+        typer.echo(f"Wrote {num_pages} pages to {store}")
+
+
 @app.command(help="Download test data")
 def download_test_data(path: Path):
     file_id = "1bX2TL41jcseXvfrMOmwAjBsW9BJ8J5bB"
@@ -6,3 +6,14 @@ DEFAULT_CACHE_DIR = os.getenv(
     Path.home().joinpath(".pygscholar").as_posix(),
 )
 CONFIG_PATH = os.getenv("PYSCHOLAR_CONFIG_PATH", (Path.home() / ".pygscholarrc").as_posix())
+CACHE_FORMAT = os.getenv("PYSCHOLAR_CACHE_FORMAT", "json")
+CACHE_COMPRESSION = os.getenv("PYSCHOLAR_CACHE_COMPRESSION", "none")
+# Verify the checksum of the author files when loading them
+VERIFY_CACHE = os.getenv("PYSCHOLAR_VERIFY_CACHE", "0") == "1"
+# Comma separated list of proxies used by the scholarly backend
+SCHOLARLY_PROXIES = os.getenv("PYSCHOLAR_SCHOLARLY_PROXIES", "")
+SCHOLARLY_MAX_WORKERS = int(os.getenv("PYSCHOLAR_SCHOLARLY_MAX_WORKERS", "4"))
+# Base URL of Google Scholar used by the scraper, e.g to point it at
+# `scholar mock-server`
+DEFAULT_SCHOLAR_URL = "https://scholar.google.com"
+SCHOLAR_URL = os.getenv("PYSCHOLAR_SCHOLAR_URL", DEFAULT_SCHOLAR_URL).rstrip("/")
@@ -1,11 +1,16 @@
 from __future__ import annotations
-from typing import Sequence
+import datetime
+from pathlib import Path
+from typing import Callable, Iterable, Sequence
 
 
 from pydantic import BaseModel
 
+from . import config
 from .author import Author
 from .author import author_pub_diff
+from .cache import load_author
+from .summary import TOPK, AuthorSummary, load_summaries
 
 from .publication import most_cited
 from .publication import Publication
@@ -63,6 +68,143 @@ class Department(BaseModel):
         return topk_age(self.publications_not_older_than(age), k=k)
 
 
+class LazyDepartment:
+    """Department where the authors are loaded from the cache on first
+    access. The top-k queries are answered from the summary index, so
+    only the authors without a summary are loaded. The publications
+    from the summaries do not have abstracts.
+
+    Authors that can not be loaded, e.g because the file is corrupt, are
+    fetched with ``fetch`` if it is given, which receives the name and
+    scholar id of the author."""
+
+    def __init__(
+        self,
+        authors: dict[str, str],
+        cache_dir: Path | str = config.DEFAULT_CACHE_DIR,
+        fetch: Callable[[str, str], Author] | None = None,
+    ) -> None:
+        self.scholar_ids = dict(authors)
+        self.cache_dir = cache_dir
+        self.fetch = fetch
+        self._loaded: dict[str, Author] = {}
+        self._summaries: dict[str, AuthorSummary] | None = None
+
+    def add(self, author: Author) -> None:
+        """Use an author that is already in memory instead of loading it"""
+        if author.scholar_id not in self.scholar_ids.values():
+            self.scholar_ids[author.name] = author.scholar_id
+        self._loaded[author.scholar_id] = author
+
+    def _get(self, scholar_id: str) -> Author | None:
+        if scholar_id not in self._loaded:
+            author = load_author(scholar_id, cache_dir=self.cache_dir)
+            if author is None and self.fetch is not None:
+                name = next(n for n, s in self.scholar_ids.items() if s == scholar_id)
+                author = self.fetch(name, scholar_id)
+            if author is None:
+                return None
+            self._loaded[scholar_id] = author
+        return self._loaded[scholar_id]
+
+    def get_author_by_scholar_id(self, scholar_id: str) -> Author:
+        author = self._get(scholar_id)
+        if author is None:
+            raise RuntimeError(f"Unable to find author with scholar id '{scholar_id}'")
+        return author
+
+    def get_author_by_name(self, name: str) -> Author:
+        for author_name, scholar_id in self.scholar_ids.items():
+            if author_name.lower() == name.lower():
+                return self.get_author_by_scholar_id(scholar_id)
+        raise RuntimeError(f"Unable to find author with name '{name}'")
+
+    @property
+    def summaries(self) -> dict[str, AuthorSummary]:
+        if self._summaries is None:
+            self._summaries = load_summaries(self.cache_dir)
+        return self._summaries
+
+    def _load(self, scholar_ids: Iterable[str]) -> list[Author]:
+        """Load the authors, skipping authors that are not in the cache"""
+        authors = (self._get(scholar_id) for scholar_id in scholar_ids)
+        return [author for author in authors if author is not None]
+
+    def _unsummarized(self) -> set[str]:
+        """Authors that are not loaded and do not have a summary, and
+        therefore always need to be loaded"""
+        return {
+            scholar_id
+            for scholar_id in self.scholar_ids.values()
+            if scholar_id not in self._loaded and scholar_id not in self.summaries
+        }
+
+    def _top(self, attr: str) -> list[Publication]:
+        """The top publications of all authors by citations or by year. These
+        are read from the summaries, and only the authors without a summary
+        are loaded."""
+        publications: list[Publication] = []
+        for scholar_id in self.scholar_ids.values():
+            if scholar_id in self._loaded or scholar_id not in self.summaries:
+                continue
+            publications.extend(getattr(self.summaries[scholar_id], attr))
+        for author in self._load(self._unsummarized() | set(self._loaded)):
+            publications.extend(getattr(author.summary, attr))
+        return publications
+
+    def _published_since(self, age: int) -> set[str]:
+        """Authors that have publications that are not older than ``age``"""
+        year = datetime.date.today().year - age
+        candidates = {
+            scholar_id
+            for scholar_id in self.scholar_ids.values()
+            if scholar_id in self.summaries
+            and any(y >= year for y in self.summaries[scholar_id].publications_per_year)
+        }
+        return candidates | self._unsummarized() | set(self._loaded)
+
+    @property
+    def authors(self) -> list[Author]:
+        return self._load(self.scholar_ids.values())
+
+    @property
+    def names(self) -> set[str]:
+        return set(self.scholar_ids)
+
+    @property
+    def publications(self):
+        return Department.model_construct(authors=self.authors).publications
+
+    def _publications(self, scholar_ids: Iterable[str]) -> tuple[Publication, ...]:
+        return tuple(Department.model_construct(authors=self._load(scholar_ids)).publications)
+
+    @property
+    def most_cited(self):
+        return most_cited(self.topk_cited(1))
+
+    def topk_age(self, k: int) -> Sequence[Publication]:
+        if k > TOPK:
+            return topk_age(self.publications, k=k)
+        return topk_age(self._top("most_recent"), k=k)
+
+    def topk_cited(self, k: int) -> Sequence[Publication]:
+        if k > TOPK:
+            return topk_cited(self.publications, k=k)
+        return topk_cited(self._top("top_cited"), k=k)
+
+    def publications_not_older_than(self, age: int) -> Sequence[Publication]:
+        return publications_not_older_than(self._publications(self._published_since(age)), age)
+
+    def most_cited_not_older_than(self, age: int) -> Publication:
+        return most_cited(self.publications_not_older_than(age))
+
+    def topk_cited_not_older_than(self, k: int, age: int) -> Sequence[Publication]:
+        return topk_cited(self.publications_not_older_than(age), k=k)
+
+    def topk_age_not_older_than(self, k: int, age: int) -> Sequence[Publication]:
+        return topk_age(self.publications_not_older_than(age), k=k)
+
+
 def department_diff(
     new_dep: Department,
     old_dep: Department,
@@ -70,19 +212,17 @@ def department_diff(
     only_new: bool = False,
 ) -> dict[str, Publication]:
     # FIXME: Add overload
-    author_names = new_dep.names.intersection(old_dep.names)
+    old_authors = {author.name: author for author in old_dep.authors}
 
-    all_pubs: list[Publication] = []
-    for name in author_names:
-        new_author = new_dep.get_author_by_name(name)
-        old_author = old_dep.get_author_by_name(name)
-        all_pubs.extend(author_pub_diff(new_author, old_author, only_new=only_new))
+    new_pubs: dict[int, Publication] = {}
+    for new_author in new_dep.authors:
+        old_author = old_authors.get(new_author.name)
+        if old_author is None:
+            continue
+        for p in author_pub_diff(new_author, old_author, only_new=only_new):
+            new_pubs[p.fingerprint] = p
 
-    new_pubs = {p.title: p for p in all_pubs}
     if fill:
-        new_filled_pubs = {}
-        for title, p in new_pubs.items():
-            new_filled_pubs[title] = p.fill()
-        return new_filled_pubs
+        return {p.title: p.fill() for p in new_pubs.values()}
     else:
-        return new_pubs
+        return {p.title: p for p in new_pubs.values()}
@@ -0,0 +1,250 @@
+"""
+Streaming export and import of the publications in the cache.
+
+Each record is one publication together with the name and scholar id of
+the author, so a publication shared between several authors appears once
+for each author. Records are produced and written one at a time, so the
+memory usage does not depend on the size of the cache.
+"""
+
+from __future__ import annotations
+from enum import Enum
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Sequence
+import csv
+import json
+
+from structlog import get_logger
+
+from . import cache
+from . import config
+from .author import Author, AuthorInfo
+from .publication import Publication, fingerprints
+
+logger = get_logger()
+
+AUTHOR_FIELDS = ("author", "scholar_id")
+PUBLICATION_FIELDS = tuple(Publication.model_fields)
+FIELDS = AUTHOR_FIELDS + PUBLICATION_FIELDS
+INT_FIELDS = tuple(
+    name for name, field in Publication.model_fields.items() if field.annotation is int
+)
+
+# Number of records in each row group of the parquet file
+PARQUET_BATCH_SIZE = 1000
+
+
+class ExportFormat(str, Enum):
+    JSONL = "jsonl"
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
+def format_from_path(path: Path | str) -> ExportFormat:
+    suffix = Path(path).suffix.lstrip(".")
+    try:
+        return ExportFormat(suffix)
+    except ValueError:
+        raise ValueError(
+            f"Unable to determine the format of {path}. "
+            f"Expected one of {', '.join('.' + f.value for f in ExportFormat)}"
+        )
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        msg = "Please install pyarrow: 'pip install pyarrow'"
+        raise ImportError(msg) from e
+    return pyarrow
+
+
+def to_record(author: Author, publication: Publication) -> dict[str, Any]:
+    return {"author": author.name, "scholar_id": author.scholar_id, **publication.model_dump()}
+
+
+def iter_records(
+    cache_dir: str = config.DEFAULT_CACHE_DIR,
+    authors: Sequence[str] = (),
+) -> Iterator[dict[str, Any]]:
+    """Yield the publications in the cache one author at a time. If
+    ``authors`` is given only the authors with these names are exported."""
+    names = {name.lower() for name in authors}
+    for name, scholar_id in cache.load_authors(cache_dir).items():
+        if names and name.lower() not in names:
+            continue
+        author = cache.load_author(scholar_id, cache_dir=cache_dir)
+        if author is None:
+            logger.warning(f"Author {name} is not in the cache")
+            continue
+        for publication in author.publications:
+            yield to_record(author, publication)
+
+
+def filter_records(
+    records: Iterable[dict[str, Any]],
+    min_year: int | None = None,
+    max_year: int | None = None,
+    min_citations: int | None = None,
+    authors: Sequence[str] = (),
+) -> Iterator[dict[str, Any]]:
+    names = {name.lower() for name in authors}
+    for record in records:
+        if min_year is not None and record["year"] < min_year:
+            continue
+        if max_year is not None and record["year"] > max_year:
+            continue
+        if min_citations is not None and record["num_citations"] < min_citations:
+            continue
+        if names and record["author"].lower() not in names:
+            continue
+        yield record
+
+
+def write_records(
+    records: Iterable[dict[str, Any]],
+    path: Path | str,
+    fmt: ExportFormat | str | None = None,
+) -> int:
+    """Write the records to ``path`` and return the number of records written"""
+    fmt = ExportFormat(fmt) if fmt is not None else format_from_path(path)
+    if fmt == ExportFormat.JSONL:
+        return _write_jsonl(records, Path(path))
+    elif fmt == ExportFormat.CSV:
+        return _write_csv(records, Path(path))
+    elif fmt == ExportFormat.PARQUET:
+        return _write_parquet(records, Path(path))
+    else:
+        raise ValueError(f"Unknown format {fmt}")
+
+
+def _write_jsonl(records: Iterable[dict[str, Any]], path: Path) -> int:
+    count = 0
+    with open(path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+            count += 1
+    return count
+
+
+def _write_csv(records: Iterable[dict[str, Any]], path: Path) -> int:
+    count = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            count += 1
+    return count
+
+
+def _parquet_schema():
+    pa = _import_pyarrow()
+    return pa.schema([(name, pa.int64() if name in INT_FIELDS else pa.string()) for name in FIELDS])
+
+
+def _write_parquet(records: Iterable[dict[str, Any]], path: Path) -> int:
+    pa = _import_pyarrow()
+    schema = _parquet_schema()
+    count = 0
+    batch: list[dict[str, Any]] = []
+    with pa.parquet.ParquetWriter(path, schema) as writer:
+        for record in records:
+            batch.append(record)
+            if len(batch) >= PARQUET_BATCH_SIZE:
+                writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+                count += len(batch)
+                batch = []
+        if batch or count == 0:
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+            count += len(batch)
+    return count
+
+
+def read_records(
+    path: Path | str, fmt: ExportFormat | str | None = None
+) -> Iterator[dict[str, Any]]:
+    fmt = ExportFormat(fmt) if fmt is not None else format_from_path(path)
+    if fmt == ExportFormat.JSONL:
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif fmt == ExportFormat.CSV:
+        with open(path, newline="") as f:
+            for record in csv.DictReader(f):
+                for name in INT_FIELDS:
+                    record[name] = int(record[name] or 0)
+                yield record
+    elif fmt == ExportFormat.PARQUET:
+        pa = _import_pyarrow()
+        for batch in pa.parquet.ParquetFile(path).iter_batches(batch_size=PARQUET_BATCH_SIZE):
+            yield from batch.to_pylist()
+    else:
+        raise ValueError(f"Unknown format {fmt}")
+
+
+def _save_imported(
+    name: str,
+    scholar_id: str,
+    publications: list[Publication],
+    cache_dir: str,
+) -> None:
+    """Merge the imported publications into the cached author, where imported
+    publications replace cached publications with the same title"""
+    author = cache.load_author(scholar_id, cache_dir=cache_dir)
+    if author is None:
+        author = Author(info=AuthorInfo(name=name, scholar_id=scholar_id))
+    imported = fingerprints(publications)
+    kept = [p for p in author.publications if p.fingerprint not in imported]
+    cache.save_author(
+        Author(info=author.info, publications=kept + publications), cache_dir=cache_dir
+    )
+
+
+def import_records(
+    records: Iterable[dict[str, Any]],
+    cache_dir: str = config.DEFAULT_CACHE_DIR,
+) -> dict[str, int]:
+    """Add the records to the cache and return the number of publications
+    imported for each author. Records are expected to be grouped by author,
+    as written by the export, so that only the publications of one author
+    are kept in memory at a time."""
+    counts: dict[str, int] = {}
+    authors: dict[str, str] = {}
+    current: tuple[str, str] | None = None
+    publications: list[Publication] = []
+    for record in records:
+        key = (record["author"], record["scholar_id"])
+        if key != current:
+            if current is not None:
+                _save_imported(*current, publications, cache_dir=cache_dir)
+            current = key
+            publications = []
+        publications.append(
+            Publication(**{k: v for k, v in record.items() if k in PUBLICATION_FIELDS})
+        )
+        authors[record["author"]] = record["scholar_id"]
+        counts[record["author"]] = counts.get(record["author"], 0) + 1
+    if current is not None:
+        _save_imported(*current, publications, cache_dir=cache_dir)
+    if authors:
+        cache.save_authors(authors, cache_dir=cache_dir)
+    return counts
+
+
+def write_json_array(items: Iterable[Any], path: Path | str, indent: int = 4) -> int:
+    """Write the items as a JSON array, one item at a time"""
+    count = 0
+    with open(path, "w") as f:
+        f.write("[")
+        for item in items:
+            f.write(",\n" if count else "\n")
+            f.write(
+                " " * indent + json.dumps(item, indent=indent).replace("\n", "\n" + " " * indent)
+            )
+            count += 1
+        f.write("\n]" if count else "]")
+    return count
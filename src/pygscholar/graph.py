@@ -0,0 +1,366 @@
+"""
+Co-authorship graph of the authors in the cache.
+
+The graph is updated every time an author is saved and is stored in
+``coauthors.json`` in the cache directory as edge list arrays. Each edge
+goes from an author in the cache (a member) to a collaborator, which is
+either another member, a co-author listed on the profile or a name taken
+from the author lists of the publications. The weight of an edge is the
+number of shared publications. Publications shared between members are
+found with the shared publication index in ``shared_publications.json``.
+"""
+
+from __future__ import annotations
+from array import array
+from itertools import compress
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple
+import json
+import threading
+
+from . import config
+from .author import Author
+from .publication import title_key
+
+# The graph of all authors is stored in one file
+_lock = threading.Lock()
+
+
+class Collaborator(NamedTuple):
+    id: str
+    name: str
+    shared: int
+    # Whether the collaborator is listed as a co-author on the profile
+    profile: bool
+
+
+def graph_file(cache_dir: Path | str) -> Path:
+    return Path(cache_dir) / "coauthors.json"
+
+
+def index_file(cache_dir: Path | str) -> Path:
+    return Path(cache_dir) / "shared_publications.json"
+
+
+def name_key(name: str) -> str:
+    """Key used to match names written in different ways, e.g
+    'Henrik Nicolay Finsberg' and 'H Finsberg' both become 'h finsberg'"""
+    parts = name.replace(".", " ").replace("…", " ").split()
+    if not parts:
+        return ""
+    return f"{parts[0][0].lower()} {parts[-1].lower()}"
+
+
+def publication_authors(authors: str) -> list[str]:
+    return [name.strip() for name in authors.split(",") if name.strip() not in ("", "...")]
+
+
+def profile_coauthors(author: Author) -> list[tuple[str, str]]:
+    """Scholar id and name of the co-authors listed on the profile. These
+    are found in different places for the scraper and scholarly backends."""
+    data = author.info.data
+    coauthors = []
+    for coauthor in data.get("co-authors", []):
+        scholar_id = coauthor.get("profile_link", "").split("user=")[-1].split("&")[0]
+        coauthors.append((scholar_id, coauthor.get("name", "")))
+    for coauthor in data.get("coauthors", []):
+        coauthors.append((coauthor.get("scholar_id", ""), coauthor.get("name", "")))
+    return [(scholar_id, name) for scholar_id, name in coauthors if scholar_id != ""]
+
+
+class CoauthorGraph:
+    def __init__(self) -> None:
+        self.nodes: list[str] = []
+        self.names: list[str] = []
+        self.members: set[int] = set()
+        self.src = array("l")
+        self.dst = array("l")
+        self.shared = array("l")
+        self.profile = array("b")
+        self._index: dict[str, int] = {}
+        self._csr: tuple[array, array, array] | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "CoauthorGraph":
+        graph = cls()
+        graph.nodes = data["nodes"]
+        graph.names = data["names"]
+        graph.members = set(data["members"])
+        graph.src = array("l", data["src"])
+        graph.dst = array("l", data["dst"])
+        graph.shared = array("l", data["shared"])
+        graph.profile = array("b", data["profile"])
+        graph._index = {node: i for i, node in enumerate(graph.nodes)}
+        return graph
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "nodes": self.nodes,
+            "names": self.names,
+            "members": sorted(self.members),
+            "src": self.src.tolist(),
+            "dst": self.dst.tolist(),
+            "shared": self.shared.tolist(),
+            "profile": self.profile.tolist(),
+        }
+
+    def node(self, node_id: str, name: str = "") -> int:
+        if node_id not in self._index:
+            self._index[node_id] = len(self.nodes)
+            self.nodes.append(node_id)
+            self.names.append(name)
+        index = self._index[node_id]
+        if name and not self.names[index]:
+            self.names[index] = name
+        return index
+
+    def add_edge(self, src: int, dst: int, shared: int, profile: bool = False) -> None:
+        self.src.append(src)
+        self.dst.append(dst)
+        self.shared.append(shared)
+        self.profile.append(profile)
+        self._csr = None
+
+    def _filter_edges(self, keep: list[bool]) -> None:
+        self.src = array("l", compress(self.src, keep))
+        self.dst = array("l", compress(self.dst, keep))
+        self.shared = array("l", compress(self.shared, keep))
+        self.profile = array("b", compress(self.profile, keep))
+        self._csr = None
+
+    def remove_edges(self, node: int) -> None:
+        """Remove the edges from the node, and the edges for publications
+        shared between other members and the node"""
+        self._filter_edges(
+            [
+                s != node and not (d == node and s in self.members and not p)
+                for s, d, p in zip(self.src, self.dst, self.profile)
+            ]
+        )
+
+    def remove_edges_to(self, node: int) -> None:
+        self._filter_edges([d != node for d in self.dst])
+
+    def csr(self) -> tuple[array, array, array]:
+        """Undirected adjacency in compressed sparse row format, i.e the
+        neighbours of node ``i`` are ``indices[indptr[i]:indptr[i + 1]]``"""
+        if self._csr is None:
+            n = len(self.nodes)
+            counts = [0] * (n + 1)
+            for s, d in zip(self.src, self.dst):
+                counts[s + 1] += 1
+                counts[d + 1] += 1
+            indptr = array("l", counts)
+            for i in range(n):
+                indptr[i + 1] += indptr[i]
+            fill = indptr[:-1].tolist()
+            indices = array("l", [0] * len(self.src) * 2)
+            edges = array("l", [0] * len(self.src) * 2)
+            for edge, (s, d) in enumerate(zip(self.src, self.dst)):
+                for a, b in ((s, d), (d, s)):
+                    indices[fill[a]] = b
+                    edges[fill[a]] = edge
+                    fill[a] += 1
+            self._csr = (indptr, indices, edges)
+        return self._csr
+
+    def collaborators(self, node_id: str) -> list[Collaborator]:
+        """Collaborators of the author ranked by the number of shared publications"""
+        if node_id not in self._index:
+            raise KeyError(f"Author '{node_id}' is not in the graph")
+        node = self._index[node_id]
+        indptr, indices, edges = self.csr()
+        result: dict[int, Collaborator] = {}
+        for other, edge in zip(
+            indices[indptr[node] : indptr[node + 1]], edges[indptr[node] : indptr[node + 1]]
+        ):
+            old = result.get(other)
+            shared = max(self.shared[edge], old.shared if old else 0)
+            profile = bool(self.profile[edge]) or (old.profile if old else False)
+            result[other] = Collaborator(self.nodes[other], self.names[other], shared, profile)
+        return sorted(result.values(), key=lambda c: (c.shared, c.profile), reverse=True)
+
+    def components(self) -> list[list[str]]:
+        """Groups of members that are connected through shared publications
+        or profile co-authorship with other members, largest first"""
+        indptr, indices, _ = self.csr()
+        seen: set[int] = set()
+        components = []
+        for start in sorted(self.members):
+            if start in seen:
+                continue
+            component = []
+            stack = [start]
+            seen.add(start)
+            while stack:
+                node = stack.pop()
+                component.append(self.nodes[node])
+                for other in indices[indptr[node] : indptr[node + 1]]:
+                    if other in self.members and other not in seen:
+                        seen.add(other)
+                        stack.append(other)
+            components.append(sorted(component))
+        return sorted(components, key=len, reverse=True)
+
+    def external_collaborators(self, k: int | None = None) -> list[tuple[Collaborator, int]]:
+        """Collaborators that are not members, ranked by the number of
+        publications shared with any member. Returns the collaborator
+        together with the number of members they have worked with."""
+        shared: dict[int, int] = {}
+        members: dict[int, int] = {}
+        profile: dict[int, bool] = {}
+        for s, d, w, p in zip(self.src, self.dst, self.shared, self.profile):
+            if d in self.members:
+                continue
+            shared[d] = shared.get(d, 0) + w
+            members[d] = members.get(d, 0) + 1
+            profile[d] = profile.get(d, False) or bool(p)
+        ranked = sorted(shared, key=lambda d: (shared[d], members[d]), reverse=True)[:k]
+        return [
+            (Collaborator(self.nodes[d], self.names[d], shared[d], profile[d]), members[d])
+            for d in ranked
+        ]
+
+
+def load_graph(cache_dir: Path | str = config.DEFAULT_CACHE_DIR) -> CoauthorGraph:
+    path = graph_file(cache_dir)
+    if not path.is_file():
+        return CoauthorGraph()
+    return CoauthorGraph.from_dict(json.loads(path.read_text()))
+
+
+def load_index(cache_dir: Path | str = config.DEFAULT_CACHE_DIR) -> dict[str, list[str]]:
+    path = index_file(cache_dir)
+    if not path.is_file():
+        return {}
+    return json.loads(path.read_text())
+
+
+def _update(graph: CoauthorGraph, index: dict[str, list[str]], author: Author) -> None:
+    scholar_id = author.scholar_id
+    titles = {title_key(p.title) for p in author.publications}
+    for key in list(index):
+        if scholar_id in index[key] and key not in titles:
+            index[key].remove(scholar_id)
+            if not index[key]:
+                index.pop(key)
+    for key in titles:
+        owners = index.setdefault(key, [])
+        if scholar_id not in owners:
+            owners.append(scholar_id)
+
+    node = graph.node(scholar_id, author.name)
+    if node not in graph.members:
+        # Other members may have collaborated with the author before the
+        # author was added, in which case the author is a name in the graph
+        placeholder = graph._index.get(f"name:{name_key(author.name)}")
+        if placeholder is not None:
+            graph.remove_edges_to(placeholder)
+        graph.members.add(node)
+    else:
+        # A new member only has profile edges pointing to it, which are kept
+        graph.remove_edges(node)
+
+    # Publications shared with other members
+    shared: dict[str, int] = {}
+    for key in titles:
+        for other in index[key]:
+            if other != scholar_id:
+                shared[other] = shared.get(other, 0) + 1
+    for other, count in shared.items():
+        other_node = graph.node(other)
+        graph.add_edge(node, other_node, count)
+        graph.add_edge(other_node, node, count)
+
+    # Names from the author lists of the publications, where names that
+    # match a member or a profile co-author are merged with these
+    coauthors = profile_coauthors(author)
+    names = {name_key(graph.names[m]): graph.nodes[m] for m in graph.members}
+    names.update({name_key(name): other for other, name in coauthors})
+    own_key = name_key(author.name)
+    paper_counts: dict[str, int] = {}
+    paper_names: dict[str, str] = {}
+    for pub in author.publications:
+        for name in set(publication_authors(pub.authors)):
+            key = name_key(name)
+            if key in ("", own_key):
+                continue
+            other = names.get(key, f"name:{key}")
+            paper_counts[other] = paper_counts.get(other, 0) + 1
+            paper_names.setdefault(other, name)
+
+    profile_ids: set[str] = set()
+    for other, name in coauthors:
+        if other == scholar_id or other in profile_ids:
+            continue
+        profile_ids.add(other)
+        graph.add_edge(node, graph.node(other, name), paper_counts.get(other, 0), profile=True)
+    member_ids = {graph.nodes[m] for m in graph.members}
+    for other, count in paper_counts.items():
+        if other in profile_ids or other in member_ids:
+            continue
+        graph.add_edge(node, graph.node(other, paper_names[other]), count)
+
+
+def _save(graph: CoauthorGraph, index: dict[str, list[str]], cache_dir: Path | str) -> None:
+    graph_file(cache_dir).write_text(json.dumps(graph.to_dict()))
+    index_file(cache_dir).write_text(json.dumps(index))
+
+
+def update_graph(author: Author, cache_dir: Path | str = config.DEFAULT_CACHE_DIR) -> None:
+    update_graphs([author], cache_dir=cache_dir)
+
+
+def update_graphs(
+    authors: Iterable[Author], cache_dir: Path | str = config.DEFAULT_CACHE_DIR
+) -> None:
+    """Update the graph with several authors, writing the files once"""
+    with _lock:
+        graph = load_graph(cache_dir)
+        index = load_index(cache_dir)
+        for author in authors:
+            _update(graph, index, author)
+        _save(graph, index, cache_dir)
+
+
+def remove_author(scholar_id: str, cache_dir: Path | str = config.DEFAULT_CACHE_DIR) -> None:
+    """Remove the author as a member of the graph. Edges from other members
+    to the author as a profile co-author are kept."""
+    with _lock:
+        graph = load_graph(cache_dir)
+        index = load_index(cache_dir)
+        for key in list(index):
+            if scholar_id in index[key]:
+                index[key].remove(scholar_id)
+                if not index[key]:
+                    index.pop(key)
+        node = graph._index.get(scholar_id)
+        if node is not None and node in graph.members:
+            graph.remove_edges(node)
+            graph.members.discard(node)
+        _save(graph, index, cache_dir)
+
+
+def build_graph(authors: Iterable[Author]) -> CoauthorGraph:
+    """Build the graph in memory from scratch"""
+    graph = CoauthorGraph()
+    index: dict[str, list[str]] = {}
+    for author in authors:
+        _update(graph, index, author)
+    return graph
+
+
+def rebuild_graph(cache_dir: str = config.DEFAULT_CACHE_DIR) -> CoauthorGraph:
+    """Build the graph from all authors in the cache, e.g for caches that
+    were created before the graph was introduced"""
+    from .cache import load_author, load_authors
+
+    graph = CoauthorGraph()
+    index: dict[str, list[str]] = {}
+    for scholar_id in load_authors(cache_dir).values():
+        author = load_author(scholar_id, cache_dir=cache_dir)
+        if author is not None:
+            _update(graph, index, author)
+    with _lock:
+        _save(graph, index, cache_dir)
+    return graph
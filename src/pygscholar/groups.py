@@ -0,0 +1,89 @@
+"""
+Named groups of authors, e.g departments or research groups.
+
+A group is a list of scholar ids stored in ``groups.json`` in the cache
+directory. All groups share the authors in ``authors.json`` and the author
+files in the cache, so an author that is a member of several groups is
+only fetched and stored once.
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Iterable
+import json
+
+from . import cache
+from . import config
+
+
+def groups_file(cache_dir: Path | str) -> Path:
+    return Path(cache_dir) / "groups.json"
+
+
+def load_groups(cache_dir: str = config.DEFAULT_CACHE_DIR) -> dict[str, list[str]]:
+    path = groups_file(cache_dir)
+    if not path.is_file():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_groups(groups: dict[str, list[str]], cache_dir: str = config.DEFAULT_CACHE_DIR) -> None:
+    cache.check_cache_dir_and_create(cache_dir)
+    groups_file(cache_dir).write_text(json.dumps(groups, indent=4))
+
+
+def group_authors(group: str, cache_dir: str = config.DEFAULT_CACHE_DIR) -> dict[str, str]:
+    """Name and scholar id of the authors in the group"""
+    groups = load_groups(cache_dir)
+    if group not in groups:
+        raise KeyError(f"Unknown group '{group}'")
+    members = set(groups[group])
+    return {
+        name: scholar_id
+        for name, scholar_id in cache.load_authors(cache_dir).items()
+        if scholar_id in members
+    }
+
+
+def add_to_group(
+    group: str, scholar_ids: Iterable[str], cache_dir: str = config.DEFAULT_CACHE_DIR
+) -> list[str]:
+    """Add the authors to the group, creating the group if it does not
+    exist. Returns the members of the group."""
+    groups = load_groups(cache_dir)
+    members = groups.setdefault(group, [])
+    for scholar_id in scholar_ids:
+        if scholar_id not in members:
+            members.append(scholar_id)
+    save_groups(groups, cache_dir)
+    return members
+
+
+def remove_from_group(
+    group: str, scholar_ids: Iterable[str], cache_dir: str = config.DEFAULT_CACHE_DIR
+) -> list[str]:
+    groups = load_groups(cache_dir)
+    if group not in groups:
+        raise KeyError(f"Unknown group '{group}'")
+    remove = set(scholar_ids)
+    groups[group] = [scholar_id for scholar_id in groups[group] if scholar_id not in remove]
+    save_groups(groups, cache_dir)
+    return groups[group]
+
+
+def delete_group(group: str, cache_dir: str = config.DEFAULT_CACHE_DIR) -> None:
+    groups = load_groups(cache_dir)
+    if group not in groups:
+        raise KeyError(f"Unknown group '{group}'")
+    groups.pop(group)
+    save_groups(groups, cache_dir)
+
+
+def remove_author(scholar_id: str, cache_dir: str = config.DEFAULT_CACHE_DIR) -> None:
+    """Remove the author from all groups"""
+    groups = load_groups(cache_dir)
+    if not any(scholar_id in members for members in groups.values()):
+        return
+    for group, members in groups.items():
+        groups[group] = [member for member in members if member != scholar_id]
+    save_groups(groups, cache_dir)
@@ -0,0 +1,284 @@
+"""
+Time series of citation counts for each author.
+
+Every time an author is saved to the cache we append a record to
+``history/<scholar_id>.jsonl`` in the cache directory. Most records are
+deltas containing only the publications whose citation count changed,
+and every ``KEYFRAME_INTERVAL`` records we store a full keyframe. The byte
+offset of each keyframe is stored in ``history/<scholar_id>.index.json``
+so that the state at a given date can be reconstructed by reading
+from the closest keyframe instead of from the start of the file.
+The changes are also appended to the change feed, see :mod:`pygscholar.changes`.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+import datetime
+import json
+import os
+
+from structlog import get_logger
+
+from . import changes
+from . import config
+from .author import Author
+from .publication import title_key
+
+logger = get_logger()
+
+KEYFRAME_INTERVAL = 30
+
+
+@dataclass
+class Snapshot:
+    date: datetime.datetime
+    citations: dict[str, int] = field(default_factory=dict)
+    metrics: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def num_citations(self) -> int:
+        return sum(self.citations.values())
+
+
+def history_dir(cache_dir: Path | str) -> Path:
+    return Path(cache_dir) / "history"
+
+
+def history_file(scholar_id: str, cache_dir: Path | str) -> Path:
+    return history_dir(cache_dir) / f"{scholar_id}.jsonl"
+
+
+def index_file(scholar_id: str, cache_dir: Path | str) -> Path:
+    return history_dir(cache_dir) / f"{scholar_id}.index.json"
+
+
+def author_metrics(author: Author) -> dict[str, int]:
+    """Extract the citation metrics from the profile of the author. These
+    are found in different places for the scraper and scholarly backends."""
+    data = author.info.data
+    metrics: dict[str, int] = {}
+    if "info" in data:
+        info = data["info"]
+        for key in ["citations", "h_index", "i10_index"]:
+            if key in info:
+                metrics[key] = info[key]["all"]
+                metrics[f"{key}_5y"] = info[key]["last_5_years"]
+    else:
+        for key, name in [
+            ("citedby", "citations"),
+            ("hindex", "h_index"),
+            ("i10index", "i10_index"),
+        ]:
+            if key in data:
+                metrics[name] = data[key]
+            if f"{key}5y" in data:
+                metrics[f"{name}_5y"] = data[f"{key}5y"]
+    return metrics
+
+
+def citation_counts(author: Author) -> dict[str, int]:
+    return {title_key(p.title): p.num_citations for p in author.publications}
+
+
+def _as_datetime(date: datetime.date | datetime.datetime | str) -> datetime.datetime:
+    if isinstance(date, str):
+        return datetime.datetime.fromisoformat(date)
+    if isinstance(date, datetime.datetime):
+        return date
+    # A date refers to the end of that day
+    return datetime.datetime.combine(date, datetime.time.max)
+
+
+def _load_index(scholar_id: str, cache_dir: Path | str) -> list[tuple[str, int]]:
+    path = index_file(scholar_id, cache_dir)
+    if not path.is_file():
+        return []
+    return [(date, offset) for date, offset in json.loads(path.read_text())]
+
+
+def _read_records(
+    scholar_id: str, cache_dir: Path | str, offset: int = 0
+) -> Iterator[dict[str, Any]]:
+    path = history_file(scholar_id, cache_dir)
+    if not path.is_file():
+        return
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                # The last record was torn by an interrupted append
+                break
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping invalid line in {path}")
+
+
+def _apply(snapshot: Snapshot, record: dict[str, Any]) -> None:
+    snapshot.date = _as_datetime(record["date"])
+    if record["type"] == "keyframe":
+        snapshot.citations = dict(record["citations"])
+        snapshot.metrics = dict(record["metrics"])
+        return
+
+    for key, increment in record.get("citations", {}).items():
+        snapshot.citations[key] = snapshot.citations.get(key, 0) + increment
+    snapshot.citations.update(record.get("added", {}))
+    for key in record.get("removed", []):
+        snapshot.citations.pop(key, None)
+    snapshot.metrics.update(record.get("metrics", {}))
+
+
+def reconstruct(
+    scholar_id: str,
+    date: datetime.date | datetime.datetime | str,
+    cache_dir: Path | str = config.DEFAULT_CACHE_DIR,
+) -> Snapshot | None:
+    """Reconstruct the citation counts of the author at a given date.
+    Returns None if there are no records before that date."""
+    date = _as_datetime(date)
+
+    offset = None
+    for keyframe_date, keyframe_offset in _load_index(scholar_id, cache_dir):
+        if _as_datetime(keyframe_date) > date:
+            break
+        offset = keyframe_offset
+    if offset is None:
+        return None
+
+    snapshot = Snapshot(date=date)
+    for record in _read_records(scholar_id, cache_dir, offset):
+        if _as_datetime(record["date"]) > date:
+            break
+        _apply(snapshot, record)
+    return snapshot
+
+
+def latest(scholar_id: str, cache_dir: Path | str = config.DEFAULT_CACHE_DIR) -> Snapshot | None:
+    index = _load_index(scholar_id, cache_dir)
+    if not index:
+        return None
+    snapshot = Snapshot(date=_as_datetime(index[-1][0]))
+    for record in _read_records(scholar_id, cache_dir, index[-1][1]):
+        _apply(snapshot, record)
+    return snapshot
+
+
+def previous(scholar_id: str, cache_dir: Path | str = config.DEFAULT_CACHE_DIR) -> Snapshot | None:
+    """The state of the author before the most recent record"""
+    snapshot = latest(scholar_id, cache_dir)
+    if snapshot is None:
+        return None
+    return reconstruct(
+        scholar_id, snapshot.date - datetime.timedelta(microseconds=1), cache_dir=cache_dir
+    )
+
+
+def _delta(old: Snapshot, citations: dict[str, int], metrics: dict[str, int]) -> dict[str, Any]:
+    record: dict[str, Any] = {}
+    increments = {
+        key: count - old.citations[key]
+        for key, count in citations.items()
+        if key in old.citations and count != old.citations[key]
+    }
+    added = {key: count for key, count in citations.items() if key not in old.citations}
+    removed = [key for key in old.citations if key not in citations]
+    changed_metrics = {
+        key: value for key, value in metrics.items() if old.metrics.get(key) != value
+    }
+    for name, value in [
+        ("citations", increments),
+        ("added", added),
+        ("removed", removed),
+        ("metrics", changed_metrics),
+    ]:
+        if value:
+            record[name] = value
+    return record
+
+
+def record_snapshot(
+    author: Author,
+    cache_dir: Path | str = config.DEFAULT_CACHE_DIR,
+    date: datetime.datetime | None = None,
+) -> dict[str, Any] | None:
+    """Append the current citation counts of the author to the history.
+    Returns the record that was written, or None if nothing changed
+    since the previous record."""
+    if date is None:
+        date = datetime.datetime.now()
+    citations = citation_counts(author)
+    metrics = author_metrics(author)
+
+    index = _load_index(author.scholar_id, cache_dir)
+    record: dict[str, Any]
+    old: Snapshot | None = None
+    delta: dict[str, Any] | None = None
+    if index:
+        old = Snapshot(date=_as_datetime(index[-1][0]))
+        num_records = 0
+        for old_record in _read_records(author.scholar_id, cache_dir, index[-1][1]):
+            _apply(old, old_record)
+            num_records += 1
+        delta = _delta(old, citations, metrics)
+        if not delta:
+            return None
+        record = {"date": date.isoformat(), "type": "delta", **delta}
+        keyframe = num_records >= KEYFRAME_INTERVAL
+    else:
+        keyframe = True
+
+    if keyframe:
+        record = {
+            "date": date.isoformat(),
+            "type": "keyframe",
+            "citations": citations,
+            "metrics": metrics,
+        }
+
+    path = history_file(author.scholar_id, cache_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as f:
+        offset = f.seek(0, os.SEEK_END)
+        if offset > 0:
+            f.seek(offset - 1)
+            if f.read(1) != b"\n":
+                # Terminate a line torn by an interrupted append, so that
+                # the new record starts on its own line
+                f.write(b"\n")
+                offset += 1
+        f.write(json.dumps(record).encode() + b"\n")
+
+    if keyframe:
+        index.append((record["date"], offset))
+        index_file(author.scholar_id, cache_dir).write_text(json.dumps(index))
+    changes.append_events(changes.author_events(author, old, delta), cache_dir, date)
+    return record
+
+
+def citation_velocity(
+    scholar_id: str,
+    start: datetime.date | datetime.datetime | str,
+    end: datetime.date | datetime.datetime | str,
+    cache_dir: Path | str = config.DEFAULT_CACHE_DIR,
+    title: str | None = None,
+) -> float:
+    """Number of citations gained per day between ``start`` and ``end``,
+    either for all publications or for the publication with the given title"""
+    first = reconstruct(scholar_id, start, cache_dir=cache_dir)
+    last = reconstruct(scholar_id, end, cache_dir=cache_dir)
+    if first is None or last is None:
+        raise ValueError(f"No citation history for {scholar_id} between {start} and {end}")
+
+    days = (_as_datetime(end) - _as_datetime(start)).total_seconds() / 86400
+    if days <= 0:
+        raise ValueError("End date must be after start date")
+
+    if title is None:
+        gained = last.num_citations - first.num_citations
+    else:
+        key = title_key(title)
+        gained = last.citations.get(key, 0) - first.citations.get(key, 0)
+    return gained / days
@@ -0,0 +1,347 @@
+"""
+Local stand-in for Google Scholar for load testing the scraper.
+
+Serves the pages used by the scraper backend
+
+- ``GET /citations?user=<id>&cstart=<n>&pagesize=<m>``: Profile page
+- ``GET /citations?view_op=view_citation&citation_for_view=<id>:<n>``: Article page
+- ``GET /scholar?q=<name>``: Search page
+
+either from a store recorded with ``scholar --record`` or from synthetic
+profiles that are generated on the fly for any scholar id. The server can
+emulate latency, rate limiting (429) and CAPTCHA pages, and the number of
+requests is available from ``GET /mock/stats``. Point the scraper at the
+server by setting ``PYSCHOLAR_SCHOLAR_URL``.
+"""
+
+from __future__ import annotations
+from collections import Counter
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Iterable, Protocol
+from urllib.parse import parse_qs, urlparse
+import hashlib
+import json
+import random
+import threading
+import time
+
+from structlog import get_logger
+
+from .api import scraper
+from .api.replay import Page, as_bytes, load_store, normalize_url
+from .synthetic import (
+    PDF_URL,
+    SyntheticArticle,
+    SyntheticProfile,
+    citation_link,
+    generate_profile,
+    profile_metrics,
+)
+
+logger = get_logger()
+
+CAPTCHA_PAGE = (
+    "<html><body><h1>Please show you're not a robot</h1>"
+    '<form id="gs_captcha_f"><div class="g-recaptcha"></div></form></body></html>'
+)
+
+PAGE_SIZE = 100
+
+
+def scholar_id_from_name(name: str) -> str:
+    return hashlib.blake2b(name.lower().encode(), digest_size=6).hexdigest()
+
+
+def render_profile_page(
+    profile: SyntheticProfile, cstart: int = 0, pagesize: int = PAGE_SIZE
+) -> str:
+    """Profile page with the articles ``cstart`` to ``cstart + pagesize``.
+    As on Google Scholar, the end of the list is marked by an empty page."""
+    metrics = profile_metrics(profile)
+    stats = [
+        metrics[key][period]
+        for key in ("citations", "h_index", "i10_index")
+        for period in ("all", "last_5_years")
+    ]
+    rows = "".join(
+        '<tr class="gsc_a_tr"><td class="gsc_a_t">'
+        f'<a href="{escape(citation_link(profile.scholar_id, i))}" class="gsc_a_at">'
+        f"{escape(article.title)}</a>"
+        f'<div class="gs_gray">{escape(article.authors)}</div>'
+        f'<div class="gs_gray">{escape(article.journal)}</div></td>'
+        f'<td class="gsc_a_c"><a class="gsc_a_ac gs_ibl">{article.citations or ""}</a></td>'
+        f'<td class="gsc_a_y"><span class="gsc_a_h gsc_a_hc gs_ibl">{article.year}</span></td>'
+        "</tr>"
+        for i, article in enumerate(profile.articles[cstart : cstart + pagesize], start=cstart)
+    )
+    if cstart >= len(profile.articles):
+        rows = (
+            '<tr><td class="gsc_a_e" colspan="3">There are no articles in this profile.</td></tr>'
+        )
+    coauthors = "".join(
+        '<li><div class="gsc_rsb_aa"><div class="gsc_rsb_a_desc">'
+        f'<a href="/citations?user={escape(scholar_id)}&amp;hl=en">{escape(name)}</a>'
+        f'<span class="gsc_rsb_a_ext">{escape(profile.affiliation)}</span></div></div></li>'
+        for scholar_id, name in profile.coauthors
+    )
+    return (
+        "<html><body>"
+        f'<div id="gsc_prf_in">{escape(profile.name)}</div>'
+        f'<div class="gsc_prf_il"><a class="gsc_prf_ila">{escape(profile.affiliation)}</a></div>'
+        '<div class="gsc_prf_il" id="gsc_prf_ivh">Verified email at example.org</div>'
+        '<div class="gsc_prf_il" id="gsc_prf_int"><a class="gs_ibl">Scientific computing</a></div>'
+        '<table id="gsc_rsb_st"><tbody>'
+        + "".join(
+            f'<tr><td class="gsc_rsb_std">{total}</td>'
+            f'<td class="gsc_rsb_std">{last_5_years}</td></tr>'
+            for total, last_5_years in zip(stats[::2], stats[1::2])
+        )
+        + "</tbody></table>"
+        f'<ul class="gsc_rsb_a">{coauthors}</ul>'
+        f'<table id="gsc_a_t"><tbody id="gsc_a_b">{rows}</tbody></table>'
+        "</body></html>"
+    )
+
+
+def render_citation_page(article: SyntheticArticle) -> str:
+    fields = [
+        ("Authors", article.authors),
+        ("Publication date", str(article.year)),
+        ("Journal", article.journal),
+        ("Description", article.abstract),
+        ("Total citations", f"Cited by {article.citations}"),
+    ]
+    return (
+        "<html><body>"
+        f'<div id="gsc_oci_title"><a class="gsc_oci_title_link">{escape(article.title)}</a></div>'
+        '<div id="gsc_oci_title_gg"><div class="gsc_oci_title_ggi">'
+        f'<a href="{PDF_URL}">[PDF] example.org</a></div></div>'
+        '<div id="gsc_oci_table">'
+        + "".join(
+            f'<div class="gs_scl"><div class="gsc_oci_field">{field}</div>'
+            f'<div class="gsc_oci_value">{escape(value)}</div></div>'
+            for field, value in fields
+        )
+        + "</div></body></html>"
+    )
+
+
+def render_search_page(profiles: list[SyntheticProfile]) -> str:
+    results = "".join(
+        f'<h4 class="gs_rt2"><a href="/citations?user={escape(p.scholar_id)}&amp;hl=en&amp;oi=ao">'
+        f"{escape(p.name)}</a></h4>"
+        for p in profiles
+    )
+    return f'<html><body><div id="gs_res_ccl">{results}</div></body></html>'
+
+
+def write_store(profiles: Iterable[SyntheticProfile], path: Path | str, full: bool = True) -> int:
+    """Write the pages that the scraper requests for the profiles to a
+    store that can be used with ``scholar --replay`` or served with
+    ``scholar mock-server --store``. If ``full`` is false the article pages
+    are left out. Returns the number of pages."""
+    num_pages = 0
+    with open(path, "w") as f:
+
+        def write(url: str, page: str) -> None:
+            nonlocal num_pages
+            f.write(json.dumps({"url": normalize_url(url), "page": page}) + "\n")
+            num_pages += 1
+
+        for profile in profiles:
+            write(scraper.search_url(profile.name), render_search_page([profile]))
+            # Including the empty page that marks the end of the articles
+            last = -(-len(profile.articles) // PAGE_SIZE) * PAGE_SIZE
+            for cstart in range(0, last + PAGE_SIZE, PAGE_SIZE):
+                write(
+                    scraper.profile_url(profile.scholar_id, cstart),
+                    render_profile_page(profile, cstart=cstart),
+                )
+            if full:
+                for i, article in enumerate(profile.articles):
+                    write(citation_link(profile.scholar_id, i), render_citation_page(article))
+    return num_pages
+
+
+class PageSource(Protocol):
+    def get_page(self, path: str) -> Page | None: ...
+
+
+class ReplaySource:
+    """Serve the pages recorded with ``scholar --record``"""
+
+    def __init__(self, path: Path | str) -> None:
+        self.pages = load_store(path)
+
+    def get_page(self, path: str) -> Page | None:
+        return self.pages.get(normalize_url(path))
+
+
+class SyntheticSource:
+    """Serve synthetic profiles with ``num_articles`` articles for any
+    scholar id. The profiles are deterministic given the seed, and
+    ``profiles`` can be used to serve specific profiles."""
+
+    def __init__(
+        self,
+        num_articles: int = 100,
+        seed: int = 0,
+        profiles: dict[str, SyntheticProfile] | None = None,
+    ) -> None:
+        self.num_articles = num_articles
+        self.seed = seed
+        self.profiles = dict(profiles or {})
+        self._lock = threading.Lock()
+
+    def profile(self, scholar_id: str, name: str = "") -> SyntheticProfile:
+        with self._lock:
+            if scholar_id not in self.profiles:
+                self.profiles[scholar_id] = generate_profile(
+                    scholar_id, name or f"Author {scholar_id}", self.num_articles, seed=self.seed
+                )
+            return self.profiles[scholar_id]
+
+    def get_page(self, path: str) -> str | None:
+        url = urlparse(path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path == "/scholar" and "q" in query:
+            name = query["q"].title()
+            return render_search_page([self.profile(scholar_id_from_name(name), name)])
+        if url.path != "/citations":
+            return None
+        if query.get("view_op") == "view_citation":
+            scholar_id, _, index = query.get("citation_for_view", "").rpartition(":")
+            articles = self.profile(scholar_id).articles
+            if not index.isdigit() or int(index) >= len(articles):
+                return None
+            return render_citation_page(articles[int(index)])
+        if "user" in query:
+            return render_profile_page(
+                self.profile(query["user"]),
+                cstart=int(query.get("cstart", 0)),
+                pagesize=int(query.get("pagesize", 20)),
+            )
+        return None
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    server: "MockScholarServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(format % args)
+
+    def _send(self, body: Page, status: int = 200, content_type: str = "text/html") -> None:
+        data = as_bytes(body)
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 429:
+            self.send_header("Retry-After", str(self.server.retry_after))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        if urlparse(self.path).path == "/mock/stats":
+            self._send(json.dumps(dict(self.server.stats)), content_type="application/json")
+            return
+        outcome = self.server.outcome()
+        if self.server.latency > 0:
+            self.server.sleep(self.server.latency)
+        if outcome == "rate_limited":
+            self._send("Too Many Requests", status=429)
+        elif outcome == "captcha":
+            self._send(CAPTCHA_PAGE)
+        else:
+            page = self.server.source.get_page(self.path)
+            if page is None:
+                self.server.count("not_found")
+                self._send("Not Found", status=404)
+            else:
+                self._send(page)
+
+
+class MockScholarServer(ThreadingHTTPServer):
+    """Serve the pages from ``source``, where a fraction ``error_rate`` of
+    the requests are rate limited and a fraction ``captcha_rate`` get a
+    CAPTCHA page, after ``latency`` seconds."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        source: PageSource,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        captcha_rate: float = 0.0,
+        retry_after: float = 0.0,
+        seed: int | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        super().__init__(address, MockRequestHandler)
+        self.source = source
+        self.latency = latency
+        self.error_rate = error_rate
+        self.captcha_rate = captcha_rate
+        self.retry_after = retry_after
+        self.sleep = sleep
+        self.stats: Counter[str] = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}"
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def outcome(self) -> str:
+        with self._lock:
+            self.stats["requests"] += 1
+            x = self._random.random()
+            if x < self.error_rate:
+                outcome = "rate_limited"
+            elif x < self.error_rate + self.captcha_rate:
+                outcome = "captcha"
+            else:
+                outcome = "ok"
+            self.stats[outcome] += 1
+        return outcome
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8001,
+    store: Path | str | None = None,
+    num_articles: int = 100,
+    latency: float = 0.0,
+    error_rate: float = 0.0,
+    captcha_rate: float = 0.0,
+    seed: int | None = None,
+) -> None:
+    source: PageSource
+    if store is not None:
+        source = ReplaySource(store)
+    else:
+        source = SyntheticSource(num_articles, seed=seed or 0)
+    with MockScholarServer(
+        (host, port),
+        source,
+        latency=latency,
+        error_rate=error_rate,
+        captcha_rate=captcha_rate,
+        seed=seed,
+    ) as server:
+        logger.info(f"Serving mock Google Scholar on {server.url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import datetime
+import hashlib
 from functools import reduce
-from typing import Sequence
+from typing import Any, Iterable, Sequence
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, ValidationInfo, model_validator
 from structlog import get_logger
 
 
@@ -25,29 +26,65 @@ class Publication(BaseModel):
     pdf_url: str = ""
     scholar_url: str = ""
     date: str = ""
+    # Hash of the normalized title, see ``title_fingerprint``
+    fingerprint: int = 0
 
     model_config = ConfigDict(frozen=True)
 
+    @model_validator(mode="before")
+    @classmethod
+    def _add_fingerprint(cls, data: Any, info: ValidationInfo) -> Any:
+        """Compute the fingerprint from the title. A stored fingerprint is only
+        kept when validating with the ``TRUSTED_FINGERPRINTS`` context, i.e
+        for files written by pygscholar itself."""
+        if not isinstance(data, dict):
+            return data
+        trusted = bool(info.context and info.context.get("trusted_fingerprints"))
+        if not (trusted and data.get("fingerprint")):
+            data = {**data, "fingerprint": title_fingerprint(data.get("title", ""))}
+        return data
+
     @property
     def age(self) -> int:
         year = datetime.date.today().year
         return year - self.year
 
-    def fill(self) -> "Publication":
+    def fill(self, cache_dir: str | None = None) -> "Publication":
         from .api import fill_publication
 
-        return fill_publication(self)
+        return fill_publication(self, cache_dir=cache_dir)
+
+
+# Validation context for data where the fingerprints are known to match
+# the titles, e.g the author files in the cache
+TRUSTED_FINGERPRINTS = {"trusted_fingerprints": True}
+
+
+def title_key(title: str) -> str:
+    """Key used to identify the same publication across snapshots"""
+    return title.lower().strip()
+
+
+def title_fingerprint(title: str) -> int:
+    """Signed 64-bit hash of ``title_key``, stored with each publication so
+    that publications can be compared as integers"""
+    digest = hashlib.blake2b(title_key(title).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+def fingerprints(publications: Iterable[Publication]) -> set[int]:
+    return {pub.fingerprint for pub in publications}
 
 
 def remove_duplicate_publications(
     publications: Sequence[Publication],
 ) -> tuple[Publication, ...]:
     uniqe_publications = []
-    titles = []
+    seen: set[int] = set()
     for pub in publications:
-        if pub.title in titles:
+        if pub.fingerprint in seen:
             continue
-        titles.append(pub.title)
+        seen.add(pub.fingerprint)
         uniqe_publications.append(pub)
 
     return tuple(uniqe_publications)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+from enum import Enum
+from typing import Iterable, Mapping, Sequence
+
+from .author import Author
+from .publication import Publication, remove_duplicate_publications, title_key
+
+
+class SortBy(str, Enum):
+    CITATIONS = "citations"
+    AGE = "age"
+    GROWTH = "growth"
+    CITATIONS_PER_YEAR = "citations-per-year"
+    H_INDEX = "h-index"
+
+    @property
+    def description(self) -> str:
+        return {
+            SortBy.CITATIONS: "citations",
+            SortBy.AGE: "age",
+            SortBy.GROWTH: "citations gained since last refresh",
+            SortBy.CITATIONS_PER_YEAR: "citations per year",
+            SortBy.H_INDEX: "h-index contribution",
+        }[self]
+
+
+def citation_counts(authors: Iterable[Author]) -> dict[str, int]:
+    """Citation count of each publication of the authors, keyed by ``title_key``"""
+    counts: dict[str, int] = {}
+    for author in authors:
+        for pub in author.publications:
+            key = title_key(pub.title)
+            counts[key] = max(counts.get(key, 0), pub.num_citations)
+    return counts
+
+
+def citation_growth(publication: Publication, previous: Mapping[str, int]) -> int:
+    """Number of citations gained since the previous refresh. Publications
+    that did not exist in the previous refresh have gained all their citations."""
+    return publication.num_citations - previous.get(title_key(publication.title), 0)
+
+
+def citations_per_year(publication: Publication) -> float:
+    # Publications from this year count as one year old
+    return publication.num_citations / max(publication.age, 1)
+
+
+def h_index(publications: Iterable[Publication]) -> int:
+    citations = sorted((pub.num_citations for pub in publications), reverse=True)
+    h = 0
+    for i, num_citations in enumerate(citations, start=1):
+        if num_citations < i:
+            break
+        h = i
+    return h
+
+
+def h_core(publications: Sequence[Publication]) -> set[str]:
+    """Keys of the publications that contribute to the h-index"""
+    h = h_index(publications)
+    ranked = sorted(publications, key=lambda p: p.num_citations, reverse=True)
+    return {title_key(pub.title) for pub in ranked[:h]}
+
+
+def h_index_contribution(authors: Iterable[Author]) -> dict[str, int]:
+    """Number of authors whose h-core contains each publication"""
+    contribution: dict[str, int] = {}
+    for author in authors:
+        for key in h_core(remove_duplicate_publications(author.publications)):
+            contribution[key] = contribution.get(key, 0) + 1
+    return contribution
+
+
+def rank(
+    publications: Iterable[Publication],
+    sort_by: SortBy,
+    k: int,
+    authors: Iterable[Author] = (),
+    previous: Mapping[str, int] | None = None,
+) -> tuple[Publication, ...]:
+    """Return the top ``k`` publications according to ``sort_by``.
+
+    ``previous`` is the citation count of each publication from the previous
+    refresh, and is only used when sorting by growth. ``authors`` are used
+    to compute the h-index contribution."""
+    publications = remove_duplicate_publications(tuple(publications))
+    if sort_by == SortBy.CITATIONS:
+        key = lambda p: p.num_citations
+    elif sort_by == SortBy.AGE:
+        # Most recent first
+        key = lambda p: -p.age
+    elif sort_by == SortBy.GROWTH:
+        previous = previous or {}
+        key = lambda p: (citation_growth(p, previous), p.num_citations)
+    elif sort_by == SortBy.CITATIONS_PER_YEAR:
+        key = citations_per_year
+    elif sort_by == SortBy.H_INDEX:
+        contribution = h_index_contribution(authors)
+        key = lambda p: (contribution.get(title_key(p.title), 0), p.num_citations)
+    else:
+        raise ValueError(f"Unknown sort order {sort_by}")
+
+    return tuple(sorted(publications, key=key, reverse=True)[:k])
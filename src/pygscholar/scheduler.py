@@ -0,0 +1,177 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Callable
+import datetime
+import time
+
+from pydantic import BaseModel, Field, ValidationError
+from structlog import get_logger
+
+from . import api
+from . import cache
+from . import config
+from .author import Author, author_pub_diff
+
+logger = get_logger()
+
+# Weight of the most recent observation in the publication rate
+RATE_SMOOTHING = 0.5
+
+
+class AuthorRefreshState(BaseModel):
+    name: str
+    last_fetched: datetime.datetime | None = None
+    # Estimated number of new publications per year
+    publication_rate: float = 0.0
+    # Number of refreshes that failed since the last successful one
+    failures: int = 0
+    last_error: str | None = None
+
+    def staleness(self, now: datetime.datetime) -> float:
+        """Number of days since the author was last fetched"""
+        if self.last_fetched is None:
+            return float("inf")
+        return max((now - self.last_fetched).total_seconds() / 86400, 0.0)
+
+    def priority(self, now: datetime.datetime) -> float:
+        """Stale authors and authors that publish often come first, while
+        authors that keep failing are pushed back"""
+        return self.staleness(now) * (1 + self.publication_rate) / (1 + self.failures)
+
+
+class RefreshState(BaseModel):
+    authors: dict[str, AuthorRefreshState] = Field(default_factory=dict)
+    # Authors that are scheduled but not yet refreshed in the current run
+    queue: list[str] = Field(default_factory=list)
+
+
+def state_file(cache_dir: Path | str) -> Path:
+    return Path(cache_dir) / "refresh_queue.json"
+
+
+def load_state(cache_dir: Path | str = config.DEFAULT_CACHE_DIR) -> RefreshState:
+    path = state_file(cache_dir)
+    if not path.is_file():
+        return RefreshState()
+    try:
+        return RefreshState.model_validate_json(path.read_bytes())
+    except ValidationError as e:
+        logger.critical(e, exc_info=True)
+        return RefreshState()
+
+
+def save_state(state: RefreshState, cache_dir: Path | str = config.DEFAULT_CACHE_DIR) -> None:
+    cache.check_cache_dir_and_create(cache_dir)
+    state_file(cache_dir).write_text(state.model_dump_json(indent=2))
+
+
+class RefreshScheduler:
+    """Refresh the authors in the cache, a few at a time.
+
+    Each run picks the ``budget`` authors with the highest priority, where
+    stale authors and authors that publish often are prioritized, and spreads
+    the requests evenly over ``window`` seconds. The queue is persisted in
+    the cache directory after each author so that an interrupted run is
+    resumed by the next one.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = config.DEFAULT_CACHE_DIR,
+        budget: int = 10,
+        window: float = 0.0,
+        backend: api.APIBackend = api.APIBackend.SCRAPER,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.budget = budget
+        self.window = window
+        self.backend = backend
+        self.sleep = sleep
+        self.state = load_state(cache_dir)
+
+    def sync(self) -> None:
+        """Make the scheduler state match the authors in the cache"""
+        authors = cache.load_authors(self.cache_dir)
+        for name, scholar_id in authors.items():
+            if scholar_id in self.state.authors:
+                self.state.authors[scholar_id].name = name
+                continue
+            # Use the modification time of an existing cache file as an
+            # estimate of when the author was last fetched
+            last_fetched = None
+            path = cache.find_author_file(scholar_id, self.cache_dir)
+            if path is not None:
+                last_fetched = datetime.datetime.fromtimestamp(path.stat().st_mtime)
+            self.state.authors[scholar_id] = AuthorRefreshState(
+                name=name, last_fetched=last_fetched
+            )
+
+        scholar_ids = set(authors.values())
+        for scholar_id in list(self.state.authors):
+            if scholar_id not in scholar_ids:
+                self.state.authors.pop(scholar_id)
+        self.state.queue = [s for s in self.state.queue if s in scholar_ids]
+
+    def plan(self, now: datetime.datetime | None = None) -> list[str]:
+        """Scholar ids of the authors to refresh, in order of priority"""
+        if now is None:
+            now = datetime.datetime.now()
+        ranked = sorted(
+            self.state.authors,
+            key=lambda scholar_id: self.state.authors[scholar_id].priority(now),
+            reverse=True,
+        )
+        return ranked[: self.budget]
+
+    def refresh_author(self, scholar_id: str, now: datetime.datetime | None = None) -> Author:
+        if now is None:
+            now = datetime.datetime.now()
+        author_state = self.state.authors[scholar_id]
+        old_author = cache.load_author(scholar_id, cache_dir=self.cache_dir)
+        author = api.search_author_with_publications(
+            name=author_state.name, scholar_id=scholar_id, full=False, backend=self.backend
+        )
+        cache.save_author(author=author, cache_dir=self.cache_dir)
+
+        if old_author is not None and author_state.last_fetched is not None:
+            days = max((now - author_state.last_fetched).total_seconds() / 86400, 1.0)
+            rate = len(author_pub_diff(author, old_author)) / days * 365
+            author_state.publication_rate = (
+                RATE_SMOOTHING * rate + (1 - RATE_SMOOTHING) * author_state.publication_rate
+            )
+        author_state.last_fetched = now
+        author_state.failures = 0
+        author_state.last_error = None
+        return author
+
+    def run(self) -> list[Author]:
+        """Refresh the authors in the queue, or plan a new queue if the
+        previous run was completed. Returns the refreshed authors.
+
+        An author that fails is logged, recorded in its state and removed
+        from the queue, so that it does not block the rest of the queue."""
+        self.sync()
+        if not self.state.queue:
+            self.state.queue = self.plan()
+        else:
+            logger.info(f"Resuming refresh of {len(self.state.queue)} author(s)")
+        save_state(self.state, self.cache_dir)
+
+        delay = self.window / max(len(self.state.queue), 1)
+        authors = []
+        while self.state.queue:
+            scholar_id = self.state.queue[0]
+            author_state = self.state.authors[scholar_id]
+            logger.info(f"Refreshing {author_state.name}")
+            try:
+                authors.append(self.refresh_author(scholar_id))
+            except Exception as e:
+                logger.error(f"Failed to refresh {author_state.name}: {e}")
+                author_state.failures += 1
+                author_state.last_error = f"{type(e).__name__}: {e}"
+            self.state.queue.pop(0)
+            save_state(self.state, self.cache_dir)
+            if self.state.queue and delay > 0:
+                self.sleep(delay)
+        return authors
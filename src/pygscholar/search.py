@@ -0,0 +1,189 @@
+"""
+Full text search over the publications in the cache.
+
+The index is a SQLite database with an FTS5 table over the title,
+authors, journal and abstract of every cached publication, stored in
+``search.sqlite`` in the cache directory. It is updated when an author
+is saved and when a publication is filled.
+"""
+
+from __future__ import annotations
+from contextlib import closing
+from pathlib import Path
+from typing import Iterable, NamedTuple
+import json
+import re
+import sqlite3
+
+from . import config
+from .author import Author
+from .publication import Publication, title_key
+
+# Weight of the title, authors, journal and abstract in the ranking
+WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (id INTEGER PRIMARY KEY, key TEXT UNIQUE, data TEXT);
+CREATE TABLE IF NOT EXISTS owners (
+    key TEXT, scholar_id TEXT, PRIMARY KEY (key, scholar_id)
+);
+CREATE INDEX IF NOT EXISTS owners_scholar_id ON owners (scholar_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS fts USING fts5(title, authors, journal, abstract);
+"""
+
+
+class SearchResult(NamedTuple):
+    publication: Publication
+    # Scholar ids of the authors in the cache with this publication
+    scholar_ids: list[str]
+    score: float
+
+
+def index_file(cache_dir: Path | str) -> Path:
+    return Path(cache_dir) / "search.sqlite"
+
+
+def connect(cache_dir: Path | str) -> sqlite3.Connection:
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(index_file(cache_dir), timeout=30)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _merge(old: dict, new: dict) -> dict:
+    """Keep filled in fields, e.g the abstract, that are missing in the
+    new version of the publication"""
+    return {k: (old.get(k) or v) if isinstance(v, str) and v == "" else v for k, v in new.items()}
+
+
+def _upsert(conn: sqlite3.Connection, publication: Publication, insert: bool = True) -> None:
+    key = title_key(publication.title)
+    data = publication.model_dump()
+    row = conn.execute("SELECT id, data FROM docs WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        if not insert:
+            return
+        doc_id = conn.execute(
+            "INSERT INTO docs (key, data) VALUES (?, ?)", (key, json.dumps(data))
+        ).lastrowid
+    else:
+        doc_id = row[0]
+        data = _merge(json.loads(row[1]), data)
+        conn.execute("UPDATE docs SET data = ? WHERE id = ?", (json.dumps(data), doc_id))
+        conn.execute("DELETE FROM fts WHERE rowid = ?", (doc_id,))
+    conn.execute(
+        "INSERT INTO fts (rowid, title, authors, journal, abstract) VALUES (?, ?, ?, ?, ?)",
+        (doc_id, data["title"], data["authors"], data["journal"], data["abstract"]),
+    )
+
+
+def _delete_orphans(conn: sqlite3.Connection, keys: Iterable[str]) -> None:
+    for key in keys:
+        if conn.execute("SELECT 1 FROM owners WHERE key = ?", (key,)).fetchone():
+            continue
+        row = conn.execute("SELECT id FROM docs WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            conn.execute("DELETE FROM fts WHERE rowid = ?", (row[0],))
+            conn.execute("DELETE FROM docs WHERE id = ?", (row[0],))
+
+
+def _index_author(conn: sqlite3.Connection, author: Author) -> None:
+    scholar_id = author.scholar_id
+    old_keys = {
+        row[0] for row in conn.execute("SELECT key FROM owners WHERE scholar_id = ?", (scholar_id,))
+    }
+    conn.execute("DELETE FROM owners WHERE scholar_id = ?", (scholar_id,))
+    new_keys = set()
+    for publication in author.publications:
+        key = title_key(publication.title)
+        if key in new_keys:
+            continue
+        new_keys.add(key)
+        _upsert(conn, publication)
+        conn.execute("INSERT INTO owners (key, scholar_id) VALUES (?, ?)", (key, scholar_id))
+    _delete_orphans(conn, old_keys - new_keys)
+
+
+def index_author(author: Author, cache_dir: Path | str = config.DEFAULT_CACHE_DIR) -> None:
+    index_authors([author], cache_dir=cache_dir)
+
+
+def index_authors(
+    authors: Iterable[Author], cache_dir: Path | str = config.DEFAULT_CACHE_DIR
+) -> None:
+    """Index several authors in one transaction"""
+    with closing(connect(cache_dir)) as conn, conn:
+        for author in authors:
+            _index_author(conn, author)
+
+
+def remove_author(scholar_id: str, cache_dir: Path | str = config.DEFAULT_CACHE_DIR) -> None:
+    """Remove the author, and the publications that no other author has"""
+    if not index_file(cache_dir).is_file():
+        return
+    with closing(connect(cache_dir)) as conn, conn:
+        keys = [
+            row[0]
+            for row in conn.execute("SELECT key FROM owners WHERE scholar_id = ?", (scholar_id,))
+        ]
+        conn.execute("DELETE FROM owners WHERE scholar_id = ?", (scholar_id,))
+        _delete_orphans(conn, keys)
+
+
+def index_publication(
+    publication: Publication, cache_dir: Path | str = config.DEFAULT_CACHE_DIR
+) -> None:
+    """Update a publication that is already in the index, e.g after it is filled"""
+    if not index_file(cache_dir).is_file():
+        return
+    with closing(connect(cache_dir)) as conn, conn:
+        _upsert(conn, publication, insert=False)
+
+
+def rebuild_index(cache_dir: str = config.DEFAULT_CACHE_DIR) -> None:
+    """Index all authors in the cache, e.g for caches that were created
+    before the index was introduced"""
+    from .cache import load_author, load_authors
+
+    with closing(connect(cache_dir)) as conn, conn:
+        for scholar_id in load_authors(cache_dir).values():
+            author = load_author(scholar_id, cache_dir=cache_dir)
+            if author is not None:
+                _index_author(conn, author)
+
+
+def to_fts_query(query: str) -> str:
+    """Match all words in the query, where the last word can be a prefix"""
+    words = re.findall(r"\w+", query)
+    if not words:
+        return ""
+    return " ".join(f'"{word}"' for word in words[:-1]) + f' "{words[-1]}"*'
+
+
+def search(
+    query: str,
+    cache_dir: Path | str = config.DEFAULT_CACHE_DIR,
+    k: int = 10,
+    raw: bool = False,
+) -> list[SearchResult]:
+    """Search for publications ranked by relevance. If ``raw`` is true the
+    query is passed directly to FTS5, e.g to use ``OR`` or column filters."""
+    fts_query = query if raw else to_fts_query(query)
+    if fts_query == "" or not index_file(cache_dir).is_file():
+        return []
+    weights = ", ".join(str(w) for w in WEIGHTS)
+    with closing(connect(cache_dir)) as conn:
+        rows = conn.execute(
+            f"SELECT docs.key, docs.data, bm25(fts, {weights}) AS score FROM fts "
+            "JOIN docs ON docs.id = fts.rowid WHERE fts MATCH ? ORDER BY score LIMIT ?",
+            (fts_query, k),
+        ).fetchall()
+        results = []
+        for key, data, score in rows:
+            scholar_ids = [
+                row[0]
+                for row in conn.execute("SELECT scholar_id FROM owners WHERE key = ?", (key,))
+            ]
+            # bm25 is negative where lower is better
+            results.append(SearchResult(Publication(**json.loads(data)), scholar_ids, -score))
+    return results
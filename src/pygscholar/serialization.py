@@ -0,0 +1,105 @@
+from __future__ import annotations
+from enum import Enum
+from typing import Any
+import gzip
+import json
+import lzma
+
+
+class CacheFormat(str, Enum):
+    JSON = "json"
+    MSGPACK = "msgpack"
+    CBOR = "cbor"
+
+
+class Compression(str, Enum):
+    NONE = "none"
+    GZIP = "gzip"
+    LZMA = "lzma"
+
+
+_compression_suffix = {
+    Compression.NONE: "",
+    Compression.GZIP: ".gz",
+    Compression.LZMA: ".xz",
+}
+
+
+def suffix(fmt: CacheFormat, compression: Compression = Compression.NONE) -> str:
+    return f".{fmt.value}{_compression_suffix[compression]}"
+
+
+def all_suffixes() -> list[str]:
+    return [suffix(fmt, compression) for fmt in CacheFormat for compression in Compression]
+
+
+def parse_suffix(name: str) -> tuple[CacheFormat, Compression]:
+    for fmt in CacheFormat:
+        for compression in Compression:
+            if name.endswith(suffix(fmt, compression)):
+                return fmt, compression
+    raise ValueError(f"Unknown cache file format for {name}")
+
+
+def _import_msgpack():
+    try:
+        import msgpack
+    except ImportError as e:
+        msg = "Please install msgpack: 'pip install msgpack'"
+        raise ImportError(msg) from e
+    return msgpack
+
+
+def _import_cbor2():
+    try:
+        import cbor2
+    except ImportError as e:
+        msg = "Please install cbor2: 'pip install cbor2'"
+        raise ImportError(msg) from e
+    return cbor2
+
+
+def dumps(data: Any, fmt: CacheFormat) -> bytes:
+    if fmt == CacheFormat.JSON:
+        return json.dumps(data, separators=(",", ":")).encode()
+    elif fmt == CacheFormat.MSGPACK:
+        return _import_msgpack().packb(data, use_bin_type=True)
+    elif fmt == CacheFormat.CBOR:
+        return _import_cbor2().dumps(data)
+    else:
+        raise ValueError(f"Unknown format {fmt}")
+
+
+def loads(data: bytes, fmt: CacheFormat) -> Any:
+    if fmt == CacheFormat.JSON:
+        return json.loads(data)
+    elif fmt == CacheFormat.MSGPACK:
+        return _import_msgpack().unpackb(data, raw=False, strict_map_key=False)
+    elif fmt == CacheFormat.CBOR:
+        return _import_cbor2().loads(data)
+    else:
+        raise ValueError(f"Unknown format {fmt}")
+
+
+def compress(data: bytes, compression: Compression) -> bytes:
+    if compression == Compression.NONE:
+        return data
+    elif compression == Compression.GZIP:
+        return gzip.compress(data)
+    elif compression == Compression.LZMA:
+        return lzma.compress(data)
+    else:
+        raise ValueError(f"Unknown compression {compression}")
+
+
+def decompress(data: bytes, compression: Compression) -> bytes:
+    try:
+        if compression == Compression.NONE:
+            return data
+        elif compression == Compression.GZIP:
+            return gzip.decompress(data)
+        elif compression == Compression.LZMA:
+            return lzma.decompress(data)
+    except (OSError, EOFError, lzma.LZMAError) as e:
+        raise ValueError(f"Unable to decompress data with {compression.value}") from e
+    raise ValueError(f"Unknown compression {compression}")
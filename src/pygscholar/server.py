@@ -0,0 +1,360 @@
+"""
+Long running service that keeps the department in memory and answers
+the same queries as the command line interface over HTTP/JSON.
+
+Endpoints (all return JSON)
+
+- ``GET /authors``: All authors together with their summary
+- ``GET /authors/<name>/publications``: Publications of one author, or
+  404 if there is no author with that name
+- ``GET /department/publications``: Publications of the department
+- ``GET /department/new``: New publications found by the last refresh
+- ``POST /refresh``: Start refreshing all authors in the background.
+  Returns 202, or 409 if a refresh is already running
+- ``GET /refresh``: Status of the refresh, including the error of the
+  last refresh if it failed
+
+The publication endpoints accept the query parameters ``n``, ``sort_by``,
+``max_age`` and ``add_authors``.
+"""
+
+from __future__ import annotations
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, unquote, urlparse
+import datetime
+import json
+import threading
+import time
+
+from structlog import get_logger
+
+from . import api
+from . import cache
+from . import config
+from . import history
+from . import summary
+from .author import Author
+from .department import Department, department_diff
+from .publication import Publication
+from .ranking import SortBy
+from .scheduler import RefreshScheduler
+
+logger = get_logger()
+
+
+class UnknownAuthorError(LookupError):
+    """Raised when querying an author that is not in the department"""
+
+
+class DepartmentState:
+    """In memory state of the department which is reloaded from the
+    cache directory whenever the files on disk change"""
+
+    def __init__(
+        self,
+        cache_dir: str = config.DEFAULT_CACHE_DIR,
+        backend: api.APIBackend = api.APIBackend.SCRAPER,
+        reload_interval: float = 5.0,
+        scheduler: RefreshScheduler | None = None,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.backend = backend
+        self.reload_interval = reload_interval
+        self.scheduler = scheduler
+        self.lock = threading.RLock()
+        self.authors: dict[str, str] = {}
+        self.loaded: dict[str, Author] = {}
+        self.previous: dict[str, dict[str, int]] = {}
+        self.summaries: dict[str, summary.AuthorSummary] = {}
+        self.new_publications: dict[str, Publication] = {}
+        self.filled: dict[str, Publication] = {}
+        self._mtimes: dict[str, float] = {}
+        self._last_reload = 0.0
+        # Only one refresh runs at a time
+        self._refresh_lock = threading.Lock()
+        self.refresh_running = False
+        self.refresh_error: str | None = None
+        self.refresh_finished: datetime.datetime | None = None
+        self.department = Department(authors=[])
+        self.reload(force=True)
+
+    def _mtime(self, path: Path | None) -> float:
+        if path is None or not path.is_file():
+            return 0.0
+        return path.stat().st_mtime
+
+    def reload(self, force: bool = False) -> None:
+        """Reload the authors whose files have changed since the last reload"""
+        now = time.monotonic()
+        if not force and now - self._last_reload < self.reload_interval:
+            return
+        with self.lock:
+            self._last_reload = now
+            authors = cache.load_authors(self.cache_dir)
+            changed = force or authors != self.authors
+            for scholar_id in authors.values():
+                mtime = self._mtime(cache.find_author_file(scholar_id, self.cache_dir))
+                if self._mtimes.get(scholar_id) == mtime and scholar_id in self.loaded:
+                    continue
+                author = cache.load_author(scholar_id, cache_dir=self.cache_dir)
+                if author is None:
+                    continue
+                logger.debug(f"Loaded author {author.name}")
+                self._mtimes[scholar_id] = mtime
+                self.loaded[scholar_id] = author
+                snapshot = history.previous(scholar_id, cache_dir=self.cache_dir)
+                self.previous[scholar_id] = snapshot.citations if snapshot else {}
+                changed = True
+
+            if changed:
+                self.authors = authors
+                self.summaries = summary.load_summaries(self.cache_dir)
+                self.department = Department.model_construct(
+                    authors=[
+                        self.loaded[scholar_id]
+                        for scholar_id in authors.values()
+                        if scholar_id in self.loaded
+                    ]
+                )
+
+    def refresh(self) -> bool:
+        """Refresh in the calling thread. Returns False without refreshing if
+        another refresh is already running."""
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        self.refresh_running = True
+        self._run_refresh()
+        return True
+
+    def refresh_in_background(self) -> bool:
+        """Start a refresh in a background thread. Returns False if another
+        refresh is already running."""
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        self.refresh_running = True
+        threading.Thread(target=self._run_refresh, daemon=True).start()
+        return True
+
+    def refresh_status(self) -> dict[str, Any]:
+        return {
+            "running": self.refresh_running,
+            "error": self.refresh_error,
+            "finished": self.refresh_finished.isoformat() if self.refresh_finished else None,
+        }
+
+    def _run_refresh(self) -> None:
+        """Refresh while holding the refresh lock, and record the outcome"""
+        try:
+            self._refresh()
+            self.refresh_error = None
+        except Exception as e:
+            logger.error(f"Refresh failed: {e}")
+            self.refresh_error = f"{type(e).__name__}: {e}"
+        finally:
+            self.refresh_finished = datetime.datetime.now()
+            self.refresh_running = False
+            self._refresh_lock.release()
+
+    def _refresh(self) -> None:
+        """Fetch the authors and store the new publications. If a scheduler
+        is given only the authors planned by the scheduler are fetched,
+        otherwise all authors are fetched."""
+        with self.lock:
+            authors = dict(self.authors)
+            old_department = self.department
+        new_authors = []
+        if self.scheduler is not None:
+            new_authors = self.scheduler.run()
+        else:
+            try:
+                for name, scholar_id in authors.items():
+                    author = api.search_author_with_publications(
+                        name=name, scholar_id=scholar_id, full=False, backend=self.backend
+                    )
+                    cache.save_author(author=author, cache_dir=self.cache_dir, derived=False)
+                    new_authors.append(author)
+            finally:
+                cache.update_derived(new_authors, cache_dir=self.cache_dir)
+
+        new_publications = department_diff(Department(authors=new_authors), old_department)
+        with self.lock:
+            self.new_publications = new_publications
+        self.reload(force=True)
+
+    def fill(self, publication: Publication) -> Publication:
+        if publication.authors != "":
+            return publication
+        if publication.title not in self.filled:
+            self.filled[publication.title] = publication.fill(cache_dir=self.cache_dir)
+        return self.filled[publication.title]
+
+    def get_author(self, name: str) -> Author:
+        with self.lock:
+            if name not in self.authors:
+                message = f"Could not find author with name '{name}'"
+                try:
+                    closest_name = api.get_closest_name(name, self.authors.keys())
+                    message += f". Did you mean '{closest_name}'?"
+                except ValueError:
+                    pass
+                raise UnknownAuthorError(message)
+            scholar_id = self.authors[name]
+            if scholar_id not in self.loaded:
+                raise KeyError(f"Author '{name}' is not in the cache")
+            return self.loaded[scholar_id]
+
+    def publications(
+        self,
+        name: str | None = None,
+        n: int = 5,
+        sort_by: SortBy = SortBy.CITATIONS,
+        max_age: int | None = None,
+        add_authors: bool = False,
+    ) -> list[dict[str, Any]]:
+        self.reload()
+        obj: Author | Department
+        previous: dict[str, int] = {}
+        if name is None:
+            obj = self.department
+            for author in self.department.authors:
+                previous.update(self.previous.get(author.scholar_id, {}))
+        else:
+            obj = self.get_author(name)
+            previous = self.previous.get(obj.scholar_id, {})
+
+        publications = api.extract_correct_publications(
+            obj, max_age=max_age, n=n, sort_by=sort_by, previous=previous
+        )
+        if add_authors:
+            publications = [self.fill(pub) for pub in publications]
+        return [pub.model_dump() for pub in publications]
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    server: "Server"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(format % args)
+
+    def _send(self, data: Any, status: int = 200) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _publication_kwargs(self, query: dict[str, list[str]]) -> dict[str, Any]:
+        kwargs: dict[str, Any] = {}
+        if "n" in query:
+            kwargs["n"] = int(query["n"][0])
+        if "sort_by" in query:
+            kwargs["sort_by"] = SortBy(query["sort_by"][0])
+        if "max_age" in query:
+            kwargs["max_age"] = int(query["max_age"][0])
+        if "add_authors" in query:
+            kwargs["add_authors"] = query["add_authors"][0].lower() in ("1", "true", "yes")
+        return kwargs
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        parts = [unquote(p) for p in url.path.strip("/").split("/") if p]
+        query = parse_qs(url.query)
+        state = self.server.state
+        try:
+            if parts == ["authors"]:
+                state.reload()
+                data: Any = [
+                    {
+                        "name": name,
+                        "scholar_id": scholar_id,
+                        "summary": state.summaries[scholar_id].model_dump(mode="json")
+                        if scholar_id in state.summaries
+                        else None,
+                    }
+                    for name, scholar_id in state.authors.items()
+                ]
+            elif len(parts) == 3 and parts[0] == "authors" and parts[2] == "publications":
+                data = state.publications(name=parts[1], **self._publication_kwargs(query))
+            elif parts == ["department", "publications"]:
+                data = state.publications(**self._publication_kwargs(query))
+            elif parts == ["department", "new"]:
+                data = [pub.model_dump() for pub in state.new_publications.values()]
+            elif parts == ["refresh"]:
+                data = state.refresh_status()
+            else:
+                self._send({"error": f"Unknown endpoint {url.path}"}, status=404)
+                return
+        except UnknownAuthorError as e:
+            self._send({"error": str(e)}, status=404)
+            return
+        except (KeyError, ValueError) as e:
+            self._send({"error": str(e)}, status=400)
+            return
+        except Exception as e:
+            logger.error(f"Request {self.path} failed: {e}")
+            self._send({"error": f"{type(e).__name__}: {e}"}, status=500)
+            return
+        self._send(data)
+
+    def do_POST(self) -> None:
+        if urlparse(self.path).path.strip("/") != "refresh":
+            self._send({"error": f"Unknown endpoint {self.path}"}, status=404)
+            return
+        if self.server.state.refresh_in_background():
+            self._send({"status": "started"}, status=202)
+        else:
+            self._send({"error": "A refresh is already running"}, status=409)
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        state: DepartmentState,
+        refresh_interval: float = 0.0,
+    ) -> None:
+        super().__init__(address, RequestHandler)
+        self.state = state
+        self.refresh_interval = refresh_interval
+        self._stop = threading.Event()
+        self._refresher: threading.Thread | None = None
+        if refresh_interval > 0:
+            self._refresher = threading.Thread(target=self._refresh_loop, daemon=True)
+            self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            if not self.state.refresh():
+                logger.info("Skipping scheduled refresh, a refresh is already running")
+
+    def server_close(self) -> None:
+        self._stop.set()
+        super().server_close()
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    cache_dir: str = config.DEFAULT_CACHE_DIR,
+    backend: api.APIBackend = api.APIBackend.SCRAPER,
+    refresh_interval: float = 0.0,
+    budget: int | None = None,
+) -> None:
+    scheduler = None
+    if budget is not None:
+        # Spread the requests over the interval between refreshes
+        scheduler = RefreshScheduler(
+            cache_dir=cache_dir, budget=budget, window=refresh_interval, backend=backend
+        )
+    state = DepartmentState(cache_dir=cache_dir, backend=backend, scheduler=scheduler)
+    with Server((host, port), state, refresh_interval=refresh_interval) as server:
+        logger.info(f"Serving {cache_dir} on http://{host}:{server.server_port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,168 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+import datetime
+import json
+import threading
+
+from pydantic import BaseModel, Field, ValidationError
+from structlog import get_logger
+
+from . import config
+from .author import Author
+from .publication import (
+    TRUSTED_FINGERPRINTS,
+    Publication,
+    remove_duplicate_publications,
+    topk_age,
+    topk_cited,
+)
+from .ranking import h_index
+
+logger = get_logger()
+
+TOPK = 10
+
+# The summaries of all authors are stored in one file
+_lock = threading.Lock()
+
+
+class AuthorSummary(BaseModel):
+    name: str
+    scholar_id: str
+    num_publications: int = 0
+    num_citations: int = 0
+    h_index: int = 0
+    # Number of citations and publications grouped by publication year
+    citations_per_year: dict[int, int] = Field(default_factory=dict)
+    publications_per_year: dict[int, int] = Field(default_factory=dict)
+    # The top publications by citations and by year, without the abstracts
+    top_cited: list[Publication] = Field(default_factory=list)
+    most_recent: list[Publication] = Field(default_factory=list)
+    updated: datetime.datetime = Field(default_factory=datetime.datetime.now)
+
+    def _top(self, publications: list[Publication], k: int) -> Sequence[Publication]:
+        if k > len(publications) and self.num_publications > len(publications):
+            raise ValueError(f"Only the top {len(publications)} publications are summarized")
+        return tuple(publications[:k])
+
+    @property
+    def most_cited(self) -> Publication:
+        return self.top_cited[0]
+
+    def topk_cited(self, k: int) -> Sequence[Publication]:
+        return self._top(self.top_cited, k)
+
+    def topk_age(self, k: int) -> Sequence[Publication]:
+        return self._top(self.most_recent, k)
+
+
+class DepartmentSummary(BaseModel):
+    num_authors: int = 0
+    num_citations: int = 0
+    citations_per_year: dict[int, int] = Field(default_factory=dict)
+    top_cited: list[tuple[str, int]] = Field(default_factory=list)
+
+
+def summarize(author: Author, k: int = TOPK, abstracts: bool = False) -> AuthorSummary:
+    """Summarize the author, where the top ``k`` publications are stored
+    without the abstracts unless ``abstracts`` is true"""
+    publications = remove_duplicate_publications(author.publications)
+    citations_per_year: dict[int, int] = {}
+    publications_per_year: dict[int, int] = {}
+    for pub in publications:
+        citations_per_year[pub.year] = citations_per_year.get(pub.year, 0) + pub.num_citations
+        publications_per_year[pub.year] = publications_per_year.get(pub.year, 0) + 1
+
+    return AuthorSummary(
+        name=author.name,
+        scholar_id=author.scholar_id,
+        num_publications=len(publications),
+        num_citations=sum(pub.num_citations for pub in publications),
+        h_index=h_index(publications),
+        citations_per_year=citations_per_year,
+        publications_per_year=publications_per_year,
+        top_cited=[_strip(pub, abstracts) for pub in topk_cited(publications, k=k)],
+        most_recent=[_strip(pub, abstracts) for pub in topk_age(publications, k=k)],
+    )
+
+
+def _strip(publication: Publication, abstracts: bool) -> Publication:
+    if abstracts or publication.abstract == "":
+        return publication
+    return publication.model_copy(update={"abstract": ""})
+
+
+def summary_file(cache_dir: Path | str) -> Path:
+    return Path(cache_dir) / "summary.json"
+
+
+class _Summaries(BaseModel):
+    authors: dict[str, AuthorSummary] = Field(default_factory=dict)
+
+
+def load_summaries(cache_dir: Path | str = config.DEFAULT_CACHE_DIR) -> dict[str, AuthorSummary]:
+    path = summary_file(cache_dir)
+    if not path.is_file():
+        return {}
+    content = path.read_bytes()
+    try:
+        return _Summaries.model_validate_json(content, context=TRUSTED_FINGERPRINTS).authors
+    except ValidationError:
+        pass
+    # Skip the summaries written by older versions, the authors are then
+    # loaded from the cache until they are saved again
+    summaries: dict[str, AuthorSummary] = {}
+    raw: dict[str, Any] = json.loads(content).get("authors", {})
+    for scholar_id, data in raw.items():
+        try:
+            summaries[scholar_id] = AuthorSummary.model_validate(data, context=TRUSTED_FINGERPRINTS)
+        except ValidationError:
+            logger.info(f"Ignoring outdated summary of {scholar_id}")
+    return summaries
+
+
+def save_summaries(
+    summaries: Iterable[AuthorSummary], cache_dir: Path | str = config.DEFAULT_CACHE_DIR
+) -> None:
+    """Add or replace the summaries of several authors at once"""
+    with _lock:
+        authors = load_summaries(cache_dir)
+        authors.update({summary.scholar_id: summary for summary in summaries})
+        summary_file(cache_dir).write_text(_Summaries(authors=authors).model_dump_json())
+
+
+def save_summary(summary: AuthorSummary, cache_dir: Path | str = config.DEFAULT_CACHE_DIR) -> None:
+    save_summaries([summary], cache_dir=cache_dir)
+
+
+def update_summary(
+    author: Author, cache_dir: Path | str = config.DEFAULT_CACHE_DIR
+) -> AuthorSummary:
+    summary = summarize(author)
+    save_summary(summary, cache_dir=cache_dir)
+    return summary
+
+
+def remove_summary(scholar_id: str, cache_dir: Path | str = config.DEFAULT_CACHE_DIR) -> None:
+    with _lock:
+        authors = load_summaries(cache_dir)
+        if authors.pop(scholar_id, None) is not None:
+            summary_file(cache_dir).write_text(_Summaries(authors=authors).model_dump_json())
+
+
+def department_summary(summaries: Iterable[AuthorSummary], k: int = TOPK) -> DepartmentSummary:
+    """Roll up the summaries of several authors. Note that citations of
+    publications shared between authors are counted once for each author,
+    while the top cited publications are deduplicated by title."""
+    dep = DepartmentSummary()
+    top_cited: dict[str, int] = {}
+    for summary in summaries:
+        dep.num_authors += 1
+        dep.num_citations += summary.num_citations
+        for year, citations in summary.citations_per_year.items():
+            dep.citations_per_year[year] = dep.citations_per_year.get(year, 0) + citations
+        for pub in summary.top_cited:
+            top_cited[pub.title] = max(top_cited.get(pub.title, 0), pub.num_citations)
+    dep.top_cited = sorted(top_cited.items(), key=lambda x: x[1], reverse=True)[:k]
+    return dep
@@ -0,0 +1,300 @@
+"""
+Synthetic departments for scale testing.
+
+The generated departments have a realistic structure: the number of
+publications per author, the citations and the ages of the publications
+follow power laws, and a fraction of the publications are shared between
+members of the department, where prolific authors are more likely to be
+co-authors. The departments can be written to the cache with
+:func:`write_cache` and to a replay store with
+:func:`pygscholar.mock_server.write_store`, so that the queries, the cache
+and the scraper can be benchmarked at any size.
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple
+from urllib.parse import urlencode
+import datetime
+import random
+import string
+
+from . import cache
+from . import config
+from . import graph
+from . import history
+from . import search
+from . import summary
+from .author import Author, AuthorInfo
+from .publication import Publication
+
+WORDS = (
+    "cardiac mechanics model simulation heart finite element method analysis "
+    "patient specific cell electrophysiology tissue flow numerical scheme "
+    "learning data uncertainty quantification inverse problem optimization "
+    "brain fluid transport parallel solver preconditioner mesh adaptive "
+    "stochastic multiscale framework estimation efficient robust nonlinear "
+    "coupled deep neural network imaging segmentation calcium ventricle"
+).split()
+FIRST_NAMES = (
+    "Ada Alan Anna Bjørn Clara David Emma Erik Grace Hanna Henrik Ingrid Jonas "
+    "Karin Lars Maria Nils Olav Per Rita Sara Sigrid Tor Ulla Vera"
+).split()
+LAST_NAMES = (
+    "Andersen Berg Dahl Eriksen Fossum Hansen Holm Johansen Karlsen Larsen "
+    "Lie Moen Nilsen Olsen Pedersen Solberg Strand Tveit Vik Wold"
+).split()
+
+
+PDF_URL = "https://example.org/paper.pdf"
+
+
+class SyntheticArticle(NamedTuple):
+    title: str
+    authors: str
+    journal: str
+    year: int
+    citations: int
+    abstract: str
+
+
+class SyntheticProfile(NamedTuple):
+    scholar_id: str
+    name: str
+    affiliation: str
+    articles: list[SyntheticArticle]
+    # Scholar id and name of the co-authors listed on the profile
+    coauthors: list[tuple[str, str]]
+
+
+def citation_link(scholar_id: str, index: int) -> str:
+    """Link to the article page of the article with the given index"""
+    query = urlencode(
+        {
+            "view_op": "view_citation",
+            "hl": "en",
+            "user": scholar_id,
+            "citation_for_view": f"{scholar_id}:{index}",
+        }
+    )
+    return f"/citations?{query}"
+
+
+def _h_index(citations: list[int]) -> int:
+    ranked = sorted(citations, reverse=True)
+    return sum(1 for i, c in enumerate(ranked) if c > i)
+
+
+def profile_metrics(profile: SyntheticProfile) -> dict[str, dict[str, int]]:
+    """Citation metrics as shown on the profile page"""
+    citations = [a.citations for a in profile.articles]
+    recent_year = datetime.date.today().year - 5
+    recent = [a.citations for a in profile.articles if a.year >= recent_year]
+    return {
+        "citations": {"all": sum(citations), "last_5_years": sum(recent)},
+        "h_index": {"all": _h_index(citations), "last_5_years": _h_index(recent)},
+        "i10_index": {
+            "all": sum(c >= 10 for c in citations),
+            "last_5_years": sum(c >= 10 for c in recent),
+        },
+    }
+
+
+def _title(rng: random.Random, titles: set[str]) -> str:
+    while True:
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 12))).capitalize()
+        if title.lower() not in titles:
+            titles.add(title.lower())
+            return title
+
+
+def _article(
+    rng: random.Random,
+    titles: set[str],
+    authors: list[str],
+    citation_exponent: float,
+    year_exponent: float,
+    max_age: int,
+) -> dict[str, Any]:
+    # Most publications are recent, and the citations grow with the age
+    age = int(max_age * rng.random() ** year_exponent)
+    return {
+        "title": _title(rng, titles),
+        "authors": authors + [f"{rng.choice(string.ascii_uppercase)} {rng.choice(LAST_NAMES)}"],
+        "journal": f"Journal of {rng.choice(WORDS).title()}",
+        "year": datetime.date.today().year - age,
+        "citations": int((rng.paretovariate(citation_exponent) - 1) * (age + 1)),
+        "abstract": " ".join(rng.choice(WORDS) for _ in range(rng.randint(30, 150))),
+    }
+
+
+def _to_article(article: dict[str, Any]) -> SyntheticArticle:
+    return SyntheticArticle(**{**article, "authors": ", ".join(article["authors"])})
+
+
+def generate_profile(
+    scholar_id: str,
+    name: str,
+    num_articles: int,
+    seed: int | str = 0,
+    citation_exponent: float = 1.5,
+    year_exponent: float = 2.0,
+    max_age: int = 30,
+) -> SyntheticProfile:
+    """Profile of a single author without co-authors in the department"""
+    rng = random.Random(f"{seed}:{scholar_id}")
+    titles: set[str] = set()
+    articles = [
+        _to_article(_article(rng, titles, [name], citation_exponent, year_exponent, max_age))
+        for _ in range(num_articles)
+    ]
+    articles.sort(key=lambda a: a.citations, reverse=True)
+    return SyntheticProfile(scholar_id, name, "University of Examples", articles, [])
+
+
+def generate_department(
+    num_authors: int = 20,
+    publications_per_author: float = 50,
+    overlap: float = 0.2,
+    publications_exponent: float = 2.0,
+    citation_exponent: float = 1.5,
+    year_exponent: float = 2.0,
+    max_age: int = 30,
+    seed: int = 0,
+) -> list[SyntheticProfile]:
+    """Generate the profiles of the authors in a department
+
+    Args:
+        num_authors: Number of authors
+        publications_per_author: Mean number of publications per author.
+            The number of publications is Pareto distributed with shape
+            ``publications_exponent``, capped at 20 times the mean.
+        overlap: Fraction of the publications of an author that are shared
+            with other authors in the department
+        citation_exponent: Shape of the Pareto distribution of the citations
+            per year since the publication
+        year_exponent: The age of a publication is ``max_age * u ** year_exponent``
+            where ``u`` is uniform, i.e most publications are recent
+        seed: Seed of the random number generator
+    """
+    rng = random.Random(seed)
+    names: set[str] = set()
+    authors: list[tuple[str, str]] = []
+    while len(authors) < num_authors:
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if name in names:
+            name = f"{name} {len(authors)}"
+        names.add(name)
+        scholar_id = "".join(rng.choices(string.ascii_letters + string.digits, k=12))
+        authors.append((scholar_id, name))
+
+    shape = publications_exponent
+    scale = publications_per_author * (shape - 1) / shape
+    counts = [
+        max(1, min(round(scale * rng.paretovariate(shape)), int(20 * publications_per_author)))
+        for _ in authors
+    ]
+
+    titles: set[str] = set()
+    # Every publication appears once per author, so picking a random entry
+    # favours prolific authors as co-authors
+    pool: list[dict[str, Any]] = []
+    owned: list[list[dict[str, Any]]] = [[] for _ in authors]
+    coauthors: list[dict[int, int]] = [{} for _ in authors]
+    for i, ((_, name), count) in enumerate(zip(authors, counts)):
+        for _ in range(count):
+            article = None
+            if pool and rng.random() < overlap:
+                candidate = rng.choice(pool)
+                if name not in candidate["authors"]:
+                    article = candidate
+                    for j in article["owners"]:
+                        coauthors[i][j] = coauthors[i].get(j, 0) + 1
+                        coauthors[j][i] = coauthors[j].get(i, 0) + 1
+                    article["authors"].insert(-1, name)
+            if article is None:
+                article = _article(rng, titles, [name], citation_exponent, year_exponent, max_age)
+                article["owners"] = []
+            article["owners"].append(i)
+            owned[i].append(article)
+            pool.append(article)
+
+    profiles = []
+    for i, (scholar_id, name) in enumerate(authors):
+        articles = [_to_article({k: v for k, v in a.items() if k != "owners"}) for a in owned[i]]
+        articles.sort(key=lambda a: a.citations, reverse=True)
+        # Google Scholar lists at most 20 co-authors on the profile
+        top = sorted(coauthors[i], key=lambda j: coauthors[i][j], reverse=True)[:20]
+        profiles.append(
+            SyntheticProfile(
+                scholar_id, name, "University of Examples", articles, [authors[j] for j in top]
+            )
+        )
+    return profiles
+
+
+def to_author(profile: SyntheticProfile) -> Author:
+    """The author as it is stored in the cache by the scraper backend"""
+    scholar_id = profile.scholar_id
+    publications = [
+        Publication(
+            title=article.title,
+            year=article.year,
+            num_citations=article.citations,
+            abstract=article.abstract,
+            authors=article.authors,
+            journal=article.journal,
+            pdf_url=PDF_URL,
+            scholar_url=f"{config.SCHOLAR_URL}{citation_link(scholar_id, i)}",
+            date=str(article.year),
+        )
+        for i, article in enumerate(profile.articles)
+    ]
+    metrics = profile_metrics(profile)
+    data = {
+        "info": {
+            "name": profile.name,
+            "affiliations": profile.affiliation,
+            "email": "Verified email at example.org",
+            "interests": ["Scientific computing"],
+            **metrics,
+        },
+        "co-authors": [
+            {
+                "name": name,
+                "profile_link": f"{config.SCHOLAR_URL}/citations?user={coauthor_id}&hl=en",
+                "affiliation": profile.affiliation,
+            }
+            for coauthor_id, name in profile.coauthors
+        ],
+    }
+    info = AuthorInfo(
+        name=profile.name,
+        scholar_id=scholar_id,
+        link=f"/citations?user={scholar_id}&hl=en",
+        affiliation=profile.affiliation,
+        cited_by=metrics["citations"]["all"],
+        data=data,
+    )
+    return Author(info=info, publications=publications)
+
+
+def write_cache(
+    profiles: Iterable[SyntheticProfile], cache_dir: Path | str = config.DEFAULT_CACHE_DIR
+) -> None:
+    """Save the authors to the cache and add them to the list of authors.
+    The summaries, co-authorship graph and search index are updated once
+    for all authors, so that large departments can be written quickly."""
+    cache_dir = str(cache_dir)
+    authors = cache.load_authors(cache_dir)
+    summaries = []
+    for profile in profiles:
+        author = to_author(profile)
+        cache.save_author(author, cache_dir=cache_dir, derived=False)
+        history.record_snapshot(author, cache_dir)
+        summaries.append(summary.summarize(author))
+        authors[profile.name] = profile.scholar_id
+    cache.save_authors(authors, cache_dir)
+    summary.save_summaries(summaries, cache_dir)
+    graph.rebuild_graph(cache_dir)
+    search.rebuild_index(cache_dir)
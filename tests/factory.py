@@ -4,6 +4,9 @@ from polyfactory.factories.pydantic_factory import ModelFactory
 
 class PublicationFactory(ModelFactory):
     __model__ = pygscholar.Publication
+    __set_as_default_factory_for_type__ = True
+    # Computed from the title when the publication is created
+    fingerprint = 0
 
 
 class AuthorFactory(ModelFactory):
@@ -1,5 +1,155 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import factory
+import pytest
 from pygscholar import api
+from scholarly._proxy_generator import MaxTriesExceededException
 
 
 def test_search_author():
     api.search_author("Henrik Nicolay Finsberg")
+
+
+def test_session_pool_rotates_and_retries():
+    created = []
+
+    def factory(proxy):
+        created.append(proxy)
+        return proxy
+
+    pool = api.scholarly.SessionPool(
+        proxies=["proxy1", "proxy2"], max_workers=2, retries=2, navigator_factory=factory
+    )
+    used = []
+
+    def fill(nav, item):
+        used.append(nav)
+        if nav == "proxy1" and len(used) == 1:
+            raise MaxTriesExceededException("Blocked")
+        return {**item, "filled": True}
+
+    assert pool.run(fill, {"title": "A"}) == {"title": "A", "filled": True}
+    assert used == ["proxy1", "proxy2"]
+    # Working sessions are reused while the failed session is replaced
+    pool.run(fill, {"title": "B"})
+    pool.run(fill, {"title": "C"})
+    assert created == ["proxy1", "proxy2", "proxy1"]
+
+
+def test_session_pool_raises_when_all_retries_fail():
+    pool = api.scholarly.SessionPool(
+        proxies=["proxy"], retries=1, navigator_factory=lambda proxy: object()
+    )
+    used = []
+
+    def fill(nav, item):
+        used.append(nav)
+        raise MaxTriesExceededException("Blocked")
+
+    with pytest.raises(MaxTriesExceededException, match="Blocked"):
+        pool.run(fill, {})
+    # The retry uses a new session
+    assert len(used) == 2
+    assert used[0] is not used[1]
+
+
+def test_session_pool_does_not_retry_other_errors():
+    pool = api.scholarly.SessionPool(proxies=["proxy"], retries=3, navigator_factory=str)
+    used = []
+
+    def fill(nav, item):
+        used.append(nav)
+        raise ValueError("Incorrect input")
+
+    with pytest.raises(ValueError):
+        pool.run(fill, {})
+    assert len(used) == 1
+
+
+def test_session_pool_bounds_concurrent_requests():
+    pool = api.scholarly.SessionPool(max_workers=2, navigator_factory=str)
+    lock = threading.Lock()
+    in_flight = [0, 0]
+
+    def fill(nav, item):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+        time.sleep(0.005)
+        with lock:
+            in_flight[0] -= 1
+        return item
+
+    # Each caller runs its own pool of threads, as the scholarly backend does
+    # when several authors are fetched at once
+    def fill_author(i):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            return list(executor.map(lambda j: pool.run(fill, {"id": j}), range(4)))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(fill_author, range(4)))
+    assert in_flight[1] == 2
+
+
+def test_batch_search_dedupes_and_caches_not_found(tmp_path):
+    author = factory.AuthorInfoFactory.build()
+    profile = factory.AuthorInfoFactory.build()
+
+    def search_mock(name):
+        return [author] if name == author.name else []
+
+    with (
+        mock.patch("pygscholar.api.scraper.search_author") as m1,
+        mock.patch("pygscholar.api.scraper.get_author_by_id") as m2,
+    ):
+        m1.side_effect = search_mock
+        m2.return_value = profile
+        results = api.search_authors(
+            [author.name, author.name, "Unknown", "Someone"],
+            scholar_ids=["", "", "", profile.scholar_id],
+            cache_dir=tmp_path,
+        )
+        assert results == [[author], [author], [], [profile]]
+        assert sorted(c.args[0] for c in m1.call_args_list) == sorted([author.name, "Unknown"])
+        m2.assert_called_once_with(profile.scholar_id)
+
+        # Names that were not found are not searched again
+        m1.reset_mock()
+        assert api.search_authors(["Unknown"], cache_dir=tmp_path) == [[]]
+        m1.assert_not_called()
+
+
+class ProfileNavigator:
+    """Serves a profile with one page of articles"""
+
+    def __init__(self):
+        self.requests = []
+
+    def _get_page(self, link):
+        self.requests.append(link)
+        return (
+            '<div id="gsc_prf_in">Jane Doe</div><div class="gsc_prf_ila">University</div>'
+            '<div id="gsc_prf_ivh">Verified email</div>'
+            + "<table><tr>"
+            + "".join(f'<td class="gsc_rsb_std">{i}</td>' for i in (10, 5, 2, 1, 1, 0))
+            + "</tr></table>"
+            + '<table><tr class="gsc_a_tr"><td><a class="gsc_a_at" href="/citations?x">Paper</a>'
+            '<div class="gs_gray">J Doe</div><div class="gs_gray">Journal</div></td>'
+            '<td><a class="gsc_a_ac">3</a></td><td><span class="gsc_a_hc">2020</span></td></tr>'
+            '<tr><td class="gsc_a_e"></td></tr></table>'
+        )
+
+
+def test_fetch_by_id_fetches_profile_once():
+    driver = ProfileNavigator()
+    author = api.scraper.search_author_with_publications(
+        "Jane Doe", scholar_id="abc", full=False, driver=driver
+    )
+    assert len(driver.requests) == 1
+    assert author.name == "Jane Doe"
+    assert author.scholar_id == "abc"
+    assert author.info.data["info"]["citations"]["all"] == 10
+    assert [p.title for p in author.publications] == ["Paper"]
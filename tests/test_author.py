@@ -1,3 +1,5 @@
+import datetime
+
 import factory
 import pygscholar
 
@@ -29,3 +31,37 @@ def test_author_diff_with_one_new_and_one_new_old():
     new_pubs = pygscholar.author.author_pub_diff(author_new, author_old)
     assert len(new_pubs) == 1
     assert new_pubs[0] == new_pub
+
+
+def test_author_diff_uses_normalized_titles():
+    info = factory.AuthorInfoFactory.build()
+    author_old = pygscholar.Author(
+        info=info, publications=[pygscholar.Publication(title="A title")]
+    )
+    new_pub = factory.PublicationFactory.build()
+    author_new = pygscholar.Author(
+        info=info, publications=[pygscholar.Publication(title=" A TITLE "), new_pub]
+    )
+    assert pygscholar.author.author_pub_diff(author_new, author_old) == [new_pub]
+
+
+def test_author_diff_only_new():
+    info = factory.AuthorInfoFactory.build()
+    year = datetime.date.today().year
+    author_old = pygscholar.Author(info=info, publications=[])
+    new_pub = pygscholar.Publication(title="New", year=year)
+    author_new = pygscholar.Author(
+        info=info,
+        publications=[new_pub, pygscholar.Publication(title="Old", year=year - 1), new_pub],
+    )
+    assert pygscholar.author.author_pub_diff(author_new, author_old, only_new=True) == [new_pub]
+    assert len(pygscholar.author.author_pub_diff(author_new, author_old)) == 3
+
+
+def test_summary_does_not_change_equality():
+    author = factory.AuthorFactory.build()
+    copy = author.model_copy(deep=True)
+    assert author.num_citations == sum(p.num_citations for p in author.publications)
+    assert author.summary is author.summary
+    assert author == copy
+    assert "_summaries" not in author.model_dump()
@@ -0,0 +1,113 @@
+import json
+
+import factory
+import pytest
+import pygscholar
+from pygscholar import cache
+
+
+def test_save_and_load_author(tmpdir):
+    author = factory.AuthorFactory.build()
+    cache.save_author(author, cache_dir=tmpdir)
+
+    loaded = cache.load_author(author.scholar_id, cache_dir=tmpdir)
+    assert loaded is not None
+    assert loaded.model_dump() == pygscholar.Author.model_validate(author).model_dump()
+
+
+def test_author_file_has_schema_version_and_checksum(tmpdir):
+    author = factory.AuthorFactory.build()
+    cache.save_author(author, cache_dir=tmpdir)
+
+    head, payload = cache.author_file(author.scholar_id, tmpdir).read_bytes().split(b"\n", 1)
+    header = json.loads(head)
+    assert header["schema_version"] == cache.SCHEMA_VERSION
+    assert header["checksum"] == cache.checksum(payload)
+
+
+def test_load_legacy_author_file_is_migrated(tmpdir):
+    author = factory.AuthorFactory.build()
+    path = cache.author_file(author.scholar_id, tmpdir)
+    path.write_text(author.model_dump_json())
+
+    loaded = cache.load_author(author.scholar_id, cache_dir=tmpdir)
+    assert loaded is not None
+    assert loaded.name == author.name
+    # Loading does not write to the cache
+    assert path.read_text() == author.model_dump_json()
+
+
+def test_load_author_with_wrong_checksum_is_validated(tmpdir):
+    author = factory.AuthorFactory.build()
+    path = cache.author_file(author.scholar_id, tmpdir)
+    header = json.dumps({"schema_version": cache.SCHEMA_VERSION, "checksum": "wrong"})
+    path.write_text(header + "\n" + author.model_dump_json())
+
+    loaded = cache.load_author(author.scholar_id, cache_dir=tmpdir, verify=True)
+    assert loaded is not None
+    assert loaded.scholar_id == author.scholar_id
+
+
+def test_load_invalid_author_file_returns_none(tmpdir):
+    path = cache.author_file("invalid", tmpdir)
+    header = json.dumps({"schema_version": cache.SCHEMA_VERSION, "checksum": "wrong"})
+    path.write_text(header + "\n" + json.dumps({"info": {"name": "No scholar id"}}))
+
+    assert cache.load_author("invalid", cache_dir=tmpdir) is None
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip", "lzma"])
+@pytest.mark.parametrize("fmt", ["json", "msgpack", "cbor"])
+def test_save_and_load_author_with_format(tmpdir, fmt, compression):
+    if fmt == "msgpack":
+        pytest.importorskip("msgpack")
+    if fmt == "cbor":
+        pytest.importorskip("cbor2")
+
+    author = factory.AuthorFactory.build()
+    cache.save_author(author, cache_dir=tmpdir, fmt=fmt, compression=compression)
+    path = cache.author_file(author.scholar_id, tmpdir, fmt=fmt, compression=compression)
+    assert path.is_file()
+
+    loaded = cache.load_author(author.scholar_id, cache_dir=tmpdir)
+    assert loaded is not None
+    assert loaded.model_dump() == pygscholar.Author.model_validate(author).model_dump()
+
+
+def test_save_author_in_new_format_removes_legacy_json(tmpdir):
+    pytest.importorskip("msgpack")
+    author = factory.AuthorFactory.build()
+    legacy = cache.author_file(author.scholar_id, tmpdir, fmt="json")
+    legacy.write_text(author.model_dump_json())
+
+    cache.save_author(author, cache_dir=tmpdir, fmt="msgpack", compression="gzip")
+
+    assert not legacy.is_file()
+    assert cache.find_author_file(author.scholar_id, tmpdir) == cache.author_file(
+        author.scholar_id, tmpdir, fmt="msgpack", compression="gzip"
+    )
+
+
+def test_load_version_1_author_file_adds_fingerprints(tmpdir):
+    author = factory.AuthorFactory.build()
+    data = author.model_dump()
+    for pub in data["publications"]:
+        pub.pop("fingerprint")
+    payload = json.dumps(data).encode()
+    header = json.dumps(
+        {"schema_version": 1, "format": "json", "checksum": cache.checksum(payload)}
+    )
+    path = cache.author_file(author.scholar_id, tmpdir)
+    path.write_bytes(header.encode() + b"\n" + payload)
+
+    loaded = cache.load_author(author.scholar_id, cache_dir=tmpdir)
+    assert loaded is not None
+    assert [p.fingerprint for p in loaded.publications] == [
+        pygscholar.publication.title_fingerprint(p.title) for p in author.publications
+    ]
+
+    cache.save_author(loaded, cache_dir=tmpdir)
+    header, payload = path.read_bytes().split(b"\n", 1)
+    assert json.loads(header)["schema_version"] == cache.SCHEMA_VERSION
+    stored = json.loads(payload)
+    assert stored["publications"][0]["fingerprint"] == loaded.publications[0].fingerprint
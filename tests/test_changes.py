@@ -0,0 +1,101 @@
+import datetime
+
+import factory
+import pygscholar
+import pytest
+from pygscholar import changes, history
+
+
+def with_citations(author, citations, metrics=None):
+    publications = [
+        pub.model_copy(update={"num_citations": n})
+        for pub, n in zip(author.publications, citations)
+    ]
+    info = author.info
+    if metrics is not None:
+        info = info.model_copy(update={"data": {"citedby": metrics}})
+    return pygscholar.Author(info=info, publications=publications)
+
+
+@pytest.fixture
+def author():
+    return factory.AuthorFactory.build(publications=factory.PublicationFactory.batch(3))
+
+
+def test_snapshots_append_events(tmpdir, author):
+    first = pygscholar.Author(info=author.info, publications=author.publications[:2])
+    history.record_snapshot(with_citations(first, (0, 1)), tmpdir)
+    history.record_snapshot(with_citations(author, (0, 4, 2), metrics=10), tmpdir)
+    history.record_snapshot(with_citations(author, (0, 4, 2), metrics=10), tmpdir)
+
+    events = list(changes.read_events(tmpdir))
+    assert [e["type"] for e in events] == [
+        "author_added",
+        "new_publication",
+        "citations",
+        "metrics",
+    ]
+    assert all(e["scholar_id"] == author.scholar_id for e in events)
+    assert events[0]["publications"] == 2
+    assert events[1]["title"] == author.publications[2].title
+    assert events[1]["fingerprint"] == author.publications[2].fingerprint
+    assert (events[2]["old"], events[2]["new"]) == (1, 4)
+    assert events[3]["changes"] == {"citations": [None, 10]}
+
+    # Reading from the id of an event starts at that event
+    assert list(changes.read_events(tmpdir, since=events[2]["id"])) == events[2:]
+    assert list(changes.read_events(tmpdir, types=["citations"])) == [events[2]]
+
+
+def test_removed_publication(tmpdir, author):
+    history.record_snapshot(author, tmpdir)
+    fewer = pygscholar.Author(info=author.info, publications=author.publications[1:])
+    history.record_snapshot(fewer, tmpdir)
+    (event,) = changes.read_events(tmpdir, types=["removed_publication"])
+    assert event["title"] == pygscholar.publication.title_key(author.publications[0].title)
+
+
+def test_consumers_have_independent_cursors(tmpdir, author):
+    day = datetime.datetime(2024, 1, 1)
+    for i in range(4):
+        history.record_snapshot(
+            with_citations(author, (i, 0, 0)), tmpdir, date=day + datetime.timedelta(days=i)
+        )
+
+    events = list(changes.read_events(tmpdir))
+    assert len(events) == 4
+
+    assert changes.consume("slack", tmpdir, limit=3) == events[:3]
+    assert changes.consume("email", tmpdir, commit=False) == events
+    assert changes.consume("email", tmpdir) == events
+    assert changes.consume("slack", tmpdir) == events[3:]
+    assert changes.consume("slack", tmpdir) == []
+
+    assert changes.load_cursors(tmpdir)["email"] == (tmpdir / "changes.jsonl").size()
+
+    history.record_snapshot(with_citations(author, (9, 0, 0)), tmpdir)
+    assert [e["new"] for e in changes.consume("slack", tmpdir)] == [9]
+
+
+def test_read_events_resyncs_and_skips_torn_lines(tmpdir, author):
+    for i in range(3):
+        history.record_snapshot(with_citations(author, (i, 0, 0)), tmpdir)
+    events = list(changes.read_events(tmpdir))
+
+    # An offset inside an event starts at the next event
+    assert list(changes.read_events(tmpdir, since=events[1]["id"] + 5)) == events[2:]
+    assert list(changes.read_events(tmpdir, since=events[1]["id"])) == events[1:]
+
+    # A torn last line is not returned, and the next append starts on a new line
+    path = changes.changes_file(tmpdir)
+    with open(path, "ab") as f:
+        f.write(b'{"id": 1, "type": "cit')
+    assert list(changes.read_events(tmpdir)) == events
+    history.record_snapshot(with_citations(author, (9, 0, 0)), tmpdir)
+    assert [e["new"] for e in changes.read_events(tmpdir, types=["citations"])][-1] == 9
+    last = list(changes.read_events(tmpdir))[-1]
+    assert list(changes.read_events(tmpdir, since=last["id"])) == [last]
+
+    changes.save_cursor("slack", events[1]["id"], tmpdir)
+    assert changes.load_cursors(tmpdir) == {"slack": events[1]["id"]}
+    assert not (tmpdir / "changes_cursors.json.tmp").exists()
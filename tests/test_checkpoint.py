@@ -0,0 +1,77 @@
+import factory
+import pygscholar
+import pytest
+from pygscholar.api import scraper
+from pygscholar.checkpoint import CrawlCheckpoint, DepartmentCheckpoint
+
+
+def article_row(title):
+    return (
+        '<tr class="gsc_a_tr"><td>'
+        f'<a class="gsc_a_at" href="/citations?view_op=view_citation&citation_for_view={title}">'
+        f'{title}</a><div class="gs_gray">A Author</div><div class="gs_gray">Journal</div>'
+        '</td><td><a class="gsc_a_ac">3</a></td><td><span class="gsc_a_hc">2020</span></td></tr>'
+    )
+
+
+class FlakyNavigator:
+    """Serves two pages of articles and fails the first time the
+    second page is requested"""
+
+    def __init__(self):
+        self.requests = []
+        self.failed = False
+
+    def _get_page(self, link):
+        self.requests.append(link)
+        if "cstart=0" in link:
+            return f"<table>{article_row('first')}</table>"
+        if not self.failed:
+            self.failed = True
+            raise RuntimeError("CAPTCHA")
+        return f'<table>{article_row("second")}<tr><td class="gsc_a_e"></td></tr></table>'
+
+
+def test_extract_all_articles_resumes_from_checkpoint(tmpdir):
+    driver = FlakyNavigator()
+    checkpoint = CrawlCheckpoint("abc", tmpdir)
+    with pytest.raises(RuntimeError):
+        scraper.extract_all_articles("abc", full=False, driver=driver, checkpoint=checkpoint)
+
+    cursor, articles = checkpoint.load()
+    assert cursor == 100
+    assert [a["title"] for a in articles] == ["first"]
+
+    driver.requests.clear()
+    articles = scraper.extract_all_articles("abc", full=False, driver=driver, checkpoint=checkpoint)
+    assert [a["title"] for a in articles] == ["first", "second"]
+    assert len(driver.requests) == 1
+    assert "cstart=100" in driver.requests[0]
+    assert not checkpoint.path.is_file()
+
+
+def test_department_checkpoint(tmpdir):
+    author = factory.AuthorFactory.build()
+    progress = DepartmentCheckpoint("command", tmpdir)
+    assert not progress.done(author.scholar_id)
+
+    progress.add(author)
+    assert progress.done(author.scholar_id)
+    assert DepartmentCheckpoint("command", tmpdir).done(author.scholar_id)
+    # Only the scholar id is recorded unless the author is kept
+    assert progress.get(author.scholar_id) is None
+
+    progress.add(author, keep=True)
+    assert progress.get(author.scholar_id) == pygscholar.Author.model_validate(author)
+
+    progress.clear()
+    assert not progress.done(author.scholar_id)
+    assert progress.get(author.scholar_id) is None
+
+
+def test_crawl_checkpoint_depends_on_full(tmpdir):
+    assert CrawlCheckpoint("abc", tmpdir).path != CrawlCheckpoint("abc", tmpdir, full=True).path
+    with pytest.raises(ValueError):
+        scraper.extract_all_articles(
+            "abc", full=True, driver=FlakyNavigator(), checkpoint=CrawlCheckpoint("abc", tmpdir)
+        )
@@ -1,9 +1,12 @@
 from unittest import mock
 import contextlib
+import json
+import os
 
 import factory
 import pygscholar
 import pytest
+from pygscholar import synthetic
 from pygscholar.cli import app
 from typer.testing import CliRunner
 
@@ -236,6 +239,31 @@ def test_list_department_publications(tmpdir, backend, add_authors):
             assert pub.authors[:10] not in result.stdout
 
 
+def test_list_department_publications_refetches_corrupt_author(tmpdir):
+    author1 = factory.AuthorFactory.build()
+    author2 = factory.AuthorFactory.build()
+    for author in (author1, author2):
+        args, backend = create_args(author.info, "scraper", tmpdir)
+        with mock_add_author(author, backend):
+            runner.invoke(app, args)
+    path = pygscholar.cache.find_author_file(author1.scholar_id, str(tmpdir))
+    path.write_bytes(b"corrupt")
+    # Without the summaries the authors have to be loaded to answer the query
+    pygscholar.summary.summary_file(str(tmpdir)).unlink()
+
+    with mock.patch("pygscholar.api.search_author_with_publications") as m:
+        m.return_value = author1
+        result = runner.invoke(
+            app, ["list-department-publications", "--cache-dir", str(tmpdir), "--n", "100"]
+        )
+
+    assert result.exit_code == 0, result.stdout
+    assert m.call_args.kwargs["scholar_id"] == author1.scholar_id
+    for pub in author1.publications + author2.publications:
+        assert pub.title[:10] in result.stdout
+    assert pygscholar.cache.load_author(author1.scholar_id, cache_dir=str(tmpdir)) is not None
+
+
 @pytest.mark.parametrize("backend", ["scholarly", "scraper"])
 def test_list_new_department_publications(tmpdir, backend):
     author1 = factory.AuthorFactory.build()
@@ -282,3 +310,333 @@ def test_list_new_department_publications(tmpdir, backend):
     assert author_dict1["publications"][0]["title"] not in result.stdout
     assert author_dict2["publications"][0]["title"] not in result.stdout
     assert new_pub.title in result.stdout
+
+
+def test_list_author_publications_sort_by_growth(tmpdir):
+    author = factory.AuthorFactory.build(publications=factory.PublicationFactory.batch(2))
+    old_pubs = [p.model_copy(update={"num_citations": 0}) for p in author.publications]
+    old_author = pygscholar.Author(info=author.info, publications=old_pubs)
+    args, backend = create_args(author.info, "scraper", tmpdir)
+
+    with mock_add_author(old_author, backend):
+        runner.invoke(app, args)
+    with mock_add_author(author, backend):
+        result = runner.invoke(
+            app,
+            [
+                "list-author-publications",
+                author.name,
+                "--cache-dir",
+                str(tmpdir),
+                "--update",
+                "--sort-by",
+                "growth",
+            ],
+        )
+
+    assert result.exit_code == 0, result.stdout
+    assert "gained since last refresh" in result.stdout
+    for pub in author.publications:
+        assert pub.title[:10] in result.stdout
+
+
+def test_list_new_department_publications_resume(tmpdir):
+    author1 = factory.AuthorFactory.build()
+    author2 = factory.AuthorFactory.build()
+    new_pub = factory.PublicationFactory.build()
+
+    new_author1 = pygscholar.Author(
+        info=author1.info, publications=tuple(author1.publications) + (new_pub,)
+    )
+    args1, backend = create_args(author1.info, "scraper", tmpdir)
+    args2, backend = create_args(author2.info, "scraper", tmpdir)
+    with mock_add_author(author1, backend):
+        runner.invoke(app, args1)
+    with mock_add_author(author2, backend):
+        runner.invoke(app, args2)
+
+    fetched = []
+
+    def search_mock(*args, **kwargs):
+        fetched.append(kwargs["name"])
+        if kwargs["name"] == author1.info.name:
+            return new_author1
+        raise RuntimeError("CAPTCHA")
+
+    args = ["list-new-department-publications", "--cache-dir", str(tmpdir), "--overwrite"]
+    with mock.patch("pygscholar.api.search_author_with_publications") as m:
+        m.side_effect = search_mock
+        result = runner.invoke(app, args)
+    assert result.exit_code == 1
+    # The cache is not overwritten by an interrupted run
+    cached = pygscholar.cache.load_author(author1.scholar_id, cache_dir=tmpdir)
+    assert len(cached.publications) == len(author1.publications)
+
+    fetched.clear()
+    with mock.patch("pygscholar.api.search_author_with_publications") as m:
+        m.side_effect = lambda *args, **kwargs: fetched.append(kwargs["name"]) or author2
+        result = runner.invoke(app, args + ["--resume"])
+
+    assert result.exit_code == 0
+    assert fetched == [author2.info.name]
+    assert new_pub.title[:10] in result.stdout
+
+
+def test_add_authors_from_roster(tmpdir):
+    author1 = factory.AuthorFactory.build()
+    author2 = factory.AuthorFactory.build()
+    ambiguous = factory.AuthorInfoFactory.batch(2)
+    roster = tmpdir / "roster.csv"
+    roster.write_text(
+        f"name,scholar_id\n{author1.name},{author1.scholar_id}\n{author2.name},\nAmbiguous name,\n",
+        encoding="utf-8",
+    )
+
+    def search_mock(name):
+        if name == "Ambiguous name":
+            return ambiguous
+        return [a.info for a in (author1, author2) if a.name == name]
+
+    def fetch_authors_mock(scholar_ids, **kwargs):
+        return [a for a in (author1, author2) if a.scholar_id in scholar_ids]
+
+    def get_author_by_id_mock(scholar_id):
+        return next(a.info for a in (author1, author2) if a.scholar_id == scholar_id)
+
+    with (
+        mock.patch("pygscholar.api.scraper.search_author") as m1,
+        mock.patch("pygscholar.api.scraper.get_author_by_id") as m2,
+        mock.patch("pygscholar.api.scraper.fetch_authors_by_id") as m3,
+    ):
+        m1.side_effect = search_mock
+        m2.side_effect = get_author_by_id_mock
+        m3.side_effect = fetch_authors_mock
+        result = runner.invoke(
+            app, ["add-authors", "--from", str(roster), "--cache-dir", str(tmpdir)]
+        )
+
+    assert result.exit_code == 0, result.stdout
+    # The author with a known scholar id is fetched from the profile page
+    assert [c.args[0] for c in m1.call_args_list] == [author2.name, "Ambiguous name"]
+    assert "Successfully added 2 author(s)" in result.stdout
+    assert "Ambiguous" in result.stdout
+    assert pygscholar.cache.load_authors(str(tmpdir)) == {
+        author1.name: author1.scholar_id,
+        author2.name: author2.scholar_id,
+    }
+    for author in (author1, author2):
+        assert pygscholar.cache.load_author(author.scholar_id, cache_dir=tmpdir) is not None
+
+
+def test_add_authors_continues_after_failed_author(tmpdir):
+    author1 = factory.AuthorFactory.build()
+    author2 = factory.AuthorFactory.build()
+    roster = tmpdir / "roster.csv"
+    roster.write_text(
+        f"name,scholar_id\n{author1.name},{author1.scholar_id}\n"
+        f"{author2.name},{author2.scholar_id}\n",
+        encoding="utf-8",
+    )
+
+    def fetch_authors_mock(scholar_ids, errors, **kwargs):
+        errors[author1.scholar_id] = RuntimeError("CAPTCHA")
+        return [author2]
+
+    def get_author_by_id_mock(scholar_id):
+        return next(a.info for a in (author1, author2) if a.scholar_id == scholar_id)
+
+    with (
+        mock.patch("pygscholar.api.scraper.get_author_by_id") as m1,
+        mock.patch("pygscholar.api.scraper.fetch_authors_by_id") as m2,
+    ):
+        m1.side_effect = get_author_by_id_mock
+        m2.side_effect = fetch_authors_mock
+        result = runner.invoke(
+            app, ["add-authors", "--from", str(roster), "--cache-dir", str(tmpdir)]
+        )
+
+    assert result.exit_code == 106
+    assert "CAPTCHA" in result.stdout
+    assert "Failed to fetch the publications of 1 author(s)" in result.stderr
+    assert pygscholar.cache.find_author_file(author1.scholar_id, str(tmpdir)) is None
+    assert pygscholar.cache.find_author_file(author2.scholar_id, str(tmpdir)) is not None
+
+
+def test_add_authors_reports_failed_lookups(tmpdir):
+    roster = tmpdir / "roster.csv"
+    roster.write_text("name\nBlocked name\n", encoding="utf-8")
+
+    with mock.patch("pygscholar.api.scraper.search_author") as m:
+        m.side_effect = RuntimeError("CAPTCHA")
+        result = runner.invoke(
+            app, ["add-authors", "--from", str(roster), "--cache-dir", str(tmpdir)]
+        )
+
+    assert result.exit_code == 0, result.stdout
+    assert "Lookup failed" in result.stdout
+    assert "Not found" not in result.stdout
+    assert not pygscholar.api.negative_cache_file(str(tmpdir)).is_file()
+
+
+def test_list_department_publications_for_group(tmpdir):
+    author1 = factory.AuthorFactory.build()
+    author2 = factory.AuthorFactory.build()
+    for author in (author1, author2):
+        pygscholar.cache.save_author(author, cache_dir=tmpdir)
+    pygscholar.cache.save_authors(
+        {author1.name: author1.scholar_id, author2.name: author2.scholar_id}, str(tmpdir)
+    )
+
+    result = runner.invoke(
+        app, ["group", "add", "my-group", author1.name, "--cache-dir", str(tmpdir)]
+    )
+    assert result.exit_code == 0, result.stdout
+    assert pygscholar.groups.load_groups(str(tmpdir)) == {"my-group": [author1.scholar_id]}
+
+    result = runner.invoke(
+        app,
+        ["list-department-publications", "--group", "my-group", "--cache-dir", str(tmpdir)],
+    )
+    assert result.exit_code == 0, result.stdout
+    assert "my-group" in result.stdout
+    assert author1.most_cited.title[:10] in result.stdout
+    assert author2.most_cited.title[:10] not in result.stdout
+
+    result = runner.invoke(
+        app, ["list-department-publications", "--group", "unknown", "--cache-dir", str(tmpdir)]
+    )
+    assert result.exit_code == 107
+
+    # Names without a close match are reported instead of raising
+    result = runner.invoke(
+        app, ["group", "add", "my-group", "zzzzzzzz", "--cache-dir", str(tmpdir)]
+    )
+    assert result.exit_code == 103
+    assert "Could not find author with name 'zzzzzzzz'" in result.stderr
+
+    runner.invoke(app, ["remove-author", author1.name, "--cache-dir", str(tmpdir)])
+    assert pygscholar.groups.load_groups(str(tmpdir)) == {"my-group": []}
+
+
+def test_list_collaborators(tmpdir):
+    author1 = factory.AuthorFactory.build()
+    author2 = pygscholar.Author(
+        info=factory.AuthorInfoFactory.build(), publications=author1.publications[:1]
+    )
+    for author in (author1, author2):
+        pygscholar.cache.save_author(author, cache_dir=tmpdir)
+    pygscholar.cache.save_authors(
+        {author1.name: author1.scholar_id, author2.name: author2.scholar_id}, str(tmpdir)
+    )
+
+    result = runner.invoke(app, ["list-collaborators", author1.name, "--cache-dir", str(tmpdir)])
+    assert result.exit_code == 0, result.stdout
+    assert author2.name[:10] in result.stdout
+
+    result = runner.invoke(app, ["list-collaborators", "--cache-dir", str(tmpdir)])
+    assert result.exit_code == 0, result.stdout
+    assert "Connected groups of authors" in result.stdout
+
+
+def test_list_collaborators_unknown_author(tmpdir):
+    author = factory.AuthorFactory.build()
+    pygscholar.cache.save_author(author, cache_dir=tmpdir)
+    pygscholar.cache.save_authors(
+        {author.name: author.scholar_id, "Not Fetched": "abc"}, str(tmpdir)
+    )
+
+    result = runner.invoke(app, ["list-collaborators", "Zzzz", "--cache-dir", str(tmpdir)])
+    assert result.exit_code == 103
+    assert "Could not find author with name 'Zzzz'" in result.stderr
+
+    result = runner.invoke(app, ["list-collaborators", "Not Fetched", "--cache-dir", str(tmpdir)])
+    assert result.exit_code == 105
+    assert "not in the collaboration network" in result.stderr
+
+
+def test_generate_department(tmpdir):
+    store = tmpdir / "pages.jsonl"
+    result = runner.invoke(
+        app,
+        [
+            "generate-department",
+            "--authors",
+            "4",
+            "--publications",
+            "5",
+            "--store",
+            str(store),
+            "--cache-dir",
+            str(tmpdir),
+        ],
+    )
+    assert result.exit_code == 0, result.stdout
+    assert "Wrote 4 authors" in result.stdout
+    assert len(pygscholar.cache.load_authors(str(tmpdir))) == 4
+    assert store.isfile()
+
+    # The synthetic authors are not mixed into an existing cache
+    result = runner.invoke(app, ["generate-department", "--cache-dir", str(tmpdir)])
+    assert result.exit_code == 109
+    assert "already contains authors" in result.stderr
+    assert len(pygscholar.cache.load_authors(str(tmpdir))) == 4
+
+    result = runner.invoke(app, ["generate-department"])
+    assert result.exit_code != 0
+
+
+def test_changes_consumer(tmpdir):
+    profiles = synthetic.generate_department(num_authors=3, seed=1)
+    synthetic.write_cache(profiles, tmpdir)
+    args = ["changes", "--consumer", "slack", "--json", "--cache-dir", str(tmpdir)]
+
+    result = runner.invoke(app, args)
+    assert result.exit_code == 0, result.stdout
+    events = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [e["type"] for e in events] == ["author_added"] * 3
+    assert {e["name"] for e in events} == {p.name for p in profiles}
+
+    result = runner.invoke(app, args)
+    assert result.exit_code == 0, result.stdout
+    assert result.stdout == ""
+
+    result = runner.invoke(app, ["changes", "--cache-dir", str(tmpdir)])
+    assert result.exit_code == 0, result.stdout
+    assert "Added with" in result.stdout
+
+
+def test_search_publications_with_invalid_raw_query(tmpdir):
+    author = factory.AuthorFactory.build()
+    pygscholar.cache.save_author(author, cache_dir=str(tmpdir))
+    pygscholar.cache.save_authors({author.name: author.scholar_id}, str(tmpdir))
+
+    result = runner.invoke(
+        app, ["search-publications", '"unbalanced', "--raw", "--cache-dir", str(tmpdir)]
+    )
+    assert result.exit_code == 108
+    assert "Invalid search query" in result.stderr
+
+
+def test_replay_option_does_not_leak_into_later_invocations(tmpdir, monkeypatch):
+    monkeypatch.delenv("PYSCHOLAR_REPLAY", raising=False)
+    store = tmpdir / "pages.jsonl"
+    store.write_text("", encoding="utf-8")
+    author = factory.AuthorFactory.build()
+    args, backend = create_args(author.info, "scraper", tmpdir)
+    drivers = []
+
+    def search_mock(*args, **kwargs):
+        drivers.append(pygscholar.api.scraper.get_default_driver())
+        return author
+
+    with mock.patch("pygscholar.api.scraper.search_author") as m1:
+        m1.return_value = [author.info]
+        with mock.patch("pygscholar.api.search_author_with_publications") as m2:
+            m2.side_effect = search_mock
+            result = runner.invoke(app, ["--replay", str(store)] + args)
+
+    assert result.exit_code == 0, result.stdout
+    assert isinstance(drivers[0], pygscholar.api.replay.ReplayNavigator)
+    assert "PYSCHOLAR_REPLAY" not in os.environ
+    assert "PYSCHOLAR_REPLAY_LATENCY" not in os.environ
+    assert pygscholar.api.scraper._replay_navigator.cache_info().currsize == 0
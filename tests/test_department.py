@@ -28,3 +28,32 @@ def test_dep_diff():
     assert new_pub_author1.title in new_pubs
     assert new_pubs[new_pub_common.title] == new_pub_common
     assert new_pubs[new_pub_author1.title] == new_pub_author1
+
+
+def test_lazy_department_loads_only_candidates(tmp_path, monkeypatch):
+    authors = [factory.AuthorFactory.build() for _ in range(5)]
+    for author in authors:
+        pygscholar.cache.save_author(author, cache_dir=tmp_path)
+    department = pygscholar.Department(authors=authors)
+
+    loaded = []
+    load_author = pygscholar.department.load_author
+
+    def counting_load_author(scholar_id, cache_dir):
+        loaded.append(scholar_id)
+        return load_author(scholar_id, cache_dir=cache_dir)
+
+    monkeypatch.setattr(pygscholar.department, "load_author", counting_load_author)
+    lazy = pygscholar.LazyDepartment(
+        {author.name: author.scholar_id for author in authors}, cache_dir=tmp_path
+    )
+
+    assert [p.title for p in lazy.topk_cited(3)] == [p.title for p in department.topk_cited(3)]
+    assert [p.title for p in lazy.topk_age(3)] == [p.title for p in department.topk_age(3)]
+    assert lazy.most_cited.title == department.most_cited.title
+    # The top publications are read from the summaries
+    assert loaded == []
+
+    # Loading all authors gives the same result as the eager department
+    assert lazy.publications == department.publications
+    assert len(loaded) == len(authors)
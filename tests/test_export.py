@@ -0,0 +1,76 @@
+import json
+
+import factory
+import pygscholar
+import pytest
+from pygscholar import export
+from pygscholar.cli import app
+from typer.testing import CliRunner
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    cache_dir = tmp_path / "cache"
+    authors = [factory.AuthorFactory.build() for _ in range(2)]
+    for author in authors:
+        pygscholar.cache.save_author(author, cache_dir=cache_dir)
+    pygscholar.cache.save_authors(
+        {author.name: author.scholar_id for author in authors}, cache_dir=cache_dir
+    )
+    return cache_dir
+
+
+@pytest.mark.parametrize("suffix", [".jsonl", ".csv", ".parquet"])
+def test_export_import_roundtrip(cache_dir, tmp_path, suffix):
+    if suffix == ".parquet":
+        pytest.importorskip("pyarrow")
+    path = tmp_path / f"publications{suffix}"
+    records = list(export.iter_records(cache_dir=cache_dir))
+    assert export.write_records(iter(records), path) == len(records)
+    assert list(export.read_records(path)) == records
+
+    new_cache_dir = tmp_path / "new_cache"
+    counts = export.import_records(export.read_records(path), cache_dir=new_cache_dir)
+    authors = pygscholar.cache.load_authors(cache_dir)
+    assert pygscholar.cache.load_authors(new_cache_dir) == authors
+    for name, scholar_id in authors.items():
+        old = pygscholar.cache.load_author(scholar_id, cache_dir=cache_dir)
+        new = pygscholar.cache.load_author(scholar_id, cache_dir=new_cache_dir)
+        assert list(new.publications) == list(old.publications)
+        assert counts[name] == len(old.publications)
+
+
+def test_filter_records(cache_dir):
+    records = list(export.iter_records(cache_dir=cache_dir))
+    year = sorted(r["year"] for r in records)[len(records) // 2]
+    filtered = list(export.filter_records(records, min_year=year))
+    assert filtered == [r for r in records if r["year"] >= year]
+
+    name = records[0]["author"]
+    assert all(r["author"] == name for r in export.iter_records(cache_dir, authors=[name]))
+
+
+def test_write_json_array(tmp_path):
+    path = tmp_path / "items.json"
+    items = [{"a": 1}, {"b": [1, 2]}]
+    assert export.write_json_array(iter(items), path) == 2
+    assert json.loads(path.read_text()) == items
+    export.write_json_array([], path)
+    assert json.loads(path.read_text()) == []
+
+
+def test_cli_export(cache_dir, tmp_path):
+    path = tmp_path / "publications.jsonl"
+    result = runner.invoke(
+        app, ["export", str(path), "--min-citations", "0", "--cache-dir", str(cache_dir)]
+    )
+    assert result.exit_code == 0, result.stdout
+    records = list(export.read_records(path))
+    assert f"Exported {len(records)} publications" in result.stdout
+
+    new_cache_dir = tmp_path / "new_cache"
+    result = runner.invoke(app, ["import", str(path), "--cache-dir", str(new_cache_dir)])
+    assert result.exit_code == 0, result.stdout
+    assert pygscholar.cache.load_authors(new_cache_dir) == pygscholar.cache.load_authors(cache_dir)
@@ -0,0 +1,94 @@
+import pygscholar
+from pygscholar import graph
+from pygscholar.author import Author, AuthorInfo
+from pygscholar.publication import Publication
+
+
+def make_author(name, scholar_id, publications, coauthors=()):
+    return Author(
+        info=AuthorInfo(
+            name=name,
+            scholar_id=scholar_id,
+            data={
+                "co-authors": [
+                    {"name": n, "profile_link": f"https://scholar.google.com/citations?user={s}"}
+                    for s, n in coauthors
+                ]
+            },
+        ),
+        publications=[Publication(title=title, authors=authors) for title, authors in publications],
+    )
+
+
+def test_name_key():
+    assert graph.name_key("Henrik Nicolay Finsberg") == graph.name_key("H Finsberg") == "h finsberg"
+
+
+def test_graph_is_updated_when_authors_are_saved(tmp_path):
+    alice = make_author(
+        "Alice Smith",
+        "alice",
+        [("Paper 1", "A Smith, B Jones, C Brown"), ("Paper 2", "A Smith, C Brown")],
+        coauthors=[("dave", "Dave Green")],
+    )
+    bob = make_author("Bob Jones", "bob", [("Paper 1", "A Smith, B Jones, C Brown")])
+    carol = make_author("Carol White", "carol", [("Paper 3", "C White")])
+
+    pygscholar.cache.save_author(alice, cache_dir=tmp_path)
+    pygscholar.cache.save_author(bob, cache_dir=tmp_path)
+    pygscholar.cache.save_author(carol, cache_dir=tmp_path)
+    # Saving an author again does not duplicate edges
+    pygscholar.cache.save_author(alice, cache_dir=tmp_path)
+
+    g = graph.load_graph(tmp_path)
+    collaborators = {c.id: c for c in g.collaborators("alice")}
+    assert collaborators["bob"].shared == 1
+    assert collaborators["name:c brown"].shared == 2
+    assert collaborators["dave"].profile
+    # Bob is a member, so the name from the author list is not an external node
+    assert "name:b jones" not in collaborators
+
+    assert g.components() == [["alice", "bob"], ["carol"]]
+
+    external = g.external_collaborators()
+    assert external[0][0].name == "C Brown"
+    assert external[0][0].shared == 3
+    assert external[0][1] == 2
+
+    assert graph.load_index(tmp_path)["paper 1"] == ["alice", "bob"]
+
+
+def test_graph_matches_rebuild(tmp_path):
+    authors = [
+        make_author("Alice Smith", "alice", [("Paper 1", "A Smith, B Jones")]),
+        make_author("Bob Jones", "bob", [("Paper 1", "A Smith, B Jones"), ("Paper 2", "")]),
+    ]
+    for author in authors:
+        pygscholar.cache.save_author(author, cache_dir=tmp_path)
+    pygscholar.cache.save_authors({a.name: a.scholar_id for a in authors}, str(tmp_path))
+
+    incremental = graph.load_graph(tmp_path)
+    rebuilt = graph.rebuild_graph(str(tmp_path))
+    assert incremental.collaborators("bob") == rebuilt.collaborators("bob")
+    assert incremental.components() == rebuilt.components()
+
+
+def test_batch_update_and_remove_author(tmp_path):
+    authors = [
+        make_author("Alice Smith", "alice", [("Paper 1", "A Smith, B Jones")]),
+        make_author("Bob Jones", "bob", [("Paper 1", "A Smith, B Jones"), ("Paper 2", "")]),
+    ]
+    for author in authors:
+        pygscholar.cache.save_author(author, cache_dir=tmp_path, derived=False)
+    pygscholar.cache.update_derived(authors, cache_dir=tmp_path)
+
+    g = graph.load_graph(tmp_path)
+    assert [c.id for c in g.collaborators("alice")] == ["bob"]
+    assert set(pygscholar.summary.load_summaries(tmp_path)) == {"alice", "bob"}
+
+    pygscholar.cache.remove_derived("bob", cache_dir=tmp_path)
+    g = graph.load_graph(tmp_path)
+    assert g.collaborators("alice") == []
+    assert g.components() == [["alice"]]
+    assert graph.load_index(tmp_path) == {"paper 1": ["alice"]}
+    assert set(pygscholar.summary.load_summaries(tmp_path)) == {"alice"}
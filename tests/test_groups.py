@@ -0,0 +1,22 @@
+import pytest
+from pygscholar import cache, groups
+
+
+def test_groups_share_authors(tmpdir):
+    cache_dir = str(tmpdir)
+    cache.save_authors({"A": "a", "B": "b", "C": "c"}, cache_dir)
+
+    groups.add_to_group("one", ["a", "b"], cache_dir)
+    groups.add_to_group("two", ["b", "c", "b"], cache_dir)
+    assert groups.load_groups(cache_dir) == {"one": ["a", "b"], "two": ["b", "c"]}
+    assert groups.group_authors("one", cache_dir) == {"A": "a", "B": "b"}
+
+    groups.remove_from_group("two", ["c"], cache_dir)
+    assert groups.group_authors("two", cache_dir) == {"B": "b"}
+
+    groups.remove_author("b", cache_dir)
+    assert groups.load_groups(cache_dir) == {"one": ["a"], "two": []}
+
+    groups.delete_group("two", cache_dir)
+    with pytest.raises(KeyError):
+        groups.group_authors("two", cache_dir)
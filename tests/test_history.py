@@ -0,0 +1,99 @@
+import datetime
+
+import factory
+import pygscholar
+import pytest
+from pygscholar import history
+
+
+def with_citations(author, citations):
+    publications = [
+        pub.model_copy(update={"num_citations": n})
+        for pub, n in zip(author.publications, citations)
+    ]
+    return pygscholar.Author(info=author.info, publications=publications)
+
+
+@pytest.fixture
+def author():
+    return factory.AuthorFactory.build(publications=factory.PublicationFactory.batch(3))
+
+
+def test_reconstruct_from_deltas(tmpdir, author):
+    day = datetime.datetime(2024, 1, 1)
+    for i, citations in enumerate([(0, 1, 2), (1, 1, 2), (5, 1, 3)]):
+        history.record_snapshot(
+            with_citations(author, citations), tmpdir, date=day + datetime.timedelta(days=i)
+        )
+
+    assert history.reconstruct(author.scholar_id, day - datetime.timedelta(days=1), tmpdir) is None
+    titles = [pygscholar.publication.title_key(p.title) for p in author.publications]
+    for i, citations in enumerate([(0, 1, 2), (1, 1, 2), (5, 1, 3)]):
+        snapshot = history.reconstruct(
+            author.scholar_id, (day + datetime.timedelta(days=i)).date(), tmpdir
+        )
+        assert snapshot.citations == dict(zip(titles, citations))
+
+
+def test_unchanged_snapshot_is_not_recorded(tmpdir, author):
+    assert history.record_snapshot(author, tmpdir) is not None
+    assert history.record_snapshot(author, tmpdir) is None
+
+
+def test_deltas_only_contain_changes(tmpdir, author):
+    history.record_snapshot(with_citations(author, (0, 1, 2)), tmpdir)
+    record = history.record_snapshot(with_citations(author, (0, 4, 2)), tmpdir)
+    assert record["type"] == "delta"
+    assert record["citations"] == {
+        pygscholar.publication.title_key(author.publications[1].title): 3
+    }
+
+
+def test_keyframes_are_indexed(tmpdir, author, monkeypatch):
+    monkeypatch.setattr(history, "KEYFRAME_INTERVAL", 2)
+    day = datetime.datetime(2024, 1, 1)
+    for i in range(7):
+        history.record_snapshot(
+            with_citations(author, (i, 0, 0)), tmpdir, date=day + datetime.timedelta(days=i)
+        )
+    assert len(history._load_index(author.scholar_id, tmpdir)) == 4
+    snapshot = history.reconstruct(author.scholar_id, day + datetime.timedelta(days=4), tmpdir)
+    assert snapshot.num_citations == 4
+    assert history.latest(author.scholar_id, tmpdir).num_citations == 6
+
+
+def test_citation_velocity(tmpdir, author):
+    day = datetime.datetime(2024, 1, 1)
+    history.record_snapshot(with_citations(author, (0, 0, 0)), tmpdir, date=day)
+    history.record_snapshot(
+        with_citations(author, (10, 0, 4)), tmpdir, date=day + datetime.timedelta(days=2)
+    )
+    end = day + datetime.timedelta(days=2)
+    assert history.citation_velocity(author.scholar_id, day, end, tmpdir) == 7
+    assert (
+        history.citation_velocity(
+            author.scholar_id, day, end, tmpdir, title=author.publications[0].title
+        )
+        == 5
+    )
+
+
+def test_save_author_records_history(tmpdir, author):
+    pygscholar.cache.save_author(author, cache_dir=tmpdir)
+    assert history.latest(author.scholar_id, tmpdir).num_citations == author.num_citations
+
+
+def test_torn_and_invalid_lines_are_skipped(tmpdir, author):
+    d1 = datetime.datetime(2024, 1, 1)
+    d2 = datetime.datetime(2024, 2, 1)
+    history.record_snapshot(with_citations(author, [1, 2, 3]), tmpdir, date=d1)
+    path = history.history_file(author.scholar_id, tmpdir)
+    with open(path, "ab") as f:
+        f.write(b"not json\n" + b'{"date": "2024-01-15", "type": "del')
+    assert history.latest(author.scholar_id, tmpdir).citations == history.citation_counts(
+        with_citations(author, [1, 2, 3])
+    )
+
+    history.record_snapshot(with_citations(author, [4, 5, 6]), tmpdir, date=d2)
+    assert history.latest(author.scholar_id, tmpdir).num_citations == 15
+    assert history.reconstruct(author.scholar_id, d1, tmpdir).num_citations == 6
@@ -0,0 +1,113 @@
+import threading
+
+import httpx
+import pytest
+from scholarly import MaxTriesExceededException
+from selectolax.lexbor import LexborHTMLParser
+
+from pygscholar import config
+from pygscholar import mock_server
+from pygscholar.api import replay
+from pygscholar.api import scraper
+from pygscholar.api.http_navigator import HTTPNavigator, has_captcha, response_page
+
+
+@pytest.fixture
+def start_server(monkeypatch):
+    servers = []
+
+    def start(source, **kwargs):
+        httpd = mock_server.MockScholarServer(("127.0.0.1", 0), source, **kwargs)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        servers.append(httpd)
+        monkeypatch.setattr(config, "SCHOLAR_URL", httpd.url)
+        return httpd
+
+    yield start
+    for httpd in servers:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_render_profile_page_is_parsed_by_scraper():
+    source = mock_server.SyntheticSource(num_articles=3, seed=1)
+    profile = source.profile("abc", "Henrik Finsberg")
+    page = mock_server.render_profile_page(profile)
+    info = scraper.parse_author_info(LexborHTMLParser(page))
+    assert info["info"]["name"] == "Henrik Finsberg"
+    assert info["info"]["citations"]["all"] == sum(a.citations for a in profile.articles)
+
+
+def test_fetch_synthetic_profile(start_server):
+    httpd = start_server(mock_server.SyntheticSource(num_articles=150, seed=1))
+    driver = HTTPNavigator()
+    author = scraper.get_author("henrik finsberg", driver=driver)
+    assert author.name == "Henrik Finsberg"
+
+    fetched = scraper.fetch_author_by_id(author.scholar_id, full=True, driver=driver)
+    profile = httpd.source.profile(author.scholar_id)
+    assert [p.title for p in fetched.publications] == [a.title for a in profile.articles]
+    assert fetched.publications[0].abstract == profile.articles[0].abstract
+    # Search, two pages with articles, the empty last page and the articles
+    assert httpd.stats["requests"] == 1 + 3 + 150
+
+
+def test_pages_are_returned_as_bytes_unless_declared_otherwise():
+    def response(encoding):
+        return httpx.Response(
+            200,
+            content="Bjørn".encode(encoding),
+            headers={"Content-Type": f"text/html; charset={encoding}"},
+        )
+
+    assert response_page(response("UTF-8")) == "Bjørn".encode()
+    assert response_page(response("iso-8859-1")) == "Bjørn"
+    assert has_captcha(b'<form id="gs_captcha_f">')
+    assert not has_captcha("Bjørn".encode())
+
+
+def test_retry_on_rate_limit_and_captcha(start_server):
+    httpd = start_server(
+        mock_server.SyntheticSource(num_articles=20),
+        error_rate=0.3,
+        captcha_rate=0.2,
+        seed=2,
+    )
+    driver = HTTPNavigator(retries=20, backoff=0)
+    author = scraper.fetch_author_by_id("abc", full=True, driver=driver)
+    assert len(author.publications) == 20
+    assert httpd.stats["rate_limited"] > 0
+    assert httpd.stats["captcha"] > 0
+    assert driver.retried == httpd.stats["rate_limited"] + httpd.stats["captcha"]
+
+
+def test_give_up_after_retries(start_server):
+    start_server(mock_server.SyntheticSource(), error_rate=1.0)
+    sleeps = []
+    driver = HTTPNavigator(retries=3, backoff=0.5, sleep=sleeps.append)
+    with pytest.raises(MaxTriesExceededException):
+        driver._get_page(scraper.profile_url("abc"))
+    # The server sends Retry-After: 0
+    assert sleeps == []
+    assert driver.requests == 3
+
+
+def test_serve_replay_store(start_server, tmp_path):
+    store = tmp_path / "pages.jsonl"
+    page = mock_server.render_profile_page(
+        mock_server.SyntheticSource(num_articles=0).profile("abc", "Jane Doe")
+    )
+
+    class Driver:
+        def _get_page(self, link):
+            return page
+
+    recorder = replay.RecordingNavigator(store, Driver())
+    recorder._get_page("https://scholar.google.com/citations?user=abc&cstart=0&pagesize=100")
+
+    start_server(mock_server.ReplaySource(store))
+    author = scraper.fetch_author_by_id("abc", driver=HTTPNavigator())
+    assert author.name == "Jane Doe"
+    assert author.publications == []
+    with pytest.raises(MaxTriesExceededException):
+        HTTPNavigator()._get_page(scraper.profile_url("unknown"))
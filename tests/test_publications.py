@@ -74,3 +74,31 @@ def test_publications_not_older_than():
 
     assert len(lst) == 1
     assert lst[0] == pub1
+
+
+def test_title_fingerprint():
+    pub = pygscholar.Publication(title="A Title ")
+    assert pub.fingerprint == pygscholar.publication.title_fingerprint("a title")
+    assert pub.fingerprint != pygscholar.publication.title_fingerprint("another title")
+    assert -(2**63) <= pub.fingerprint < 2**63
+    # The stored fingerprint is used when loading
+    assert pygscholar.Publication.model_validate_json(pub.model_dump_json()) == pub
+
+    # Fingerprints that do not match the title are only kept when trusted
+    data = {**pub.model_dump(), "title": "Another title"}
+    assert pygscholar.Publication(**data).fingerprint == (
+        pygscholar.publication.title_fingerprint("another title")
+    )
+    trusted = pygscholar.Publication.model_validate(
+        data, context=pygscholar.publication.TRUSTED_FINGERPRINTS
+    )
+    assert trusted.fingerprint == pub.fingerprint
+
+
+def test_remove_duplicate_publications_normalizes_titles():
+    pubs = [
+        pygscholar.Publication(title="A title", num_citations=1),
+        pygscholar.Publication(title="a title", num_citations=2),
+        pygscholar.Publication(title="Other", num_citations=3),
+    ]
+    assert pygscholar.publication.remove_duplicate_publications(pubs) == (pubs[0], pubs[2])
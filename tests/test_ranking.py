@@ -0,0 +1,51 @@
+import datetime
+
+import factory
+import pygscholar
+import pytest
+from pygscholar import ranking
+
+
+def test_h_index():
+    pubs = [factory.PublicationFactory.build(num_citations=n) for n in (10, 8, 5, 4, 3)]
+    assert ranking.h_index(pubs) == 4
+    assert ranking.h_index([]) == 0
+
+
+def test_rank_by_growth():
+    pub1 = factory.PublicationFactory.build(num_citations=100)
+    pub2 = factory.PublicationFactory.build(num_citations=20)
+    pub3 = factory.PublicationFactory.build(num_citations=5)
+    previous = {
+        pygscholar.publication.title_key(pub1.title): 99,
+        pygscholar.publication.title_key(pub2.title): 10,
+    }
+    # pub3 is new and has gained all of its citations
+    lst = ranking.rank([pub1, pub2, pub3], ranking.SortBy.GROWTH, k=3, previous=previous)
+    assert lst == (pub2, pub3, pub1)
+
+
+def test_rank_by_citations_per_year():
+    year = datetime.date.today().year
+    pub1 = factory.PublicationFactory.build(num_citations=100, year=year - 10)
+    pub2 = factory.PublicationFactory.build(num_citations=30, year=year - 1)
+    lst = ranking.rank([pub1, pub2], ranking.SortBy.CITATIONS_PER_YEAR, k=2)
+    assert lst == (pub2, pub1)
+
+
+def test_rank_by_h_index_contribution():
+    shared = factory.PublicationFactory.build(num_citations=3)
+    top = factory.PublicationFactory.build(num_citations=50)
+    author1 = pygscholar.Author(info=factory.AuthorInfoFactory.build(), publications=[shared, top])
+    author2 = pygscholar.Author(info=factory.AuthorInfoFactory.build(), publications=[shared])
+    dep = pygscholar.Department(authors=[author1, author2])
+
+    lst = ranking.rank(dep.publications, ranking.SortBy.H_INDEX, k=2, authors=dep.authors)
+    assert lst == (shared, top)
+
+
+@pytest.mark.parametrize("sort_by", list(ranking.SortBy))
+def test_extract_correct_publications(sort_by):
+    author = factory.AuthorFactory.build()
+    publications = pygscholar.api.extract_correct_publications(author, n=2, sort_by=sort_by)
+    assert len(publications) == min(2, len(author.publications))
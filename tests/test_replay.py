@@ -0,0 +1,114 @@
+import pytest
+from scholarly import MaxTriesExceededException
+
+from pygscholar.api import replay
+from pygscholar.api import scraper
+from pygscholar.api.local_db import LocalNavigator
+
+
+class FakeNavigator:
+    def __init__(self, num_articles):
+        self.num_articles = num_articles
+        self.requests = 0
+
+    def _get_page(self, link):
+        self.requests += 1
+        if "cstart" in link:
+            rows = "".join(
+                f'<tr class="gsc_a_tr"><td><a class="gsc_a_at" href="/citations?article={i}">'
+                f'Paper {i}</a><div class="gs_gray">A Author</div>'
+                '<div class="gs_gray">Journal</div></td><td><a class="gsc_a_ac">3</a></td>'
+                '<td><span class="gsc_a_hc">2020</span></td></tr>'
+                for i in range(self.num_articles)
+            )
+            return f'<table>{rows}<tr><td class="gsc_a_e"></td></tr></table>'
+        return (
+            '<div><div class="gsc_oci_field">Description</div>'
+            f'<div class="gsc_oci_value">Abstract of {link}</div></div>'
+        )
+
+
+def test_normalize_url_ignores_parameter_order_and_language():
+    a = "https://scholar.google.com/citations?user=abc&hl=en&gl=us&cstart=0&pagesize=100"
+    b = "https://scholar.google.com/citations?pagesize=100&cstart=0&user=abc&hl=no"
+    c = "https://scholar.google.com/citations?user=abc&cstart=100&pagesize=100"
+    assert replay.normalize_url(a) == replay.normalize_url(b)
+    assert replay.normalize_url(a) != replay.normalize_url(c)
+
+
+def test_record_and_replay(tmp_path):
+    store = tmp_path / "pages.jsonl"
+    driver = FakeNavigator(num_articles=5)
+    recorder = replay.RecordingNavigator(store, driver)
+    recorded = scraper.extract_all_articles("abc", full=True, driver=recorder)
+    assert driver.requests == 6
+
+    replayer = replay.ReplayNavigator(store)
+    replayed = scraper.extract_all_articles("abc", full=True, driver=replayer)
+    assert replayed == recorded
+    assert replayer.requests == 6
+
+
+def test_replayed_pages_are_utf8_bytes(tmp_path):
+    store = tmp_path / "pages.jsonl"
+    page = '<div id="gsc_prf_in">Bjørn Ødegård</div>'
+
+    class Driver:
+        def _get_page(self, link):
+            return page.encode()
+
+    link = "https://scholar.google.com/citations?user=abc"
+    # Pages are recorded as text, whether the driver returns text or bytes
+    assert replay.RecordingNavigator(store, Driver())._get_page(link) == page.encode()
+    assert replay.load_store(store) == {replay.normalize_url(link): page.encode()}
+
+    replayed = replay.ReplayNavigator(store)._get_page(link)
+    assert isinstance(replayed, bytes)
+    parser = scraper.LexborHTMLParser(replayed)
+    assert parser.css_first("#gsc_prf_in").text() == "Bjørn Ødegård"
+
+
+def test_replay_unknown_url(tmp_path):
+    replayer = replay.ReplayNavigator(tmp_path / "missing.jsonl")
+    with pytest.raises(replay.UnknownURLError):
+        replayer._get_page("https://scholar.google.com/citations?user=abc")
+
+
+def test_replay_latency_and_errors(tmp_path):
+    store = tmp_path / "pages.jsonl"
+    recorder = replay.RecordingNavigator(store, FakeNavigator(num_articles=1))
+    link = "https://scholar.google.com/citations?article=1"
+    recorder._get_page(link)
+
+    sleeps = []
+    replayer = replay.ReplayNavigator(
+        store, latency=0.5, jitter=0.1, error_rate=0.5, seed=1, sleep=sleeps.append
+    )
+    errors = 0
+    for _ in range(100):
+        try:
+            assert b"Abstract" in replayer._get_page(link)
+        except MaxTriesExceededException:
+            errors += 1
+    assert 30 < errors < 70
+    assert len(sleeps) == 100
+    assert all(0.5 <= s <= 0.6 for s in sleeps)
+
+
+def test_default_driver_from_environment(tmp_path, monkeypatch):
+    store = tmp_path / "pages.jsonl"
+    store.touch()
+    monkeypatch.setenv("PYSCHOLAR_REPLAY", str(store))
+    monkeypatch.setenv("PYSCHOLAR_REPLAY_LATENCY", "0.25")
+    driver = scraper.get_default_driver()
+    assert isinstance(driver, replay.ReplayNavigator)
+    assert driver.latency == 0.25
+    assert scraper.get_default_driver() is driver
+
+
+def test_local_navigator_unknown_url(tmp_path):
+    driver = LocalNavigator(tmp_path / "db.json")
+    driver.insert_page("https://scholar.google.com/citations?user=abc&hl=en", "page")
+    assert driver._get_page("https://scholar.google.com/citations?hl=en&user=abc") == "page"
+    with pytest.raises(replay.UnknownURLError):
+        driver._get_page("https://scholar.google.com/citations?user=def")
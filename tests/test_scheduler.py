@@ -0,0 +1,86 @@
+import datetime
+from unittest import mock
+
+import factory
+import pygscholar
+import pytest
+from pygscholar import scheduler
+
+
+@pytest.fixture
+def authors(tmpdir):
+    authors = [factory.AuthorFactory.build() for _ in range(3)]
+    pygscholar.cache.save_authors({a.name: a.scholar_id for a in authors}, str(tmpdir))
+    return authors
+
+
+def search_mock(authors):
+    def search(*args, **kwargs):
+        return next(a for a in authors if a.scholar_id == kwargs["scholar_id"])
+
+    return search
+
+
+def test_plan_prioritizes_stale_and_active_authors(tmpdir, authors):
+    now = datetime.datetime(2024, 1, 10)
+    s = scheduler.RefreshScheduler(cache_dir=str(tmpdir), budget=2)
+    s.sync()
+    a, b, c = (s.state.authors[author.scholar_id] for author in authors)
+    a.last_fetched = now - datetime.timedelta(days=1)
+    b.last_fetched = now - datetime.timedelta(days=1)
+    b.publication_rate = 10
+    c.last_fetched = now - datetime.timedelta(days=5)
+
+    assert s.plan(now) == [authors[1].scholar_id, authors[2].scholar_id]
+
+
+def test_run_refreshes_within_budget_and_spreads_requests(tmpdir, authors):
+    sleep = mock.Mock()
+    s = scheduler.RefreshScheduler(cache_dir=str(tmpdir), budget=2, window=10, sleep=sleep)
+    with mock.patch("pygscholar.api.search_author_with_publications") as m:
+        m.side_effect = search_mock(authors)
+        refreshed = s.run()
+
+    assert len(refreshed) == 2
+    sleep.assert_called_once_with(5)
+    state = scheduler.load_state(tmpdir)
+    assert state.queue == []
+    assert sum(a.last_fetched is not None for a in state.authors.values()) == 2
+
+
+def test_interrupted_run_is_resumed(tmpdir, authors):
+    s = scheduler.RefreshScheduler(cache_dir=str(tmpdir), budget=3)
+    with mock.patch("pygscholar.api.search_author_with_publications") as m:
+        m.side_effect = [authors[0], KeyboardInterrupt()]
+        with pytest.raises(KeyboardInterrupt):
+            s.run()
+
+    state = scheduler.load_state(tmpdir)
+    assert len(state.queue) == 2
+
+    s = scheduler.RefreshScheduler(cache_dir=str(tmpdir), budget=3)
+    with mock.patch("pygscholar.api.search_author_with_publications") as m:
+        m.side_effect = search_mock(authors)
+        refreshed = s.run()
+    assert [a.scholar_id for a in refreshed] == state.queue
+
+
+def test_failed_author_does_not_block_the_queue(tmpdir, authors):
+    failing = authors[0].scholar_id
+
+    def search(*args, **kwargs):
+        if kwargs["scholar_id"] == failing:
+            raise RuntimeError("CAPTCHA")
+        return search_mock(authors)(*args, **kwargs)
+
+    s = scheduler.RefreshScheduler(cache_dir=str(tmpdir), budget=3)
+    with mock.patch("pygscholar.api.search_author_with_publications") as m:
+        m.side_effect = search
+        refreshed = s.run()
+
+    assert {a.scholar_id for a in refreshed} == {a.scholar_id for a in authors[1:]}
+    state = scheduler.load_state(tmpdir)
+    assert state.queue == []
+    assert state.authors[failing].failures == 1
+    assert state.authors[failing].last_error == "RuntimeError: CAPTCHA"
+    assert state.authors[failing].last_fetched is None
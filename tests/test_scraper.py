@@ -0,0 +1,140 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pygscholar import synthetic
+from pygscholar.api import replay, scraper
+from pygscholar.mock_server import write_store
+from pygscholar.publication import title_key
+
+
+def article_row(i):
+    return (
+        f'<tr class="gsc_a_tr"><td><a class="gsc_a_at" href="/citations?article={i}">Paper {i}</a>'
+        '<div class="gs_gray">A Author</div><div class="gs_gray">Journal</div></td>'
+        '<td><a class="gsc_a_ac">3</a></td><td><span class="gsc_a_hc">2020</span></td></tr>'
+    )
+
+
+class CountingNavigator:
+    """Serves one profile page with many articles and records the maximum
+    number of article pages that are requested at the same time"""
+
+    def __init__(self, num_articles):
+        self.num_articles = num_articles
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def _get_page(self, link):
+        if "cstart" in link:
+            rows = "".join(article_row(i) for i in range(self.num_articles))
+            return f'<table>{rows}<tr><td class="gsc_a_e"></td></tr></table>'
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.001)
+        with self.lock:
+            self.in_flight -= 1
+        i = link.split("article=")[-1]
+        return (
+            '<div><div class="gsc_oci_field">Description</div>'
+            f'<div class="gsc_oci_value">Abstract {i}</div></div>'
+        )
+
+
+def test_extract_all_articles_full_uses_driver_and_bounds_requests(monkeypatch):
+    monkeypatch.setattr(scraper, "MAX_IN_FLIGHT", 4)
+    driver = CountingNavigator(num_articles=30)
+    articles = scraper.extract_all_articles("abc", full=True, driver=driver)
+    assert [a["title"] for a in articles] == [f"Paper {i}" for i in range(30)]
+    assert [a["extra"]["description"] for a in articles] == [f"Abstract {i}" for i in range(30)]
+    assert 0 < driver.max_in_flight <= 4
+
+
+def test_single_flight_shares_concurrent_calls():
+    flight = scraper.SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def slow():
+        calls.append(1)
+        release.wait()
+        return "page"
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [executor.submit(flight.do, "key", slow) for _ in range(5)]
+        time.sleep(0.01)
+        release.set()
+        assert [f.result() for f in futures] == ["page"] * 5
+    assert flight.do("key", slow) == "page"
+    assert len(calls) == 1
+    assert (flight.calls, flight.shared) == (1, 5)
+
+
+def test_single_flight_does_not_memoize_failures():
+    flight = scraper.SingleFlight()
+
+    def fail():
+        raise RuntimeError("blocked")
+
+    for _ in range(2):
+        try:
+            flight.do("key", fail)
+        except RuntimeError:
+            pass
+    assert flight.do("key", lambda: "page") == "page"
+    assert flight.calls == 3
+
+
+class SameTitleNavigator(CountingNavigator):
+    """Serves a profile with two different papers that have the same title"""
+
+    def _get_page(self, link):
+        if "cstart" in link:
+            rows = "".join(
+                article_row(i).replace(f">Paper {i}<", ">Paper<").replace("2020", year)
+                for i, year in enumerate(("2019", "2020"))
+            )
+            return f'<table>{rows}<tr><td class="gsc_a_e"></td></tr></table>'
+        return super()._get_page(link)
+
+
+def test_extract_all_articles_does_not_share_pages_of_papers_with_same_title():
+    pages = scraper.SingleFlight()
+    articles = scraper.extract_all_articles(
+        "abc", full=True, driver=SameTitleNavigator(num_articles=0), pages=pages
+    )
+    assert [a["extra"]["description"] for a in articles] == ["Abstract 0", "Abstract 1"]
+    assert (pages.calls, pages.shared) == (2, 0)
+
+    articles = scraper.extract_all_articles(
+        "def", full=True, driver=SameTitleNavigator(num_articles=0), pages=pages
+    )
+    assert (pages.calls, pages.shared) == (2, 2)
+
+
+def test_fetch_authors_fetches_shared_articles_once(tmp_path):
+    profiles = synthetic.generate_department(
+        num_authors=6, publications_per_author=15, overlap=0.5, seed=1
+    )
+    store = tmp_path / "pages.jsonl"
+    write_store(profiles, store)
+
+    class Navigator(replay.ReplayNavigator):
+        def __init__(self, path):
+            super().__init__(path)
+            self.articles = []
+
+        def _get_page(self, link):
+            if "view_citation" in link:
+                self.articles.append(link)
+            return super()._get_page(link)
+
+    driver = Navigator(store)
+    scholar_ids = [p.scholar_id for p in profiles]
+    authors = scraper.fetch_authors_by_id(scholar_ids, full=True, driver=driver)
+    titles = {title_key(a.title) for p in profiles for a in p.articles}
+    assert len(driver.articles) == len(titles) < sum(len(p.articles) for p in profiles)
+    for author, profile in zip(authors, profiles):
+        assert [p.abstract for p in author.publications] == [a.abstract for a in profile.articles]
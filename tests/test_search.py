@@ -0,0 +1,71 @@
+import time
+from unittest import mock
+
+import pygscholar
+from pygscholar import search
+from pygscholar.author import Author, AuthorInfo
+from pygscholar.publication import Publication
+
+
+def make_author(scholar_id, publications):
+    return Author(
+        info=AuthorInfo(name=scholar_id.title(), scholar_id=scholar_id),
+        publications=publications,
+    )
+
+
+def test_search_is_updated_when_authors_are_saved(tmp_path):
+    heart = Publication(title="Modeling the heart", journal="Cardiac journal", num_citations=5)
+    brain = Publication(title="Brain imaging", abstract="We image the heart and the brain")
+    alice = make_author("alice", [heart, brain])
+    bob = make_author("bob", [heart])
+    pygscholar.cache.save_author(alice, cache_dir=tmp_path)
+    pygscholar.cache.save_author(bob, cache_dir=tmp_path)
+
+    results = search.search("heart", cache_dir=tmp_path)
+    # Matches in the title are ranked above matches in the abstract
+    assert [r.publication.title for r in results] == ["Modeling the heart", "Brain imaging"]
+    assert sorted(results[0].scholar_ids) == ["alice", "bob"]
+    assert search.search("card", cache_dir=tmp_path)[0].publication == heart
+
+    # Publications that are removed from all authors are removed from the index
+    pygscholar.cache.save_author(make_author("alice", [heart]), cache_dir=tmp_path)
+    assert search.search("brain", cache_dir=tmp_path) == []
+    assert sorted(search.search("heart", cache_dir=tmp_path)[0].scholar_ids) == ["alice", "bob"]
+
+    search.remove_author("alice", cache_dir=tmp_path)
+    assert search.search("heart", cache_dir=tmp_path)[0].scholar_ids == ["bob"]
+    search.remove_author("bob", cache_dir=tmp_path)
+    assert search.search("heart", cache_dir=tmp_path) == []
+
+
+def test_filled_publication_is_indexed(tmp_path):
+    publication = Publication(title="Modeling the heart")
+    pygscholar.cache.save_author(make_author("alice", [publication]), cache_dir=tmp_path)
+    assert search.search("electrophysiology", cache_dir=tmp_path) == []
+
+    filled = Publication(title="Modeling the heart", abstract="Cardiac electrophysiology")
+    search.index_publication(filled, cache_dir=tmp_path)
+    assert search.search("electrophysiology", cache_dir=tmp_path)[0].publication == filled
+
+    # Filling a publication only updates the index of the given cache
+    with mock.patch("pygscholar.api.scraper.fill_publication") as m:
+        m.return_value = Publication(title="Modeling the heart", abstract="Ventricles")
+        with mock.patch("pygscholar.search.index_publication") as index:
+            publication.fill()
+        index.assert_not_called()
+
+    # The abstract is kept when the author is saved again without it
+    pygscholar.cache.save_author(make_author("alice", [publication]), cache_dir=tmp_path)
+    assert search.search("electrophysiology", cache_dir=tmp_path)[0].publication == filled
+
+
+def test_search_many_publications(tmp_path):
+    publications = [Publication(title=f"Paper {i} about topic{i % 1000}") for i in range(20000)]
+    search.index_author(make_author("alice", publications), cache_dir=tmp_path)
+
+    t0 = time.perf_counter()
+    results = search.search("topic123", cache_dir=tmp_path)
+    elapsed = time.perf_counter() - t0
+    assert len(results) == 10
+    assert elapsed < 0.5
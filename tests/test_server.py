@@ -0,0 +1,126 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from unittest import mock
+
+import factory
+import pygscholar
+import pytest
+from pygscholar import server
+
+
+@pytest.fixture
+def authors(tmpdir):
+    authors = [factory.AuthorFactory.build() for _ in range(2)]
+    for author in authors:
+        pygscholar.cache.save_author(author, cache_dir=tmpdir)
+    pygscholar.cache.save_authors({a.name: a.scholar_id for a in authors}, str(tmpdir))
+    return authors
+
+
+@pytest.fixture
+def url(tmpdir, authors):
+    state = server.DepartmentState(cache_dir=str(tmpdir))
+    httpd = server.Server(("127.0.0.1", 0), state)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(url):
+    with urllib.request.urlopen(url) as response:
+        return json.loads(response.read())
+
+
+def test_list_authors(url, authors):
+    data = get(f"{url}/authors")
+    assert {a["scholar_id"] for a in data} == {a.scholar_id for a in authors}
+    assert all(a["summary"] is not None for a in data)
+
+
+def test_author_publications(url, authors):
+    author = authors[0]
+    data = get(f"{url}/authors/{urllib.request.quote(author.name)}/publications?n=1")
+    assert len(data) == 1
+    assert data[0] == pygscholar.publication.topk_cited(author.publications, k=1)[0].model_dump()
+
+
+def test_department_publications(url, authors):
+    data = get(f"{url}/department/publications?n=100&sort_by=citations-per-year")
+    titles = {p.title for a in authors for p in a.publications}
+    assert {p["title"] for p in data} == titles
+
+
+def test_unknown_author(url, authors):
+    with pytest.raises(urllib.error.HTTPError) as e:
+        get(f"{url}/authors/{urllib.request.quote(authors[0].name[:-1])}/publications")
+    assert e.value.code == 404
+    assert f"Did you mean '{authors[0].name}'" in json.loads(e.value.read())["error"]
+
+
+def test_unknown_endpoint(url):
+    with pytest.raises(urllib.error.HTTPError) as e:
+        get(f"{url}/unknown")
+    assert e.value.code == 404
+
+
+def test_refresh_stores_new_publications(url, authors):
+    new_pub = factory.PublicationFactory.build()
+
+    def search_mock(*args, **kwargs):
+        author = next(a for a in authors if a.name == kwargs["name"])
+        return pygscholar.Author(
+            info=author.info, publications=tuple(author.publications) + (new_pub,)
+        )
+
+    with mock.patch("pygscholar.api.search_author_with_publications") as m:
+        m.side_effect = search_mock
+        assert post(f"{url}/refresh") == (202, {"status": "started"})
+        status = wait_for_refresh(url)
+
+    assert status["error"] is None
+    data = get(f"{url}/department/new")
+    assert [p["title"] for p in data] == [new_pub.title]
+
+
+def post(url):
+    request = urllib.request.Request(url, method="POST")
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def wait_for_refresh(url):
+    for _ in range(500):
+        status = get(f"{url}/refresh")
+        if not status["running"] and status["finished"] is not None:
+            return status
+        time.sleep(0.01)
+    raise TimeoutError("Refresh did not finish")
+
+
+def test_concurrent_refresh_is_rejected_and_errors_are_reported(url):
+    release = threading.Event()
+
+    def search_mock(*args, **kwargs):
+        release.wait(5)
+        raise RuntimeError("Blocked by Google Scholar")
+
+    with mock.patch("pygscholar.api.search_author_with_publications") as m:
+        m.side_effect = search_mock
+        assert post(f"{url}/refresh")[0] == 202
+        code, data = post(f"{url}/refresh")
+        assert code == 409
+        assert "already running" in data["error"]
+        release.set()
+        status = wait_for_refresh(url)
+        assert status["error"] == "RuntimeError: Blocked by Google Scholar"
+        # The failed refresh does not block the next one
+        assert post(f"{url}/refresh")[0] == 202
+        wait_for_refresh(url)
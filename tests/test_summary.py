@@ -0,0 +1,58 @@
+import datetime
+
+import factory
+import pygscholar
+from pygscholar import summary
+
+
+def test_summarize():
+    year = datetime.date.today().year
+    pubs = [
+        factory.PublicationFactory.build(num_citations=10, year=year - 2),
+        factory.PublicationFactory.build(num_citations=3, year=year - 2),
+        factory.PublicationFactory.build(num_citations=1, year=year),
+    ]
+    author = pygscholar.Author(info=factory.AuthorInfoFactory.build(), publications=pubs)
+    s = summary.summarize(author, k=2)
+
+    assert s.num_publications == 3
+    assert s.num_citations == author.num_citations
+    assert s.h_index == 2
+    assert s.citations_per_year == {year - 2: 13, year: 1}
+    assert s.publications_per_year == {year - 2: 2, year: 1}
+    assert [(p.title, p.num_citations) for p in s.top_cited] == [
+        (pubs[0].title, 10),
+        (pubs[1].title, 3),
+    ]
+    assert (s.most_recent[0].title, s.most_recent[0].year) == (pubs[2].title, year)
+    # The abstracts are left out of the summary
+    assert s.top_cited[0] == pubs[0].model_copy(update={"abstract": ""})
+    assert author.topk_cited(2) == tuple(pubs[:2])
+    assert author.most_cited == pubs[0]
+
+
+def test_save_author_updates_summary(tmpdir):
+    author1 = factory.AuthorFactory.build()
+    author2 = factory.AuthorFactory.build()
+    pygscholar.cache.save_author(author1, cache_dir=tmpdir)
+    pygscholar.cache.save_author(author2, cache_dir=tmpdir)
+
+    summaries = summary.load_summaries(tmpdir)
+    assert set(summaries) == {author1.scholar_id, author2.scholar_id}
+    assert summaries[author1.scholar_id] == summary.summarize(author1).model_copy(
+        update={"updated": summaries[author1.scholar_id].updated}
+    )
+
+
+def test_department_summary():
+    shared = factory.PublicationFactory.build(num_citations=100)
+    author1 = factory.AuthorFactory.build(publications=[shared])
+    author2 = factory.AuthorFactory.build(
+        publications=[shared, factory.PublicationFactory.build(num_citations=5)]
+    )
+    dep = summary.department_summary([summary.summarize(author1), summary.summarize(author2)])
+
+    assert dep.num_authors == 2
+    assert dep.num_citations == 205
+    assert dep.top_cited[0] == (shared.title, 100)
+    assert len(dep.top_cited) == 2
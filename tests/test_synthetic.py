@@ -0,0 +1,77 @@
+from pygscholar import cache, graph, search, summary, synthetic
+from pygscholar.api import replay, scraper
+from pygscholar.department import LazyDepartment
+from pygscholar.mock_server import write_store
+from pygscholar.publication import title_key
+
+
+def test_generate_department_is_deterministic():
+    a = synthetic.generate_department(num_authors=10, publications_per_author=20, seed=3)
+    b = synthetic.generate_department(num_authors=10, publications_per_author=20, seed=3)
+    c = synthetic.generate_department(num_authors=10, publications_per_author=20, seed=4)
+    assert a == b
+    assert a != c
+    assert len(a) == 10
+    assert len({p.scholar_id for p in a}) == len({p.name for p in a}) == 10
+
+
+def test_generate_department_structure():
+    profiles = synthetic.generate_department(
+        num_authors=50, publications_per_author=20, overlap=0.3, seed=1
+    )
+    counts = sorted(len(p.articles) for p in profiles)
+    assert counts[0] >= 1
+    # Heavy tailed number of publications
+    assert counts[-1] > 2 * counts[len(counts) // 2]
+
+    owners: dict[str, int] = {}
+    for profile in profiles:
+        assert [a.citations for a in profile.articles] == sorted(
+            (a.citations for a in profile.articles), reverse=True
+        )
+        for article in profile.articles:
+            owners[title_key(article.title)] = owners.get(title_key(article.title), 0) + 1
+    assert any(n > 1 for n in owners.values())
+    assert any(profile.coauthors for profile in profiles)
+
+    no_overlap = synthetic.generate_department(num_authors=20, overlap=0.0, seed=1)
+    titles = [title_key(a.title) for p in no_overlap for a in p.articles]
+    assert len(titles) == len(set(titles))
+    assert not any(profile.coauthors for profile in no_overlap)
+
+
+def test_write_cache(tmp_path):
+    profiles = synthetic.generate_department(num_authors=5, publications_per_author=10, seed=2)
+    synthetic.write_cache(profiles, tmp_path)
+
+    authors = cache.load_authors(str(tmp_path))
+    assert authors == {p.name: p.scholar_id for p in profiles}
+    department = LazyDepartment(authors, cache_dir=str(tmp_path))
+    author = department.get_author_by_scholar_id(profiles[0].scholar_id)
+    assert author == synthetic.to_author(profiles[0])
+
+    assert set(summary.load_summaries(tmp_path)) == set(authors.values())
+    assert graph.load_graph(tmp_path).members
+    title = profiles[0].articles[0].title
+    assert search.search(title, cache_dir=tmp_path)[0].publication.title == title
+
+
+def test_store_replays_through_scraper(tmp_path):
+    profiles = synthetic.generate_department(num_authors=3, publications_per_author=80, seed=5)
+    store = tmp_path / "pages.jsonl"
+    write_store(profiles, store)
+    driver = replay.ReplayNavigator(store)
+
+    profile = max(profiles, key=lambda p: len(p.articles))
+    assert scraper.get_author(profile.name, driver=driver).scholar_id == profile.scholar_id
+    fetched = scraper.fetch_author_by_id(profile.scholar_id, full=True, driver=driver)
+    expected = synthetic.to_author(profile)
+    assert fetched.info.data["info"] == expected.info.data["info"]
+    for a, b in zip(fetched.publications, expected.publications, strict=True):
+        assert (a.title, a.year, a.num_citations, a.abstract, a.pdf_url) == (
+            b.title,
+            b.year,
+            b.num_citations,
+            b.abstract,
+            b.pdf_url,
+        )